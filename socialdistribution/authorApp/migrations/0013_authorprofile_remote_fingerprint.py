@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 19:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authorApp", "0012_alter_user_profileimage"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="authorprofile",
+            name="remote_fingerprint",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.1 on 2026-10-18 20:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authorApp", "0013_authorprofile_remote_fingerprint"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="authorprofile",
+            name="github_etag",
+            field=models.CharField(blank=True, default="", max_length=255),
+        ),
+        migrations.AddField(
+            model_name="authorprofile",
+            name="github_next_poll_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -46,9 +46,14 @@ class AuthorProfile(models.Model):
     github_token = models.CharField(max_length=255, null=True, blank=True)
     github_user = models.CharField(max_length=255, null=True, blank=True)
     last_github_event_id = models.CharField(max_length=150, null=True, blank=True)
+    # validator of the last GitHub events response and the earliest time GitHub allows the next poll
+    github_etag = models.CharField(max_length=255, blank=True, default="")
+    github_next_poll_at = models.DateTimeField(null=True, blank=True)
     fqid = models.TextField(
         blank=True, editable=False, unique=True
     )  # New field for fqid
+    # hash of the data a remote node last sent for this author, so unchanged authors are skipped on sync
+    remote_fingerprint = models.CharField(max_length=64, blank=True, default="")
 
     def save(self, *args, **kwargs):
         # Generate fqid dynamically
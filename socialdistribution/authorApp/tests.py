@@ -1,8 +1,9 @@
-from django.test import TestCase, Client
+from django.test import TestCase, Client, override_settings
 from django.urls import reverse
 from django.contrib import auth
 from django.contrib.messages import get_messages
 from django.utils import timezone
+from django.db import connection
 from django.db.models import Q
 from django.contrib.auth import get_user_model
 
@@ -10,10 +11,12 @@ from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
 
 from .models import AuthorProfile, User, Friends, Follower
-from node_link.models import Node
-from postApp.models import Post
+from node_link.models import InboxActivity, Node, SeenActivity
+from node_link.utils.inbox_queue import process_inbox_queue
+from postApp.models import Like, Post
 
 import base64
+from unittest import mock
 
 
 # Set up the User model
@@ -584,6 +587,40 @@ class AuthorAppTests(APITestCase):
         )
 
 
+class AuthorListETagTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser",
+            password="testpass",
+            display_name="Test User",
+            user_serial="testuser",
+        )
+        self.node = Node.objects.create(
+            url="http://testserver/api/", is_remote=False, created_by=self.user
+        )
+        self.user.local_node = self.node
+        self.user.save()
+        AuthorProfile.objects.create(user=self.user)
+        self.client.force_authenticate(user=self.user)
+
+    def test_unchanged_author_list_returns_not_modified(self):
+        url = reverse("authorApp:author-list")
+        etag = self.client.get(url, {"page": 1, "size": 10})["ETag"]
+
+        response = self.client.get(
+            url, {"page": 1, "size": 10}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.user.display_name = "Renamed"
+        self.user.save()
+        response = self.client.get(
+            url, {"page": 1, "size": 10}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+
 class InboxAPITestCase(APITestCase):
     def setUp(self):
 
@@ -750,3 +787,267 @@ class InboxAPITestCase(APITestCase):
             url, data, HTTP_AUTHORIZATION=auth_header, format="json"
         )
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def auth_header(self):
+        credentials = base64.b64encode(b"local_node_user:local_node_pass").decode(
+            "utf-8"
+        )
+        return f"Basic {credentials}"
+
+    def test_batch_inbox_advertises_support(self):
+        response = self.client.get(
+            reverse("authorApp:batch-inbox"), HTTP_AUTHORIZATION=self.auth_header()
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["type"], "inbox_batch")
+        self.assertGreater(response.data["max_items"], 1)
+
+    def test_batch_inbox_reports_status_per_item(self):
+        remote_author = AuthorProfile.objects.create(user=self.remote_user)
+        follow = {
+            "type": "follow",
+            "actor": {"type": "author", "id": remote_author.fqid},
+            "object": {"type": "author", "id": self.author.fqid},
+        }
+        data = {
+            "type": "inbox_batch",
+            "items": [
+                {"author": self.author.fqid, "activity": follow},
+                {"author": "http://testserver/api/authors/nobody", "activity": follow},
+                {"author": self.user.username, "activity": {"type": "video"}},
+            ],
+        }
+
+        response = self.client.post(
+            reverse("authorApp:batch-inbox"),
+            data,
+            HTTP_AUTHORIZATION=self.auth_header(),
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["status"] for item in response.data["items"]], [201, 404, 400]
+        )
+        self.assertTrue(
+            Follower.objects.filter(
+                actor=remote_author, object=self.author, status="p"
+            ).exists()
+        )
+
+    def test_batch_inbox_fetches_unknown_senders_outside_the_transaction(self):
+        unknown = "http://remote.example/api/authors/stranger"
+        follow = {
+            "type": "follow",
+            "actor": {"type": "author", "id": unknown},
+            "object": {"type": "author", "id": self.author.fqid},
+        }
+        data = {
+            "type": "inbox_batch",
+            "items": [{"author": self.author.fqid, "activity": follow}] * 2,
+        }
+        # the test itself runs in atomic blocks; the batch must not have opened one
+        depth = len(connection.atomic_blocks)
+        depths = []
+
+        def fetch(fqid):
+            depths.append(len(connection.atomic_blocks))
+
+        with mock.patch("node_link.utils.inbox.fetch_remote_author", side_effect=fetch):
+            self.client.post(
+                reverse("authorApp:batch-inbox"),
+                data,
+                HTTP_AUTHORIZATION=self.auth_header(),
+                format="json",
+            )
+        self.assertEqual(depths, [depth])
+
+    @mock.patch("requests.Session.request", autospec=True)
+    def test_unknown_sender_is_fetched_on_its_own(self, mock_request):
+        actor_id = f"{self.remote_node.url}authors/{self.remote_user.user_serial}"
+        mock_request.return_value = mock.Mock(
+            status_code=200,
+            json=lambda: {
+                "type": "author",
+                "id": actor_id,
+                "host": self.remote_node.url,
+                "displayName": "Remote User",
+                "github": "",
+                "profileImage": "http://remote-node.com/static/avatar.png",
+            },
+        )
+        data = {
+            "type": "follow",
+            "actor": {"type": "author", "id": actor_id},
+            "object": {"type": "author", "id": self.author.fqid},
+        }
+
+        response = self.client.post(
+            reverse("authorApp:author-inbox", args=[self.user.username]),
+            data,
+            HTTP_AUTHORIZATION=self.auth_header(),
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        # only the sender was fetched, not every page of every node
+        self.assertEqual(mock_request.call_count, 1)
+        self.assertEqual(mock_request.call_args[0][2], actor_id)
+        self.assertTrue(
+            Follower.objects.filter(actor__fqid=actor_id, object=self.author).exists()
+        )
+
+    @override_settings(INBOX_ASYNC=True)
+    def test_async_inbox_queues_then_applies(self):
+        remote_author = AuthorProfile.objects.create(user=self.remote_user)
+        data = {
+            "type": "follow",
+            "actor": {"type": "author", "id": remote_author.fqid},
+            "object": {"type": "author", "id": self.author.fqid},
+        }
+
+        response = self.client.post(
+            reverse("authorApp:author-inbox", args=[self.user.username]),
+            data,
+            HTTP_AUTHORIZATION=self.auth_header(),
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertFalse(Follower.objects.filter(actor=remote_author).exists())
+        activity = InboxActivity.objects.get(pk=response.data["id"])
+        self.assertEqual(activity.status, "p")
+        self.assertEqual(activity.sender_node, self.local_node)
+
+        summary = process_inbox_queue()
+
+        self.assertEqual(summary["done"], 1)
+        activity.refresh_from_db()
+        self.assertEqual(activity.status, "d")
+        self.assertEqual(activity.result_status, status.HTTP_201_CREATED)
+        self.assertTrue(
+            Follower.objects.filter(actor=remote_author, object=self.author).exists()
+        )
+
+    def test_failed_queued_activity_backs_off(self):
+        remote_author = AuthorProfile.objects.create(user=self.remote_user)
+        activity = InboxActivity.objects.create(
+            recipient=self.author,
+            activity_type="follow",
+            payload={
+                "type": "follow",
+                "actor": {"type": "author", "id": remote_author.fqid},
+                "object": {"type": "author", "id": self.author.fqid},
+            },
+        )
+
+        with mock.patch(
+            "node_link.utils.inbox_queue.process_inbox_activity",
+            side_effect=RuntimeError("boom"),
+        ) as process:
+            process_inbox_queue()
+            process_inbox_queue()
+
+        # retried later, not straight away by the next run
+        self.assertEqual(process.call_count, 1)
+        activity.refresh_from_db()
+        self.assertEqual(activity.status, "p")
+        self.assertEqual(activity.attempts, 1)
+        self.assertGreater(activity.next_attempt_at, timezone.now())
+
+    @override_settings(INBOX_ASYNC=True)
+    def test_async_inbox_rejects_invalid_activity_up_front(self):
+        response = self.client.post(
+            reverse("authorApp:author-inbox", args=[self.user.username]),
+            {"type": "comment", "author": {"id": "x"}},
+            HTTP_AUTHORIZATION=self.auth_header(),
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(InboxActivity.objects.exists())
+
+    @override_settings(INBOX_ASYNC=True)
+    def test_async_batch_inbox_queues_valid_items(self):
+        follow = {
+            "type": "follow",
+            "actor": {"type": "author", "id": "http://remote-node.com/api/authors/x"},
+            "object": {"type": "author", "id": self.author.fqid},
+        }
+        response = self.client.post(
+            reverse("authorApp:batch-inbox"),
+            [
+                {"author": self.author.fqid, "activity": follow},
+                {"author": "http://testserver/api/authors/nobody", "activity": follow},
+                {"author": self.author.fqid, "activity": {"type": "like"}},
+            ],
+            HTTP_AUTHORIZATION=self.auth_header(),
+            format="json",
+        )
+        self.assertEqual(
+            [item["status"] for item in response.data["items"]], [202, 404, 400]
+        )
+        self.assertEqual(InboxActivity.objects.filter(recipient=self.author).count(), 1)
+
+    def remote_post(self, remote_author, content, likes=()):
+        return {
+            "type": "post",
+            "id": f"{self.remote_node.url}authors/remoteuser/posts/42",
+            "title": "Remote post",
+            "description": "A post from another node",
+            "contentType": "text/plain",
+            "content": content,
+            "visibility": "PUBLIC",
+            "author": {
+                "type": "author",
+                "id": remote_author.fqid,
+                "host": self.remote_node.url,
+            },
+            "comments": {"type": "comments", "src": []},
+            "likes": {"type": "likes", "src": list(likes)},
+        }
+
+    def test_resent_post_is_not_processed_again(self):
+        remote_author = AuthorProfile.objects.create(user=self.remote_user)
+        Follower.objects.create(
+            actor=self.author, object=remote_author, created_by=self.author
+        )
+        url = reverse("authorApp:author-inbox", args=[self.user.username])
+        like = {
+            "type": "like",
+            "id": f"{self.remote_node.url}authors/remoteuser/liked/7",
+            "author": {"type": "author", "id": remote_author.fqid},
+            "object": f"{self.remote_node.url}authors/remoteuser/posts/42",
+        }
+        post = self.remote_post(remote_author, "first", likes=[like, like])
+
+        first = self.client.post(
+            url, post, HTTP_AUTHORIZATION=self.auth_header(), format="json"
+        )
+        replay = self.client.post(
+            url, post, HTTP_AUTHORIZATION=self.auth_header(), format="json"
+        )
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(replay.status_code, status.HTTP_200_OK)
+        self.assertEqual(SeenActivity.objects.get(recipient=self.author).replays, 1)
+        self.assertEqual(Like.objects.count(), 1)
+
+        # an edit keeps the id but changes the content, so it is applied
+        edited = self.client.post(
+            url,
+            self.remote_post(remote_author, "edited", likes=[like]),
+            HTTP_AUTHORIZATION=self.auth_header(),
+            format="json",
+        )
+        self.assertEqual(edited.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Post.objects.get().content, "edited")
+        self.assertEqual(Like.objects.count(), 1)
+
+    def test_batch_inbox_rejects_non_list(self):
+        response = self.client.post(
+            reverse("authorApp:batch-inbox"),
+            {"type": "follow"},
+            HTTP_AUTHORIZATION=self.auth_header(),
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -37,6 +37,7 @@ urlpatterns = [
         views.author_inbox_view,
         name="author-inbox",
     ),
+    path("api/inbox/batch/", views.batch_inbox_view, name="batch-inbox"),
     re_path(
         r"^api/authors/(?P<author_fqid>.+)/$",
         views.SingleAuthorView.as_view(),
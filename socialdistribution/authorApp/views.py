@@ -42,13 +42,32 @@ from .serializers import (
     FriendSerializer,
 )
 from node_link.models import Node, Notification
-from node_link.utils.common import CustomPaginator, has_access, is_approved
-from node_link.utils.communication import send_to_remote_inboxes
+from node_link.utils.common import (
+    CustomPaginator,
+    is_approved,
+)
+from node_link.utils.fanout import deliver_to_authors
+from node_link.utils.inbox import (
+    REPLAY_RESPONSE,
+    activity_fingerprint,
+    is_replay,
+    process_inbox_activity,
+    process_inbox_batch,
+)
+from node_link.utils.inbox_queue import (
+    check_activity,
+    enqueue_activity,
+    enqueue_inbox_batch,
+    inbox_async_enabled,
+)
+from node_link.utils import response_cache
+from node_link.utils.response_cache import cached_response
+from node_link.utils.social_graph import social_graph
+from node_link.utils.visibility import visible_posts
 
-from node_link.utils.fetch_remote_authors import fetch_remote_authors
 from postApp.models import Post
 from postApp.serializers import PostSerializer, LikeSerializer, CommentSerializer
-from postApp.utils.fetch_github_activity import fetch_github_events
+from postApp.utils.cards import card_batch_urls
 from authorApp.models import AuthorProfile, Friends, Follower
 from authorApp.serializers import FollowerSerializer
 import requests
@@ -127,20 +146,22 @@ def profile_display(request, author_un):
             AuthorProfile,
             user__username=author_un,
         )
-        all_ids = list(Post.objects.filter(author=author).order_by("-created_at"))
+        # the posts current_user may see, filtered in one query
+        filtered_ids = list(
+            visible_posts(current_user, Post.objects.filter(author=author)).order_by(
+                "-created_at"
+            )
+        )
 
         # Determine the button to display
-        is_friend = Friends.objects.filter(
-            Q(user1=current_user, user2=author) | Q(user1=author, user2=current_user)
-        ).exists()
+        graph = social_graph(current_user)
+        is_friend = author.id in graph.friends
 
         follow_status = Follower.objects.filter(
             actor=current_user, object=author
         ).first()
 
-        requested_by_author = Follower.objects.filter(
-            actor=author, object=current_user, status="p"
-        ).exists()
+        requested_by_author = author.id in graph.requests
         ff_request = ""
         if is_friend:
             button_type = "unfriend"
@@ -168,13 +189,11 @@ def profile_display(request, author_un):
         else:
             button_type = "follow"
 
-        filtered_ids = []
-        for a in all_ids:
-            if has_access(request, a.uuid, username=request.user.username):
-                filtered_ids.append(a)
-
         context = {
             "all_ids": filtered_ids,
+            "card_urls": card_batch_urls(
+                request.user.username, [post.uuid for post in filtered_ids]
+            ),
             "author": author,
             "button_type": button_type,
             "ff_request": ff_request,
@@ -196,45 +215,40 @@ def friends_page(request):
     and those who are your friends.
     """
     current_author = request.user.author_profile
-    # Get a list of author IDs that the current user is already following (status='A')
-    following = [
-        a.object
-        for a in list(Follower.objects.filter(actor=current_author, status="a"))
-    ]
-    followers = [
-        a.actor
-        for a in list(Follower.objects.filter(object=current_author, status="a"))
-    ]
+    graph = social_graph(current_author)
+    # every related author in one query
+    authors = AuthorProfile.objects.select_related("user").in_bulk(
+        graph.friends
+        | graph.following
+        | graph.followers
+        | graph.requested
+        | graph.denied
+    )
 
-    # Get a list of author IDs that the current user has pending follow requests with (status='P')
-    pending_request = [
-        a.object
-        for a in list(Follower.objects.filter(actor=current_author, status="p"))
-    ]
+    def related(ids):
+        return [authors[a_id] for a_id in sorted(ids) if a_id in authors]
 
-    # Get a list of author IDs that have denied follow requests (status='D')
-    denied_request = [
-        a.object
-        for a in list(Follower.objects.filter(actor=current_author, status="d"))
-    ]
+    # authors the current user is already following (status='a') and followed by
+    following = related(graph.following)
+    followers = related(graph.followers)
+
+    # authors the current user has pending follow requests with (status='p')
+    pending_request = related(graph.requested)
+
+    # authors that have denied follow requests (status='d')
+    denied_request = related(graph.denied)
 
-    # Get a list of author IDs that have requested to follow
+    # authors that have requested to follow, with the id of their request
     requested = [
         (a.actor, a.id)
-        for a in list(Follower.objects.filter(object=current_author, status="p"))
+        for a in Follower.objects.filter(
+            object=current_author, status="p"
+        ).select_related("actor__user")
     ]
 
-    # Get a list of friend IDs
-    friend = [
-        a.user2 if a.user1 == current_author else a.user1
-        for a in Friends.objects.filter(
-            Q(user1=current_author) | Q(user2=current_author)
-        )
-    ]
+    friend = related(graph.friends)
 
-    exclude_id = [a.id for a in (friend + following + pending_request)]
-    following = list(following)
-    followers = list(followers)
+    exclude_id = graph.friends | graph.following | graph.requested
 
     # Authors the user can follow (not already following, no pending requests, and not already friends)
     can_follow_authors = AuthorProfile.objects.exclude(id__in=exclude_id)
@@ -426,7 +440,7 @@ def follow_author(request, author_id):
                 )
                 follow_request_json = follow_request.data
 
-                send_to_remote_inboxes(follow_request_json, target_author)
+                deliver_to_authors(follow_request_json, [target_author])
 
         return HttpResponseRedirect(request.META.get("HTTP_REFERER", "/"))
 
@@ -459,26 +473,13 @@ def explore_users(request):
     query = request.GET.get("q", "")  # Search query
     sort_by = request.GET.get("sort", "user__display_name")  # Sorting parameter
     direction = request.GET.get("direction", "asc")  # Sorting direction (asc/desc)
-    fetch_remote_authors()
 
     current_author = request.user.author_profile
-    exclude_id = []
-    exclude_id = (
-        [
-            a.user2.id if a.user1 == current_author else a.user1.id
-            for a in Friends.objects.filter(
-                Q(user1=current_author) | Q(user2=current_author)
-            )
-        ]
-        + [
-            a.object.id
-            for a in list(
-                Follower.objects.filter(actor=current_author, status__in=["a", "p"])
-            )
-        ]
-        + [current_author.user.id]
-    )
-    all_authors = AuthorProfile.objects.exclude(user__id__in=exclude_id)
+    graph = social_graph(current_author)
+    # friends, followed authors, pending requests and the user themselves
+    all_authors = AuthorProfile.objects.exclude(
+        id__in=graph.friends | graph.following | graph.requested
+    ).exclude(id=current_author.id)
 
     # Filter by search query
     if query:
@@ -531,22 +532,28 @@ class AuthorProfileViewSet(viewsets.ModelViewSet):
                         ],
                     }
                 },
-            )
+            ),
+            304: openapi.Response(
+                description="The page has not changed since the ETag sent in If-None-Match."
+            ),
         },
         tags=["Authors"],
     )
     def list(self, request, *args, **kwargs):
+        # peers crawling us send If-None-Match and get a 304 for unchanged pages
+        return cached_response(request, [response_cache.AUTHORS], self.author_page)
+
+    def author_page(self):
         authors = AuthorProfile.objects.all().order_by("id")
-        if request.query_params:
+        if self.request.query_params:
             paginator = CustomPaginator()
-            paginated_authors = paginator.paginate_queryset(authors, request)
+            paginated_authors = paginator.paginate_queryset(authors, self.request)
             serializer = AuthorProfileSerializer(paginated_authors, many=True)
         else:
             serializer = AuthorProfileSerializer(authors, many=True)
 
         # Wrap the serialized data in the required format
-        response_data = {"type": "authors", "authors": serializer.data}
-        return Response(response_data)
+        return {"type": "authors", "authors": serializer.data}
 
     @swagger_auto_schema(
         operation_description="Retrieve an author's profile by username.",
@@ -936,6 +943,9 @@ class SingleAuthorView(APIView):
                     }
                 },
             ),
+            304: openapi.Response(
+                description="The author has not changed since the ETag sent in If-None-Match."
+            ),
             404: openapi.Response(
                 description="Author not found.",
                 examples={"application/json": {"detail": "Not found."}},
@@ -958,11 +968,15 @@ class SingleAuthorView(APIView):
         """
         GET: Retrieve a single author using its FQID.
         """
-        author_fqid = unquote(author_fqid)
-
-        author = get_object_or_404(AuthorProfile, fqid=author_fqid)
-        serializer = AuthorProfileSerializer(author)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        author = get_object_or_404(
+            AuthorProfile.objects.select_related("user__local_node"),
+            fqid=unquote(author_fqid),
+        )
+        return cached_response(
+            request,
+            [response_cache.author_scope(author.pk)],
+            lambda: AuthorProfileSerializer(author).data,
+        )
 
 
 @api_view(["POST"])
@@ -974,9 +988,8 @@ def author_inbox_view(request, author_serial):
 
     Supported types: "post", "like", "comment", "follow"
     """
-    # do this check if the request info contains a node that is active. if not, then send an access denied JSON
-    # before serializing the data, we fetch to ensure that we have an upadted database of authors
-    fetch_remote_authors()
+    # remote authors are kept in sync by the `fetch_remote_authors --loop` service;
+    # an unknown sender is fetched on its own while processing the activity
     # retrieve the author
     print("Incoming data:", request.data)
 
@@ -984,99 +997,26 @@ def author_inbox_view(request, author_serial):
     # check the request for the id of the node and check if it is active
     # if not active return resposne to them saying they don't have access
 
-    # check if a remote author(object) sends a post; update follow status to Accepted
     try:
+        author = AuthorProfile.objects.get(user__username=author_serial)
+    except AuthorProfile.DoesNotExist:
+        return Response({"error": "Author not found"}, status=404)
+
+    if inbox_async_enabled():
+        # only a cheap check here, the `process_inbox` worker applies the activity
+        error = check_activity(request.data)
+        if error:
+            return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+        if is_replay(author, activity_fingerprint(request.data)):
+            code, body = REPLAY_RESPONSE
+            return Response(body, status=code)
+        activity = enqueue_activity(author, request.data, sender_node(request))
+        return Response(
+            {"status": "queued", "id": activity.pk}, status=status.HTTP_202_ACCEPTED
+        )
 
-        try:
-            author = AuthorProfile.objects.get(user__username=author_serial)
-        except AuthorProfile.DoesNotExist:
-            return Response({"error": "Author not found"}, status=404)
-            # retrieve the activity
-        data = request.data
-        object_type = data.get("type")
-
-        # filter base on type
-        if object_type == "post":
-            # check if a remote author(object) sends a post; update follow status to Accepted
-            post_id = data.get("id")  # Retrieve the ID of the post
-            if not post_id:
-                # If no post ID is provided, return an error response
-                return Response({"error": "Post ID is required."}, status=400)
-
-            # Query the database to check if the post exists
-            post_instance = Post.objects.filter(fqid=post_id).first()
-
-            try:
-                remote_author = get_object_or_404(
-                    AuthorProfile, fqid=data["author"]["id"]
-                )
-                if (
-                    Follower.objects.filter(object=remote_author, actor=author).exists()
-                    and remote_author.user.local_node.is_remote
-                ):
-                    # update follow
-                    to_update = Follower.objects.filter(
-                        object=remote_author, actor=author
-                    ).first()
-                    to_update.status = "a"
-                    to_update.save()
-                    # updtae friends
-                    mutual_follow = Follower.objects.filter(
-                        actor=remote_author, object=author, status="a"
-                    ).exists()
-
-                    if mutual_follow:
-                        # Establish friendship
-                        try:
-                            # Ensure consistent ordering by user ID
-                            user1, user2 = (
-                                (remote_author, author)
-                                if remote_author.id < author.id
-                                else (author, remote_author)
-                            )
-
-                            # Create a single Friends instance
-                            Friends.objects.create(
-                                user1=user1,
-                                user2=user2,
-                                created_by=remote_author,  # Assuming 'created_by' refers to the initiator
-                            )
-                            print(
-                                request,
-                                f"You are now friends with {author.user.user_serial}.",
-                            )
-                        except IntegrityError:
-                            # Friendship already exists
-                            print(
-                                request,
-                                f"You are already friends with {author.user.user_serial}.",
-                            )
-
-                    if post_instance:
-                        # If the post exists, pass it to the serializer for updating
-                        serializer = PostSerializer(
-                            post_instance, data=data, context={"author": author}
-                        )
-                    else:
-                        # If the post doesn't exist, initialize the serializer for creating a new post
-                        serializer = PostSerializer(
-                            data=data, context={"author": author}
-                        )
-
-            except AuthorProfile.DoesNotExist:
-                return Response({"error": "Author not found"}, status=404)
-
-        elif object_type == "like":
-            serializer = LikeSerializer(data=data, context={"author": author})
-        elif object_type == "comment":
-            serializer = CommentSerializer(data=data, context={"author": author})
-        elif object_type == "follow":
-            serializer = FollowerSerializer(data=data, context={"author": author})
-
-        else:
-            return Response(
-                {"error": "Unsupported object type"}, status=status.HTTP_400_BAD_REQUEST
-            )
+    try:
+        code, body = process_inbox_activity(author, request.data)
     except Exception as e:
         # Catch-all for unexpected errors
         print(f"Unexpected error: {e}")
@@ -1084,8 +1024,63 @@ def author_inbox_view(request, author_serial):
             {"error": "An unexpected error occurred", "details": str(e)},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
+    return Response(body, status=code)
 
-    # save the object to our database
-    if serializer.is_valid():
-        serializer.save()
-        return Response({"status": "sucessful"}, status=status.HTTP_201_CREATED)
+
+def sender_node(request):
+    """
+    The remote node that authenticated the inbox request, if any.
+    """
+    return request.user if isinstance(request.user, Node) else None
+
+
+@swagger_auto_schema(
+    method="get",
+    operation_summary="Describe the batch inbox",
+    operation_description="Lets remote nodes discover that this node accepts batched inbox deliveries and how many items a batch may hold.",
+    responses={200: openapi.Response("Batch inbox capabilities")},
+)
+@swagger_auto_schema(
+    method="post",
+    operation_summary="Deliver many activities at once",
+    operation_description=(
+        "Accepts a list of post/like/comment/follow activities for one or many local authors, "
+        'either as a JSON array or as {"type": "inbox_batch", "items": [...]}. '
+        'Each item is {"author": <FQID or serial of the local author>, "activity": {...}}. '
+        "All items are stored in one transaction and each one gets its own status "
+        "(202 when INBOX_ASYNC queues them for the `process_inbox` worker)."
+    ),
+    responses={
+        200: openapi.Response("Per-item results"),
+        400: openapi.Response("The body is not a list of items or has too many items"),
+    },
+)
+@api_view(["GET", "POST"])
+@permission_classes([IsAuthenticated])
+@authentication_classes([NodeBasicAuthentication])
+def batch_inbox_view(request):
+    """
+    Batch version of the author inbox, so cooperating nodes can send many activities
+    with a single authenticated request.
+    """
+    max_items = getattr(settings, "INBOX_BATCH_MAX_ITEMS", 100)
+    if request.method == "GET":
+        return Response({"type": "inbox_batch", "max_items": max_items})
+
+    data = request.data
+    items = data.get("items") if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        return Response(
+            {"error": "Expected a list of items."}, status=status.HTTP_400_BAD_REQUEST
+        )
+    if len(items) > max_items:
+        return Response(
+            {"error": f"A batch may hold at most {max_items} items."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    if inbox_async_enabled():
+        results = enqueue_inbox_batch(items, sender_node(request))
+    else:
+        results = process_inbox_batch(items)
+    return Response({"type": "inbox_batch", "items": results})
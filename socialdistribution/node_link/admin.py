@@ -7,8 +7,16 @@ from django import forms
 from django.contrib.auth.hashers import make_password
 
 from node_link.utils.fetch_remote_authors import fetch_remote_authors
-
-from .models import Node  # Project-specific imports
+from node_link.utils.node_client import NodeClient
+from node_link.utils.communication import probe_batch_inbox
+from node_link.utils import circuit_breaker
+
+from .models import (
+    InboxActivity,
+    Node,
+    OutboxDelivery,
+    SeenActivity,
+)  # Project-specific imports
 from authorApp.serializers import AuthorToUserSerializer
 
 
@@ -57,11 +65,43 @@ class NodeAdmin(admin.ModelAdmin):
         "username",
         "is_active",
         "is_remote",
+        "batch_inbox_max_items",
+        "breaker_state",
+        "consecutive_failures",
+        "latency_p50",
+        "latency_p95",
+        "last_success_at",
+        "authors_synced_at",
+        "created_by",
+        "created_at",
+        "updated_at",
+    )
+    list_filter = ("is_active", "is_remote", "breaker_state")
+    readonly_fields = (
+        "is_remote",
+        "batch_inbox_max_items",
+        "authors_synced_at",
+        "breaker_state",
+        "breaker_opened_at",
+        "consecutive_failures",
+        "last_success_at",
+        "last_failure_at",
+        "last_error",
+        "latency_p50",
+        "latency_p95",
         "created_by",
         "created_at",
         "updated_at",
     )
-    readonly_fields = ("is_remote", "created_by", "created_at", "updated_at")
+    actions = ["reset_circuit_breaker"]
+
+    @admin.action(description="Reset circuit breaker")
+    def reset_circuit_breaker(self, request, queryset):
+        for node in queryset:
+            circuit_breaker.reset(node)
+        super().message_user(
+            request, f"Reset the circuit breaker of {queryset.count()} node(s)."
+        )
 
     def save_model(self, request, obj, form, change):
         authors_url = obj.url.rstrip("/") + "/authors/"
@@ -96,19 +136,15 @@ class NodeAdmin(admin.ModelAdmin):
                         level=messages.ERROR,
                     )
                     return  # Do not save the node
-            auth = (obj.username, obj.raw_password)
-
-            # Prepare headers if local_node exists
-            headers = {}
-            if local_node:
-                headers["X-original-host"] = local_node.url
+            # the node is not saved yet, so use a short-lived client for the check
+            client = NodeClient(obj, local_node.url if local_node else None)
 
             try:
-                response = requests.get(
-                    authors_url, auth=auth, timeout=10, headers=headers
-                )
+                response = client.get(authors_url)
                 print(response)
                 response.raise_for_status()
+                # find out whether the node takes batched inbox deliveries
+                obj.batch_inbox_max_items = probe_batch_inbox(obj, client)
             except requests.RequestException as e:
                 # Do not save the node, and show a notification
                 self.message_user(
@@ -125,19 +161,62 @@ class NodeAdmin(admin.ModelAdmin):
                     level=messages.ERROR,
                 )
                 return  # Do not save the node
+            finally:
+                client.close()
 
         # save the object
         super().save_model(request, obj, form, change)
 
-        # fetch remote authors if it is a new remote node
-        if not change:
-            fetch_remote_authors()
-
-        if change and obj.is_active:
-            fetch_remote_authors()
+        # fetch the authors of a new or reactivated remote node right away,
+        # the `fetch_remote_authors --loop` service keeps them fresh afterwards
+        if obj.is_remote and obj.is_active:
+            fetch_remote_authors(nodes=Node.objects.filter(pk=obj.pk))
 
     def message_user(
         self, request, message, level=messages.INFO, extra_tags="", fail_silently=False
     ):
         if level != messages.SUCCESS:
             super().message_user(request, message, level, extra_tags, fail_silently)
+
+
+@admin.register(OutboxDelivery)
+class OutboxDeliveryAdmin(admin.ModelAdmin):
+    list_display = (
+        "inbox_url",
+        "node",
+        "status",
+        "attempts",
+        "next_attempt_at",
+        "last_error",
+        "delivered_at",
+    )
+    list_filter = ("status", "node")
+    readonly_fields = ("activity", "recipient", "node", "claimed_by", "claimed_at")
+
+
+@admin.register(InboxActivity)
+class InboxActivityAdmin(admin.ModelAdmin):
+    list_display = (
+        "activity_type",
+        "recipient",
+        "sender_node",
+        "status",
+        "attempts",
+        "result_status",
+        "received_at",
+        "processed_at",
+    )
+    list_filter = ("status", "activity_type", "sender_node")
+    readonly_fields = ("recipient", "sender_node", "claimed_by", "claimed_at")
+
+
+@admin.register(SeenActivity)
+class SeenActivityAdmin(admin.ModelAdmin):
+    list_display = (
+        "activity_id",
+        "recipient",
+        "replays",
+        "first_seen_at",
+        "last_seen_at",
+    )
+    readonly_fields = ("recipient", "activity_key", "content_hash")
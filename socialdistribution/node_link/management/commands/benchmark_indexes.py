@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from node_link.utils.index_benchmark import check_indexes
+
+
+class Command(BaseCommand):
+    help = "Check that federation lookups use their indexes (python manage.py benchmark_indexes)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=10000,
+            help="Number of posts, comments, likes and notifications to seed.",
+        )
+        parser.add_argument(
+            "--plans",
+            action="store_true",
+            help="Print the full EXPLAIN output of every lookup.",
+        )
+
+    def handle(self, *args, **options):
+        """
+        handler that seeds the tables, checks the query plans and rolls the data back.
+        """
+        self.stdout.write(
+            f"Seeding {options['rows']} rows per table on {connection.vendor}..."
+        )
+        checks = check_indexes(options["rows"])
+        for check in checks:
+            result = "uses" if check.uses_index else "DOES NOT use"
+            self.stdout.write(
+                f"{check.label}: {result} {check.index} ({check.elapsed_ms:.2f} ms)"
+            )
+            if options["plans"] or not check.uses_index:
+                self.stdout.write(f"    {check.plan}")
+
+        missing = [check.index for check in checks if not check.uses_index]
+        if missing:
+            raise CommandError(f"Indexes not used: {', '.join(missing)}")
@@ -1,3 +1,6 @@
+import time
+
+from django.conf import settings
 from django.core.management.base import BaseCommand
 from node_link.utils.fetch_remote_authors import fetch_remote_authors
 
@@ -5,10 +8,36 @@ from node_link.utils.fetch_remote_authors import fetch_remote_authors
 class Command(BaseCommand):
     help = "Called to fetch authors from remote nodes (done via python manage.py fetch_remote_authors)"
 
-    def handle(self, *args, **kwargs):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running and resync nodes whose authors are older than REMOTE_AUTHORS_TTL_SECONDS.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=getattr(settings, "REMOTE_AUTHORS_SYNC_INTERVAL_SECONDS", 60),
+            help="Seconds between checks for stale nodes (with --loop).",
+        )
+        parser.add_argument(
+            "--stale-only",
+            action="store_true",
+            help="Only sync nodes whose authors are older than REMOTE_AUTHORS_TTL_SECONDS.",
+        )
+
+    def handle(self, *args, **options):
         """
         handler that will run the fetch.
         """
         # call the function that actually runs the fetch (socialdistribution/node_link/utils/fetch_remote_authors.py)
-        fetch_remote_authors()
-        self.stdout.write("Finished calling fetched_remote_authors.")
+        if not options["loop"]:
+            fetch_remote_authors(stale_only=options["stale_only"])
+            self.stdout.write("Finished calling fetched_remote_authors.")
+            return
+
+        while True:
+            synced = fetch_remote_authors(stale_only=True)
+            if synced:
+                self.stdout.write(f"Synced the authors of {synced} node(s).")
+            time.sleep(options["interval"])
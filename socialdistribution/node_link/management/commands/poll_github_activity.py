@@ -0,0 +1,32 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from postApp.utils.fetch_github_activity import poll_github_activity
+
+
+class Command(BaseCommand):
+    help = "Turn new GitHub activity of linked authors into posts (python manage.py poll_github_activity)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running and poll authors as soon as GitHub allows it.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=getattr(settings, "GITHUB_POLL_INTERVAL_SECONDS", 60),
+            help="Seconds between checks for authors due for a poll (with --loop).",
+        )
+
+    def handle(self, *args, **options):
+        if not options["loop"]:
+            polls = poll_github_activity()
+            self.stdout.write(f"Polled {len(polls)} author(s).")
+            return
+
+        while True:
+            poll_github_activity()
+            time.sleep(options["interval"])
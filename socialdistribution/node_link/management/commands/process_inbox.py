@@ -0,0 +1,50 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from node_link.utils.inbox import forget_old_activities
+from node_link.utils.inbox_queue import process_inbox_queue
+
+
+class Command(BaseCommand):
+    help = (
+        "Apply activities queued by the inboxes (python manage.py process_inbox --loop)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=getattr(settings, "INBOX_BATCH_SIZE", 100),
+            help="Maximum number of activities claimed per batch.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling the inbox queue instead of exiting after one batch.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Seconds to sleep when the queue is empty (with --loop).",
+        )
+
+    def handle(self, *args, **options):
+        """
+        handler that applies queued activities until the queue is drained.
+        """
+        while True:
+            summary = process_inbox_queue(batch_size=options["batch_size"])
+            if summary["claimed"]:
+                self.stdout.write(
+                    f"Inbox: {summary['done']} applied, {summary['retry']} to retry, "
+                    f"{summary['failed']} failed."
+                )
+                continue
+
+            # the queue is drained: a good time to drop old dedup records
+            forget_old_activities()
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
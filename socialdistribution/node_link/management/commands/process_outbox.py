@@ -0,0 +1,53 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from node_link.utils.outbox import process_outbox
+
+
+class Command(BaseCommand):
+    help = "Deliver queued activities to remote inboxes (python manage.py process_outbox --loop)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=getattr(settings, "OUTBOX_BATCH_SIZE", 100),
+            help="Maximum number of deliveries claimed per batch.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=getattr(settings, "OUTBOX_CONCURRENCY", 8),
+            help="Number of deliveries sent at the same time.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling the outbox instead of exiting after one batch.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=2.0,
+            help="Seconds to sleep when the outbox is empty (with --loop).",
+        )
+
+    def handle(self, *args, **options):
+        """
+        handler that claims and sends due deliveries until the outbox is drained.
+        """
+        while True:
+            summary = process_outbox(
+                batch_size=options["batch_size"], concurrency=options["concurrency"]
+            )
+            if summary["claimed"]:
+                self.stdout.write(
+                    f"Outbox: {summary['sent']} sent, {summary['retry']} to retry, "
+                    f"{summary['failed']} failed."
+                )
+                continue
+
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+from node_link.utils.timeline import local_authors, rebuild_timeline
+
+
+class Command(BaseCommand):
+    help = "Backfill or rebuild the home timelines of local authors (python manage.py rebuild_timelines)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--author",
+            action="append",
+            default=[],
+            help="Username of an author to rebuild (can be repeated); all local authors by default.",
+        )
+
+    def handle(self, *args, **options):
+        """
+        handler that recomputes timelines from the posts, follows and friendships tables.
+        """
+        authors = local_authors().select_related("user")
+        if options["author"]:
+            authors = authors.filter(user__username__in=options["author"])
+            if not authors.exists():
+                raise CommandError("No local author with that username.")
+
+        total = 0
+        for author in authors.iterator():
+            count = rebuild_timeline(author)
+            total += 1
+            self.stdout.write(f"{author.user.username}: {count} posts")
+        self.stdout.write(f"Rebuilt {total} timelines.")
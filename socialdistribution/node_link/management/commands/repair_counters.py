@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from postApp.models import Comment, Post
+from postApp.utils.counters import recount
+
+
+class Command(BaseCommand):
+    help = "Recompute the like and comment counters of posts and comments (python manage.py repair_counters)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--author",
+            action="append",
+            default=[],
+            help="Username of an author whose posts to repair (can be repeated); everything by default.",
+        )
+
+    def handle(self, *args, **options):
+        """
+        handler that recounts the child tables in one UPDATE per table.
+        """
+        posts, comments = None, None
+        if options["author"]:
+            posts = Post.objects.filter(author__user__username__in=options["author"])
+            comments = Comment.objects.filter(post__in=posts)
+        post_rows, comment_rows = recount(posts, comments)
+        self.stdout.write(
+            f"Recounted {post_rows} post(s) and {comment_rows} comment(s)."
+        )
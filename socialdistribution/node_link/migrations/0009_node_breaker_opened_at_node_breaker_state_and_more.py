@@ -0,0 +1,52 @@
+# Generated by Django 5.1.1 on 2026-10-18 19:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("node_link", "0008_outboxactivity_outboxdelivery"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="node",
+            name="breaker_opened_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="node",
+            name="breaker_state",
+            field=models.CharField(
+                choices=[("c", "Closed"), ("o", "Open"), ("h", "Half-open")],
+                default="c",
+                max_length=1,
+            ),
+        ),
+        migrations.AddField(
+            model_name="node",
+            name="consecutive_failures",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="node",
+            name="last_error",
+            field=models.TextField(blank=True, default=""),
+        ),
+        migrations.AddField(
+            model_name="node",
+            name="last_failure_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="node",
+            name="last_success_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="node",
+            name="recent_latencies_ms",
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
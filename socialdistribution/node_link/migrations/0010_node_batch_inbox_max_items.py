@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 19:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("node_link", "0009_node_breaker_opened_at_node_breaker_state_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="node",
+            name="batch_inbox_max_items",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 19:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("node_link", "0010_node_batch_inbox_max_items"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="node",
+            name="authors_synced_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
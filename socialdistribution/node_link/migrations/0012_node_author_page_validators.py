@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 19:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("node_link", "0011_node_authors_synced_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="node",
+            name="author_page_validators",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 5.1.1 on 2026-10-18 19:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authorApp", "0013_authorprofile_remote_fingerprint"),
+        ("node_link", "0012_node_author_page_validators"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="InboxActivity",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("activity_type", models.CharField(max_length=32)),
+                ("payload", models.JSONField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("p", "Pending"),
+                            ("i", "In progress"),
+                            ("d", "Done"),
+                            ("f", "Failed"),
+                        ],
+                        default="p",
+                        max_length=1,
+                    ),
+                ),
+                ("attempts", models.PositiveIntegerField(default=0)),
+                (
+                    "result_status",
+                    models.PositiveSmallIntegerField(blank=True, null=True),
+                ),
+                ("last_error", models.TextField(blank=True, default="")),
+                (
+                    "claimed_by",
+                    models.CharField(blank=True, default="", max_length=255),
+                ),
+                ("claimed_at", models.DateTimeField(blank=True, null=True)),
+                ("received_at", models.DateTimeField(auto_now_add=True)),
+                ("processed_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "recipient",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="queued_activities",
+                        to="authorApp.authorprofile",
+                    ),
+                ),
+                (
+                    "sender_node",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="inbox_activities",
+                        to="node_link.node",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["status", "received_at"], name="inbox_queue_idx"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.1.1 on 2026-10-18 19:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authorApp", "0013_authorprofile_remote_fingerprint"),
+        ("node_link", "0013_inboxactivity"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SeenActivity",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("activity_key", models.CharField(max_length=64)),
+                ("activity_id", models.TextField()),
+                ("content_hash", models.CharField(max_length=64)),
+                ("replays", models.PositiveIntegerField(default=0)),
+                ("first_seen_at", models.DateTimeField(auto_now_add=True)),
+                ("last_seen_at", models.DateTimeField(auto_now=True)),
+                (
+                    "recipient",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="seen_activities",
+                        to="authorApp.authorprofile",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["last_seen_at"], name="seen_activity_age_idx")
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("recipient", "activity_key"),
+                        name="unique_seen_activity",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.1 on 2026-10-18 19:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authorApp", "0013_authorprofile_remote_fingerprint"),
+        ("node_link", "0014_seenactivity"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["notification_type", "related_object_id", "user"],
+                name="notification_lookup_idx",
+            ),
+        ),
+    ]
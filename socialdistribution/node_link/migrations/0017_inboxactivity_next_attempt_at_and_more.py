@@ -0,0 +1,26 @@
+# Generated by Django 5.1.1 on 2026-10-18 21:01
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authorApp", "0014_authorprofile_github_etag_and_more"),
+        ("node_link", "0016_timelineentry"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="inboxactivity",
+            name="next_attempt_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name="inboxactivity",
+            index=models.Index(
+                fields=["status", "next_attempt_at"], name="inbox_due_idx"
+            ),
+        ),
+    ]
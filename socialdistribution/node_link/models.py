@@ -1,5 +1,7 @@
 from django.db import models
 from datetime import datetime
+import math
+import uuid
 from django.contrib.auth.hashers import make_password, check_password
 
 # from encrypted_model_fields.fields import EncryptedCharField  # for encrypted raw password
@@ -32,6 +34,28 @@ class Node(models.Model):
 
     is_remote = models.BooleanField(default=False)
 
+    # health of outbound traffic to this node, maintained by node_link/utils/circuit_breaker.py
+    BREAKER_CHOICES = [
+        ("c", "Closed"),
+        ("o", "Open"),
+        ("h", "Half-open"),
+    ]
+    breaker_state = models.CharField(max_length=1, choices=BREAKER_CHOICES, default="c")
+    breaker_opened_at = models.DateTimeField(null=True, blank=True)
+    consecutive_failures = models.PositiveIntegerField(default=0)
+    last_success_at = models.DateTimeField(null=True, blank=True)
+    last_failure_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default="")
+    # rolling window of the most recent request latencies in milliseconds
+    recent_latencies_ms = models.JSONField(default=list, blank=True)
+
+    # largest batch the node's `inbox/batch/` endpoint accepts, 0 if it has none
+    batch_inbox_max_items = models.PositiveIntegerField(default=0)
+    # when the node's authors were last crawled completely by `fetch_remote_authors`
+    authors_synced_at = models.DateTimeField(null=True, blank=True)
+    # ETag/Last-Modified of every page of the node's `authors/` endpoint, for conditional requests
+    author_page_validators = models.JSONField(default=dict, blank=True)
+
     def set_password(self, raw_password):
         self.raw_password = raw_password
         self.password = make_password(raw_password)
@@ -56,6 +80,33 @@ class Node(models.Model):
     def is_authenticated(self):
         return True
 
+    @property
+    def supports_batch_inbox(self):
+        return self.batch_inbox_max_items > 1
+
+    @property
+    def batch_inbox_url(self):
+        return self.url.rstrip("/") + "/inbox/batch/"
+
+    def latency_percentile(self, percentile):
+        """
+        Latency (ms) under which `percentile` percent of the recent requests completed.
+        """
+        if not self.recent_latencies_ms:
+            return None
+        latencies = sorted(self.recent_latencies_ms)
+        # nearest-rank percentile
+        index = max(0, math.ceil(len(latencies) * percentile / 100) - 1)
+        return latencies[index]
+
+    @property
+    def latency_p50(self):
+        return self.latency_percentile(50)
+
+    @property
+    def latency_p95(self):
+        return self.latency_percentile(95)
+
 
 class Notification(models.Model):
     user = models.ForeignKey(
@@ -74,5 +125,192 @@ class Notification(models.Model):
     follow_request_message = models.TextField(null=True, blank=True)
     link_url = models.URLField(null=True, blank=True)  # url to the related object
 
+    class Meta:
+        indexes = [
+            # the signals find a notification by type and related object (and user);
+            # listing a user's notifications uses the user foreign key index
+            models.Index(
+                fields=["notification_type", "related_object_id", "user"],
+                name="notification_lookup_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.user.user.username} - {self.message}"
+
+
+class OutboxActivity(models.Model):
+    """
+    A federated activity (post, like, comment, follow) queued for delivery to remote inboxes.
+    The JSON payload is stored once and shared by all of its deliveries.
+    """
+
+    payload = models.JSONField()
+    activity_type = models.CharField(max_length=32, blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.activity_type or 'activity'} #{self.pk}"
+
+
+class OutboxDelivery(models.Model):
+    """
+    One pending push of an OutboxActivity to a single remote author's inbox.
+    Claimed and sent by the `process_outbox` management command.
+    """
+
+    STATUS_CHOICES = [
+        ("p", "Pending"),
+        ("i", "In flight"),
+        ("s", "Sent"),
+        ("f", "Failed"),
+    ]
+
+    activity = models.ForeignKey(
+        OutboxActivity, on_delete=models.CASCADE, related_name="deliveries"
+    )
+    recipient = models.ForeignKey(
+        AuthorProfile, on_delete=models.CASCADE, related_name="inbox_deliveries"
+    )
+    node = models.ForeignKey(
+        Node, on_delete=models.CASCADE, related_name="outbox_deliveries"
+    )
+    inbox_url = models.TextField()
+    status = models.CharField(max_length=1, choices=STATUS_CHOICES, default="p")
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default="")
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    # worker that currently holds the delivery and when it was claimed
+    claimed_by = models.CharField(max_length=255, blank=True, default="")
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="outbox_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.inbox_url} ({self.get_status_display()})"
+
+
+class InboxActivity(models.Model):
+    """
+    A raw activity received by an inbox in asynchronous mode (INBOX_ASYNC), stored as-is
+    and applied later by the `process_inbox` management command.
+    """
+
+    STATUS_CHOICES = [
+        ("p", "Pending"),
+        ("i", "In progress"),
+        ("d", "Done"),
+        ("f", "Failed"),
+    ]
+
+    recipient = models.ForeignKey(
+        AuthorProfile, on_delete=models.CASCADE, related_name="queued_activities"
+    )
+    sender_node = models.ForeignKey(
+        Node,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="inbox_activities",
+    )
+    activity_type = models.CharField(max_length=32)
+    payload = models.JSONField()
+    status = models.CharField(max_length=1, choices=STATUS_CHOICES, default="p")
+    attempts = models.PositiveIntegerField(default=0)
+    # HTTP status the activity would have been answered with in synchronous mode
+    result_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default="")
+    claimed_by = models.CharField(max_length=255, blank=True, default="")
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    # a failed activity is retried with exponential backoff, like outbox deliveries
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "received_at"], name="inbox_queue_idx"),
+            models.Index(fields=["status", "next_attempt_at"], name="inbox_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.activity_type} for {self.recipient_id} ({self.get_status_display()})"
+
+
+class SeenActivity(models.Model):
+    """
+    An activity an inbox has already applied, so that a retried or resent copy
+    can be dropped before any serializer runs.
+    """
+
+    recipient = models.ForeignKey(
+        AuthorProfile, on_delete=models.CASCADE, related_name="seen_activities"
+    )
+    # sha256 of the activity type and id: fixed length, so the unique index stays small
+    activity_key = models.CharField(max_length=64)
+    activity_id = models.TextField()
+    # hash of the whole activity; an edited post keeps its id but changes this
+    content_hash = models.CharField(max_length=64)
+    replays = models.PositiveIntegerField(default=0)
+    first_seen_at = models.DateTimeField(auto_now_add=True)
+    last_seen_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["recipient", "activity_key"], name="unique_seen_activity"
+            )
+        ]
+        indexes = [models.Index(fields=["last_seen_at"], name="seen_activity_age_idx")]
+
+    def __str__(self):
+        return str(self.activity_id)
+
+
+class TimelineEntry(models.Model):
+    """
+    A post on the home timeline of a local author, written when the post or the
+    follow/friend state that makes it visible changes (fan-out on write).
+    """
+
+    owner = models.ForeignKey(
+        AuthorProfile, on_delete=models.CASCADE, related_name="timeline"
+    )
+    post = models.ForeignKey(
+        "postApp.Post", on_delete=models.CASCADE, related_name="timeline_entries"
+    )
+    # copy of post.updated_at, the order of the home page
+    sort_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["owner", "post"], name="unique_timeline_entry"
+            )
+        ]
+        indexes = [
+            models.Index(fields=["owner", "-sort_at", "-id"], name="timeline_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.post_id} on the timeline of {self.owner_id}"
+
+
+class CacheVersion(models.Model):
+    """
+    Version of one scope of cached API responses (node_link/utils/response_cache.py),
+    replaced in the same transaction as any change to the rows the responses show.
+    Kept in the database so every process agrees on it, whatever the cache backend.
+    """
+
+    # e.g. "authors", "author:<id>", "posts:<author id>", "post:<id>"
+    scope = models.CharField(max_length=64, primary_key=True)
+    version = models.UUIDField(default=uuid.uuid4)
+
+    def __str__(self):
+        return f"{self.scope} at {self.version}"
@@ -3,31 +3,41 @@
 from django.db.models.signals import post_save, post_delete, pre_save
 from django.dispatch import receiver
 from django.urls import reverse
-from node_link.models import Notification
-from authorApp.models import Follower, User, AuthorProfile
-from postApp.models import Post, Like
+from node_link.models import Node, Notification
+from node_link.utils.node_client import drop_client
+from node_link.utils import response_cache, social_graph, timeline
+from authorApp.models import Follower, Friends, User, AuthorProfile
+from postApp.models import Comment, CommentLike, Post, Like
+from postApp.utils.counters import adjust
 from django.db.models import Q, CharField
 from django.db.models.functions import Cast
 
 
+def new_post_notifications(post, followers):
+    """
+    Unsaved notifications telling `followers` (Follower rows) about a new post.
+    """
+    author = post.author
+    message = f"{author.user.display_name} has made a new post."
+    link_url = reverse("postApp:post_detail", args=[author.user.username, post.uuid])
+    return [
+        Notification(
+            user_id=follower.actor_id,
+            message=message,
+            notification_type="new_post",
+            related_object_id=str(post.id),
+            author_picture_url=author.user.profileImage,
+            link_url=link_url,
+        )
+        for follower in followers
+    ]
+
+
 @receiver(post_save, sender=Post)
 def notify_followers_on_new_post(sender, instance, created, **kwargs):
     if created:
-        author = instance.author
-        followers = Follower.objects.filter(object=author)
-        for follower in followers:
-            message = f"{author.user.display_name} has made a new post."
-            link_url = reverse(
-                "postApp:post_detail", args=[author.user.username, instance.uuid]
-            )
-            Notification.objects.create(
-                user=follower.actor,
-                message=message,
-                notification_type="new_post",
-                related_object_id=str(instance.id),
-                author_picture_url=author.user.profileImage,
-                link_url=link_url,
-            )
+        followers = Follower.objects.filter(object=instance.author)
+        Notification.objects.bulk_create(new_post_notifications(instance, followers))
 
 
 @receiver(post_save, sender=Follower)
@@ -87,54 +97,95 @@ def update_notifications_on_profile_image_change(sender, instance, **kwargs):
     new_image = instance.profileImage
 
     if old_image != new_image:
-        author_profile = instance.author_profile
+        update_notification_pictures(instance, new_image)
 
-        # Update the author's own notifications
-        Notification.objects.filter(user__user=instance).update(
-            author_picture_url=new_image
-        )
 
-        # # Get follower IDs and cast them to strings in the database query
-        # follower_ids = Follower.objects.filter(actor=author_profile).values_list(
-        #     "id", flat=True
-        # )
+def update_notification_pictures(user, new_image):
+    """
+    Point the notifications about `user` at their new profile image.
+    Also called by bulk imports, which do not send `pre_save`.
+    """
+    author_profile = user.author_profile
 
-        # Cast the Follower IDs to CharField to match the TextField type
-        follower_ids_str = (
-            Follower.objects.filter(actor=author_profile)
-            .annotate(id_str=Cast("id", output_field=CharField()))
-            .values_list("id_str", flat=True)
-        )
+    # Update the author's own notifications
+    Notification.objects.filter(user__user=user).update(author_picture_url=new_image)
 
-        # Update Notifications
-        Notification.objects.filter(
-            Q(notification_type="pending_follow_request")
-            | Q(notification_type="accepted_follow_request")
-            | Q(notification_type="denied_follow_request"),
-            related_object_id__in=follower_ids_str,
-        ).update(author_picture_url=new_image)
+    # # Get follower IDs and cast them to strings in the database query
+    # follower_ids = Follower.objects.filter(actor=author_profile).values_list(
+    #     "id", flat=True
+    # )
+
+    # Cast the Follower IDs to CharField to match the TextField type
+    follower_ids_str = (
+        Follower.objects.filter(actor=author_profile)
+        .annotate(id_str=Cast("id", output_field=CharField()))
+        .values_list("id_str", flat=True)
+    )
+
+    # Update Notifications
+    Notification.objects.filter(
+        Q(notification_type="pending_follow_request")
+        | Q(notification_type="accepted_follow_request")
+        | Q(notification_type="denied_follow_request"),
+        related_object_id__in=follower_ids_str,
+    ).update(author_picture_url=new_image)
 
 
 @receiver(post_save, sender=Like)
 def notify_author_on_new_like(sender, instance, created, **kwargs):
     print("Like signal triggered")
     if created:
-        post = instance.post
-        author = instance.author
-        if post.author != author:
+        notification = like_notification(instance)
+        if notification:
             print("Like created, notifying author via notification")
-            message = f"{author.user.display_name} liked your post."
-            link_url = reverse(
-                "postApp:post_detail", args=[author.user.username, post.uuid]
-            )
-            Notification.objects.create(
-                user=post.author,  # Use post.author (AuthorProfile)
-                message=message,
-                notification_type="like",
-                related_object_id=str(instance.id),
-                author_picture_url=author.user.profileImage,
-                link_url=link_url,
-            )
+            notification.save()
+
+
+def like_notification(like):
+    """
+    The (unsaved) notification telling the post's author about `like`, or None for a self-like.
+    Also used by bulk imports, which do not send `post_save`.
+    """
+    post = like.post
+    author = like.author
+    if post.author_id == author.id:
+        return None
+    message = f"{author.user.display_name} liked your post."
+    link_url = reverse("postApp:post_detail", args=[author.user.username, post.uuid])
+    return Notification(
+        user=post.author,  # Use post.author (AuthorProfile)
+        message=message,
+        notification_type="like",
+        related_object_id=str(like.id),
+        author_picture_url=author.user.profileImage,
+        link_url=link_url,
+    )
+
+
+@receiver(post_save, sender=Like)
+@receiver(post_save, sender=Comment)
+def count_new_child(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        field = "like_count" if sender is Like else "comment_count"
+        adjust(Post, instance.post_id, **{field: 1})
+
+
+@receiver(post_delete, sender=Like)
+@receiver(post_delete, sender=Comment)
+def count_deleted_child(sender, instance, **kwargs):
+    field = "like_count" if sender is Like else "comment_count"
+    adjust(Post, instance.post_id, **{field: -1})
+
+
+@receiver(post_save, sender=CommentLike)
+def count_new_comment_like(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        adjust(Comment, instance.comment_id, like_count=1)
+
+
+@receiver(post_delete, sender=CommentLike)
+def count_deleted_comment_like(sender, instance, **kwargs):
+    adjust(Comment, instance.comment_id, like_count=-1)
 
 
 @receiver(post_delete, sender=Like)
@@ -166,3 +217,113 @@ def delete_notifications_on_post_delete(sender, instance, **kwargs):
         related_object_id=str(instance.id),
         user=instance.author,
     ).delete()
+
+
+@receiver(post_save, sender=Post)
+def update_timelines_on_post_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        timeline.refresh_post(instance)
+
+
+@receiver(post_save, sender=Follower)
+def update_timeline_on_follow_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        timeline.refresh_pair(instance.actor, instance.object)
+
+
+@receiver(post_delete, sender=Follower)
+def update_timeline_on_follow_delete(sender, instance, **kwargs):
+    timeline.refresh_pair(instance.actor, instance.object, add=False)
+
+
+@receiver(post_save, sender=Friends)
+def update_timelines_on_friendship(sender, instance, raw=False, **kwargs):
+    if not raw:
+        timeline.refresh_pair(instance.user1, instance.user2)
+        timeline.refresh_pair(instance.user2, instance.user1)
+
+
+@receiver(post_delete, sender=Friends)
+def update_timelines_on_unfriend(sender, instance, **kwargs):
+    timeline.refresh_pair(instance.user1, instance.user2, add=False)
+    timeline.refresh_pair(instance.user2, instance.user1, add=False)
+
+
+@receiver(post_save, sender=Follower)
+@receiver(post_delete, sender=Follower)
+def invalidate_graph_on_follow_change(sender, instance, **kwargs):
+    social_graph.invalidate(instance.actor_id, instance.object_id)
+
+
+@receiver(post_save, sender=Friends)
+@receiver(post_delete, sender=Friends)
+def invalidate_graph_on_friendship_change(sender, instance, **kwargs):
+    social_graph.invalidate(instance.user1_id, instance.user2_id)
+
+
+@receiver(post_save, sender=AuthorProfile)
+@receiver(post_delete, sender=AuthorProfile)
+def invalidate_graph_of_new_author(sender, instance, created=True, **kwargs):
+    # a new author may reuse the id of a deleted one
+    if created:
+        social_graph.invalidate(instance.id)
+
+
+@receiver(post_save, sender=AuthorProfile)
+def build_timeline_for_new_author(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and timeline.is_local(instance):
+        timeline.rebuild_timeline(instance)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_cached_post(sender, instance, **kwargs):
+    response_cache.invalidate(
+        response_cache.post_scope(instance.pk),
+        response_cache.posts_scope(instance.author_id),
+    )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=Like)
+@receiver(post_delete, sender=Like)
+def invalidate_cached_post_of_child(sender, instance, **kwargs):
+    response_cache.invalidate_posts([instance.post_id])
+
+
+@receiver(post_save, sender=CommentLike)
+@receiver(post_delete, sender=CommentLike)
+def invalidate_cached_post_of_comment_like(sender, instance, **kwargs):
+    response_cache.invalidate_posts(comment_ids=[instance.comment_id])
+
+
+# posts embed their author
+@receiver(post_save, sender=AuthorProfile)
+@receiver(post_delete, sender=AuthorProfile)
+def invalidate_cached_author(sender, instance, **kwargs):
+    response_cache.invalidate(
+        response_cache.AUTHORS, response_cache.author_scope(instance.pk)
+    )
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_author_of_user(sender, instance, **kwargs):
+    profiles = AuthorProfile.objects.filter(user_id=instance.pk)
+    response_cache.invalidate(
+        response_cache.AUTHORS,
+        *map(response_cache.author_scope, profiles.values_list("pk", flat=True)),
+    )
+
+
+# every author and post embeds its node
+@receiver(post_save, sender=Node)
+@receiver(post_delete, sender=Node)
+def invalidate_cached_node(sender, instance, **kwargs):
+    response_cache.invalidate(response_cache.EVERYTHING)
+
+
+@receiver(post_delete, sender=Node)
+def close_client_on_node_delete(sender, instance, **kwargs):
+    drop_client(instance.pk)
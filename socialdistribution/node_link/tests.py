@@ -1,15 +1,46 @@
 # node_link/tests.py
 
 from django.test import TestCase, Client
+from django.core.cache import cache
 from django.urls import reverse
+from django.core.management import call_command
 from django.contrib.auth import get_user_model
 from django.utils import timezone
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from datetime import timedelta
+import io
+import threading
+import time
+from unittest import mock
+import requests
 from rest_framework.test import APITestCase
 from rest_framework import status  # You can keep this if you're using DRF status codes
 
 from authorApp.models import AuthorProfile, Friends, Follower
 from postApp.models import Post
-from node_link.models import Node, Notification
+from node_link.models import (
+    Node,
+    Notification,
+    OutboxActivity,
+    OutboxDelivery,
+    TimelineEntry,
+)
+from node_link.utils import circuit_breaker
+from node_link.utils.communication import queue_for_remote_inboxes
+from node_link.utils.fanout import plan_post_fanout, send_to_authors
+from node_link.utils.fanout_executor import deliver_all, summarize
+from node_link.utils.node_client import drop_client, get_client
+from node_link.utils.fetch_remote_authors import (
+    active_remote_nodes,
+    fetch_remote_authors,
+    process_authors,
+)
+from node_link.utils.outbox import process_outbox
+from node_link.utils.index_benchmark import SEEDED_TABLES, check_indexes
+from node_link.utils import social_graph as graph_cache
+from node_link.utils.social_graph import social_graph
+from node_link.utils.timeline import home_timeline
 
 User = get_user_model()
 
@@ -270,3 +301,778 @@ class HomeViewTestCase(TestCase):
 
         post_ids = response.context["all_ids"]
         self.assertIn(self.post_user1.uuid, post_ids)
+
+    def test_timeline_follows_post_and_follow_changes(self):
+        def timeline():
+            return home_timeline(self.author_profile2)[0]
+
+        # user2 does not follow user3, so the unlisted post is not there
+        self.assertNotIn(self.post_unlisted.uuid, timeline())
+
+        follow = Follower.objects.create(
+            actor=self.author_profile2,
+            object=self.author_profile3,
+            status="a",
+            created_by=self.author_profile2,
+        )
+        self.assertIn(self.post_unlisted.uuid, timeline())
+
+        follow.delete()
+        self.assertNotIn(self.post_unlisted.uuid, timeline())
+
+        self.post_public.visibility = "d"
+        self.post_public.save()
+        self.assertNotIn(self.post_public.uuid, timeline())
+
+    def test_timeline_is_newest_first_and_limited(self):
+        self.post_public.updated_at = timezone.now() + timedelta(minutes=1)
+        self.post_public.save()
+
+        self.assertEqual(
+            home_timeline(self.author_profile1, limit=1)[0], [self.post_public.uuid]
+        )
+
+    def test_rebuild_matches_incremental_timeline(self):
+        before = home_timeline(self.author_profile1)
+        TimelineEntry.objects.all().delete()
+
+        call_command("rebuild_timelines", stdout=io.StringIO())
+
+        self.assertEqual(home_timeline(self.author_profile1), before)
+
+    @mock.patch("node_link.utils.timeline.TIMELINE_LENGTH", 2)
+    def test_home_stream_pages_with_a_cursor(self):
+        self.client.login(username="user1", password="password1")
+        response = self.client.get(
+            reverse("node_link:home", kwargs={"username": "user1"})
+        )
+        seen = list(response.context["all_ids"])
+        cursor = response.context["next_cursor"]
+        self.assertEqual(len(seen), 2)
+
+        while cursor:
+            response = self.client.get(
+                reverse("node_link:home_stream", kwargs={"username": "user1"}),
+                {"cursor": cursor},
+            )
+            self.assertEqual(response.status_code, 200)
+            seen.extend(response.context["all_ids"])
+            cursor = response.context["next_cursor"]
+
+        # every visible post exactly once, newest first
+        timeline = TimelineEntry.objects.filter(owner=self.author_profile1)
+        self.assertEqual(
+            seen,
+            list(
+                timeline.order_by("-sort_at", "-id").values_list(
+                    "post__uuid", flat=True
+                )
+            ),
+        )
+        self.assertEqual(len(seen), 4)
+
+    def test_home_stream_rejects_invalid_cursor(self):
+        self.client.login(username="user1", password="password1")
+        response = self.client.get(
+            reverse("node_link:home_stream", kwargs={"username": "user1"}),
+            {"cursor": "not-a-cursor"},
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class OutboxTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="localuser",
+            password="password",
+            display_name="Local User",
+            user_serial="localuser",
+            is_approved=True,
+        )
+        self.local_node = Node.objects.create(
+            url="http://testserver/api/", created_by=self.user, is_remote=False
+        )
+        self.remote_node = Node.objects.create(
+            url="http://remote-node.com/api/",
+            username="remote_node_user",
+            raw_password="remote_node_pass",
+            is_remote=True,
+            created_by=self.user,
+        )
+        self.user.local_node = self.local_node
+        self.user.save()
+        self.author = AuthorProfile.objects.create(user=self.user)
+
+        self.remote_user = User.objects.create_user(
+            username="remote-node_com__remoteuser",
+            password="password",
+            display_name="Remote User",
+            user_serial="remoteuser",
+            local_node=self.remote_node,
+        )
+        self.remote_author = AuthorProfile.objects.create(user=self.remote_user)
+
+    def test_queue_only_targets_remote_authors(self):
+        activity = queue_for_remote_inboxes(
+            {"type": "post"}, [self.author, self.remote_author]
+        )
+
+        self.assertEqual(OutboxActivity.objects.count(), 1)
+        delivery = activity.deliveries.get()
+        self.assertEqual(delivery.recipient, self.remote_author)
+        self.assertEqual(delivery.inbox_url, f"{self.remote_author.fqid}/inbox")
+        self.assertEqual(delivery.status, "p")
+
+    def test_queue_without_remote_recipients(self):
+        self.assertIsNone(queue_for_remote_inboxes({"type": "post"}, [self.author]))
+        self.assertEqual(OutboxActivity.objects.count(), 0)
+
+    @mock.patch("requests.Session.request", autospec=True)
+    def test_process_outbox_success(self, mock_request):
+        mock_request.return_value = mock.Mock(status_code=201)
+        queue_for_remote_inboxes({"type": "post"}, [self.remote_author])
+
+        summary = process_outbox()
+
+        self.assertEqual(summary["sent"], 1)
+        delivery = OutboxDelivery.objects.get()
+        self.assertEqual(delivery.status, "s")
+        self.assertEqual(delivery.attempts, 1)
+        self.assertIsNotNone(delivery.delivered_at)
+        session, method, url = mock_request.call_args[0]
+        self.assertEqual((method, url), ("POST", f"{self.remote_author.fqid}/inbox"))
+        self.assertEqual(session.auth, ("remote_node_user", "remote_node_pass"))
+        self.assertEqual(session.headers["X-original-host"], self.local_node.url)
+
+    @mock.patch("requests.Session.request", autospec=True)
+    def test_process_outbox_failure_is_retried_later(self, mock_request):
+        mock_request.side_effect = requests.exceptions.ConnectionError("node down")
+        queue_for_remote_inboxes({"type": "post"}, [self.remote_author])
+
+        summary = process_outbox()
+
+        self.assertEqual(summary["retry"], 1)
+        delivery = OutboxDelivery.objects.get()
+        self.assertEqual(delivery.status, "p")
+        self.assertEqual(delivery.attempts, 1)
+        self.assertIn("node down", delivery.last_error)
+        self.assertGreater(delivery.next_attempt_at, timezone.now())
+
+        # not due yet, so nothing is claimed
+        self.assertEqual(process_outbox()["claimed"], 0)
+
+    @mock.patch("requests.Session.request", autospec=True)
+    def test_process_outbox_gives_up_on_permanent_client_errors(self, mock_request):
+        def respond(status_code):
+            response = requests.Response()
+            response.status_code = status_code
+            return response
+
+        queue_for_remote_inboxes({"type": "post"}, [self.remote_author])
+        mock_request.return_value = respond(429)
+        self.assertEqual(process_outbox()["retry"], 1)
+
+        OutboxDelivery.objects.update(next_attempt_at=timezone.now())
+        mock_request.return_value = respond(404)
+        self.assertEqual(process_outbox()["failed"], 1)
+        delivery = OutboxDelivery.objects.get()
+        self.assertEqual(delivery.status, "f")
+        self.assertEqual(delivery.attempts, 2)
+
+
+class NodeClientTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="admin", password="password", display_name="Admin"
+        )
+        self.node = Node.objects.create(
+            url="http://remote-node.com/api/",
+            username="remote_node_user",
+            raw_password="remote_node_pass",
+            is_remote=True,
+            created_by=self.user,
+        )
+
+    def tearDown(self):
+        drop_client(self.node.pk)
+
+    def test_client_is_reused_per_node(self):
+        self.assertIs(get_client(self.node), get_client(self.node))
+
+    def test_client_is_rebuilt_when_credentials_change(self):
+        client = get_client(self.node)
+        self.node.raw_password = "new_pass"
+
+        new_client = get_client(self.node)
+
+        self.assertIsNot(client, new_client)
+        self.assertEqual(new_client.session.auth, ("remote_node_user", "new_pass"))
+
+
+class CircuitBreakerTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="localuser",
+            password="password",
+            display_name="Local User",
+            user_serial="localuser",
+        )
+        self.node = Node.objects.create(
+            url="http://remote-node.com/api/", is_remote=True, created_by=self.user
+        )
+        remote_user = User.objects.create_user(
+            username="remote-node_com__remoteuser",
+            password="password",
+            display_name="Remote User",
+            user_serial="remoteuser",
+            local_node=self.node,
+        )
+        self.remote_author = AuthorProfile.objects.create(user=remote_user)
+
+    def open_breaker(self, opened_seconds_ago=0):
+        Node.objects.filter(pk=self.node.pk).update(
+            breaker_state="o",
+            breaker_opened_at=timezone.now() - timedelta(seconds=opened_seconds_ago),
+            consecutive_failures=circuit_breaker.FAILURE_THRESHOLD,
+        )
+
+    def test_breaker_opens_after_consecutive_failures(self):
+        for _ in range(circuit_breaker.FAILURE_THRESHOLD - 1):
+            circuit_breaker.record_failure(self.node, "timeout", 10000)
+        self.assertTrue(circuit_breaker.allow_request(self.node))
+
+        circuit_breaker.record_failure(self.node, "timeout", 10000)
+
+        self.assertFalse(circuit_breaker.allow_request(self.node))
+        self.node.refresh_from_db()
+        self.assertEqual(self.node.breaker_state, "o")
+        self.assertEqual(self.node.latency_p50, 10000)
+
+    def test_failures_from_stale_copies_all_count(self):
+        # every worker holds its own copy of the node, loaded before any failure
+        copies = [
+            Node.objects.get(pk=self.node.pk)
+            for _ in range(circuit_breaker.FAILURE_THRESHOLD)
+        ]
+        for copy in copies:
+            circuit_breaker.record_failure(copy, "timeout")
+
+        self.node.refresh_from_db()
+        self.assertEqual(
+            self.node.consecutive_failures, circuit_breaker.FAILURE_THRESHOLD
+        )
+        self.assertEqual(self.node.breaker_state, "o")
+
+    def test_half_open_lets_one_probe_through(self):
+        self.open_breaker(opened_seconds_ago=circuit_breaker.RESET_SECONDS + 1)
+
+        self.assertTrue(circuit_breaker.allow_request(self.node))
+        self.assertFalse(
+            circuit_breaker.allow_request(Node.objects.get(pk=self.node.pk))
+        )
+
+        circuit_breaker.record_success(self.node, 40)
+        self.node.refresh_from_db()
+        self.assertEqual(self.node.breaker_state, "c")
+        self.assertEqual(self.node.consecutive_failures, 0)
+
+    def test_lost_probe_does_not_block_the_node(self):
+        # the worker sending the probe died without recording its outcome
+        Node.objects.filter(pk=self.node.pk).update(
+            breaker_state="h",
+            breaker_opened_at=timezone.now() - timedelta(days=3),
+        )
+
+        self.assertTrue(circuit_breaker.allow_request(self.node))
+        self.assertFalse(
+            circuit_breaker.allow_request(Node.objects.get(pk=self.node.pk))
+        )
+
+    def test_unexpected_error_ends_the_probe(self):
+        self.open_breaker(opened_seconds_ago=circuit_breaker.RESET_SECONDS + 1)
+
+        def send():
+            raise AttributeError("'list' object has no attribute 'get'")
+
+        with self.assertRaises(AttributeError):
+            circuit_breaker.guarded_request(self.node, send)
+        self.node.refresh_from_db()
+        self.assertEqual(self.node.breaker_state, "o")
+
+    def test_latency_percentiles(self):
+        self.node.recent_latencies_ms = list(range(1, 101))
+
+        self.assertEqual(self.node.latency_p50, 50)
+        self.assertEqual(self.node.latency_p95, 95)
+
+    @mock.patch("requests.Session.request", autospec=True)
+    def test_outbox_defers_deliveries_to_open_node(self, mock_request):
+        self.open_breaker()
+        queue_for_remote_inboxes({"type": "post"}, [self.remote_author])
+
+        summary = process_outbox()
+
+        self.assertEqual(summary["deferred"], 1)
+        mock_request.assert_not_called()
+        delivery = OutboxDelivery.objects.get()
+        self.assertEqual(delivery.status, "p")
+        self.assertEqual(delivery.attempts, 0)
+        self.assertGreater(delivery.next_attempt_at, timezone.now())
+
+
+class FanoutExecutorTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="localuser",
+            password="password",
+            display_name="Local User",
+            user_serial="localuser",
+        )
+        self.node = Node.objects.create(
+            url="http://remote-node.com/api/", is_remote=True, created_by=self.user
+        )
+        self.remote_authors = []
+        for i in range(10):
+            remote_user = User.objects.create_user(
+                username=f"remote-node_com__follower{i}",
+                password="password",
+                display_name=f"Follower {i}",
+                user_serial=f"follower{i}",
+                local_node=self.node,
+            )
+            self.remote_authors.append(AuthorProfile.objects.create(user=remote_user))
+
+    def jobs(self):
+        return [
+            (author, f"{author.fqid}/inbox", self.node, {"type": "post"})
+            for author in self.remote_authors
+        ]
+
+    @mock.patch("requests.Session.request", autospec=True)
+    def test_deliveries_are_sent_in_parallel_within_node_limit(self, mock_request):
+        lock = threading.Lock()
+        in_flight = [0, 0]  # current, highest
+
+        def slow_request(*args, **kwargs):
+            with lock:
+                in_flight[0] += 1
+                in_flight[1] = max(in_flight)
+            time.sleep(0.2)
+            with lock:
+                in_flight[0] -= 1
+            return mock.Mock(status_code=201)
+
+        mock_request.side_effect = slow_request
+
+        start = time.monotonic()
+        results = deliver_all(self.jobs(), concurrency=32, per_node=5)
+        elapsed = time.monotonic() - start
+
+        self.assertEqual(summarize(results)["sent"], 10)
+        self.assertEqual(in_flight[1], 5)
+        # two rounds of 5 instead of 10 sequential requests
+        self.assertLess(elapsed, 1.5)
+        self.assertEqual([r.key for r in results], self.remote_authors)
+
+    @mock.patch("requests.Session.request", autospec=True)
+    def test_failed_direct_deliveries_are_queued_for_retry(self, mock_request):
+        mock_request.side_effect = requests.exceptions.ConnectionError("node down")
+
+        results = send_to_authors({"type": "post"}, self.remote_authors[:2])
+
+        self.assertEqual(summarize(results)["failed"], 2)
+        self.assertEqual(
+            OutboxDelivery.objects.filter(status="p").count(), len(results)
+        )
+
+    @mock.patch("requests.Session.request", autospec=True)
+    def test_batch_inbox_is_used_when_node_supports_it(self, mock_request):
+        self.node.batch_inbox_max_items = 4
+        mock_request.side_effect = (
+            lambda session, method, url, json, **kwargs: mock.Mock(
+                status_code=200,
+                json=lambda: {
+                    "items": [
+                        {"index": i, "status": 201 if i else 400, "body": {}}
+                        for i in range(len(json["items"]))
+                    ]
+                },
+            )
+        )
+
+        results = deliver_all(self.jobs())
+
+        # 10 deliveries in batches of 4, 4 and 2
+        self.assertEqual(mock_request.call_count, 3)
+        self.assertEqual(
+            {call[0][2] for call in mock_request.call_args_list},
+            {"http://remote-node.com/api/inbox/batch/"},
+        )
+        first_batch = mock_request.call_args_list[0][1]["json"]["items"]
+        self.assertEqual(first_batch[0]["author"], self.remote_authors[0].fqid)
+        self.assertEqual(summarize(results), {"sent": 7, "failed": 3, "skipped": 0})
+
+    @mock.patch("requests.Session.request", autospec=True)
+    def test_malformed_batch_replies_fail_their_items(self, mock_request):
+        self.node.batch_inbox_max_items = 10
+        mock_request.return_value = mock.Mock(
+            status_code=200, json=lambda: {"items": ["ok"] * 10}
+        )
+
+        results = deliver_all(self.jobs())
+
+        self.assertEqual(summarize(results)["failed"], 10)
+        self.assertTrue(all(result.node_failed for result in results))
+
+
+class RemoteAuthorSyncTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="admin", password="password", display_name="Admin"
+        )
+        Node.objects.create(
+            url="http://testserver/api/", is_remote=False, created_by=self.user
+        )
+        self.stale_node = Node.objects.create(
+            url="http://stale-node.com/api/", is_remote=True, created_by=self.user
+        )
+        self.fresh_node = Node.objects.create(
+            url="http://fresh-node.com/api/",
+            is_remote=True,
+            created_by=self.user,
+            authors_synced_at=timezone.now(),
+        )
+
+    @mock.patch("requests.Session.request", autospec=True)
+    def test_only_stale_nodes_are_synced(self, mock_request):
+        mock_request.return_value = mock.Mock(
+            status_code=200,
+            headers={},
+            json=lambda: {"type": "authors", "authors": []},
+        )
+
+        self.assertEqual(fetch_remote_authors(stale_only=True), 1)
+
+        urls = {call[0][2] for call in mock_request.call_args_list}
+        self.assertEqual(urls, {"http://stale-node.com/api/authors/"})
+        self.stale_node.refresh_from_db()
+        self.assertIsNotNone(self.stale_node.authors_synced_at)
+
+    def author_page(self, serials, display_name="Remote"):
+        return [
+            {
+                "type": "author",
+                "id": f"{self.stale_node.url}authors/{serial}",
+                "host": self.stale_node.url,
+                "displayName": f"{display_name} {serial}",
+                "github": "",
+                "profileImage": "http://stale-node.com/static/avatar.png",
+            }
+            for serial in serials
+        ]
+
+    def test_page_import_query_count_does_not_grow(self):
+        nodes = active_remote_nodes()
+        with CaptureQueriesContext(connection) as small:
+            process_authors(
+                self.author_page(range(3)),
+                "http://testserver/api",
+                self.stale_node,
+                nodes,
+            )
+        with CaptureQueriesContext(connection) as large:
+            summary = process_authors(
+                self.author_page(range(3, 53)),
+                "http://testserver/api",
+                self.stale_node,
+                nodes,
+            )
+
+        self.assertEqual(summary, {"created": 50, "updated": 0, "unchanged": 0})
+        self.assertLessEqual(len(large), len(small))
+        author = AuthorProfile.objects.get(fqid="http://stale-node.com/api/authors/7")
+        self.assertEqual(author.user.username, "stale-node_com__7")
+        self.assertEqual(author.user.local_node, self.stale_node)
+
+    def test_existing_authors_are_updated(self):
+        process_authors(
+            self.author_page(range(2)), "http://testserver/api", self.stale_node
+        )
+
+        summary = process_authors(
+            self.author_page(range(2), display_name="Renamed"),
+            "http://testserver/api",
+            self.stale_node,
+        )
+
+        self.assertEqual(summary, {"created": 0, "updated": 2, "unchanged": 0})
+        self.assertEqual(AuthorProfile.objects.count(), 2)
+        self.assertEqual(
+            User.objects.get(username="stale-node_com__1").display_name, "Renamed 1"
+        )
+
+    def test_unchanged_authors_are_skipped(self):
+        page = self.author_page(range(5))
+        process_authors(page, "http://testserver/api", self.stale_node)
+
+        with CaptureQueriesContext(connection) as queries:
+            summary = process_authors(page, "http://testserver/api", self.stale_node)
+
+        self.assertEqual(summary, {"created": 0, "updated": 0, "unchanged": 5})
+        # the node cache and the fingerprint lookup, no writes
+        self.assertEqual(len(queries), 2)
+
+    def fake_peer(self, total, page_size=None, ignores_page=False):
+        """
+        Side effect for `requests.Session.request` serving `total` authors in pages,
+        with an ETag per page. `page_size` caps the size the peer honours.
+        """
+        authors = self.author_page(range(total))
+
+        def respond(session, method, url, params=None, headers=None, **kwargs):
+            size = min(params["size"], page_size or params["size"])
+            page = 1 if ignores_page else params["page"]
+            body = {
+                "type": "authors",
+                "authors": authors[(page - 1) * size : page * size],
+            }
+            etag = f'"page-{page}"'
+            if (headers or {}).get("If-None-Match") == etag:
+                return mock.Mock(status_code=304, headers={"ETag": etag})
+            return mock.Mock(status_code=200, headers={"ETag": etag}, json=lambda: body)
+
+        return respond
+
+    def crawl(self):
+        return fetch_remote_authors(nodes=Node.objects.filter(pk=self.stale_node.pk))
+
+    @mock.patch("requests.Session.request", autospec=True)
+    def test_large_pages_are_crawled_once(self, mock_request):
+        mock_request.side_effect = self.fake_peer(150)
+
+        self.assertEqual(self.crawl(), 1)
+
+        # page one is not fetched twice and the short second page ends the crawl
+        self.assertEqual(
+            [call[1]["params"] for call in mock_request.call_args_list],
+            [{"page": 1, "size": 100}, {"page": 2, "size": 100}],
+        )
+        self.assertEqual(
+            AuthorProfile.objects.filter(user__local_node=self.stale_node).count(), 150
+        )
+
+    @mock.patch("requests.Session.request", autospec=True)
+    def test_crawl_follows_peer_page_size(self, mock_request):
+        mock_request.side_effect = self.fake_peer(25, page_size=10)
+
+        self.crawl()
+
+        # pages of 10, 10 and 5; the short third page is the last one
+        self.assertEqual(mock_request.call_count, 3)
+        self.assertEqual(
+            AuthorProfile.objects.filter(user__local_node=self.stale_node).count(), 25
+        )
+
+    @mock.patch("requests.Session.request", autospec=True)
+    def test_crawl_stops_when_peer_ignores_page(self, mock_request):
+        mock_request.side_effect = self.fake_peer(5, ignores_page=True)
+
+        self.assertEqual(self.crawl(), 1)
+        self.assertEqual(mock_request.call_count, 2)
+
+    @mock.patch("requests.Session.request", autospec=True)
+    def test_unchanged_pages_are_requested_conditionally(self, mock_request):
+        mock_request.side_effect = self.fake_peer(2)
+        self.crawl()
+        self.stale_node.refresh_from_db()
+        self.assertEqual(
+            self.stale_node.author_page_validators["1:100"],
+            {"etag": '"page-1"', "last_modified": None, "count": 2},
+        )
+
+        mock_request.reset_mock()
+        with mock.patch(
+            "node_link.utils.fetch_remote_authors.process_authors"
+        ) as mock_process:
+            self.assertEqual(self.crawl(), 1)
+
+        mock_process.assert_not_called()
+        self.assertEqual(
+            [call[1]["headers"] for call in mock_request.call_args_list],
+            [{"If-None-Match": '"page-1"'}, {"If-None-Match": '"page-2"'}],
+        )
+
+    @mock.patch("requests.Session.request", autospec=True)
+    def test_failed_sync_stays_stale(self, mock_request):
+        mock_request.side_effect = requests.exceptions.ConnectionError("node down")
+
+        self.assertEqual(fetch_remote_authors(stale_only=True), 0)
+
+        self.stale_node.refresh_from_db()
+        self.assertIsNone(self.stale_node.authors_synced_at)
+
+
+class FanoutPlanTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="localuser",
+            password="password",
+            display_name="Local User",
+            user_serial="localuser",
+        )
+        self.local_node = Node.objects.create(
+            url="http://testserver/api/", created_by=self.user, is_remote=False
+        )
+        self.remote_node = Node.objects.create(
+            url="http://remote-node.com/api/", is_remote=True, created_by=self.user
+        )
+        self.user.local_node = self.local_node
+        self.user.save()
+        self.author = AuthorProfile.objects.create(user=self.user)
+
+        self.friend = self.remote_author("friend")
+        self.follower = self.remote_author("follower")
+        self.pending = self.remote_author("pending")
+        self.remote_authors = [self.friend, self.follower, self.pending]
+
+        # the friend also follows the author
+        Friends.objects.create(
+            user1=self.author, user2=self.friend, created_by=self.author
+        )
+        for actor, follow_status in [
+            (self.friend, "a"),
+            (self.follower, "a"),
+            (self.pending, "p"),
+        ]:
+            Follower.objects.create(
+                actor=actor, object=self.author, status=follow_status, created_by=actor
+            )
+
+    def remote_author(self, serial):
+        remote_user = User.objects.create_user(
+            username=f"remote-node_com__{serial}",
+            password="password",
+            display_name=serial,
+            user_serial=serial,
+            local_node=self.remote_node,
+        )
+        return AuthorProfile.objects.create(user=remote_user)
+
+    def create_post(self, visibility):
+        return Post.objects.create(
+            author=self.author,
+            title="Post",
+            visibility=visibility,
+            created_by=self.author,
+            node=self.local_node,
+        )
+
+    def test_public_post_goes_to_accepted_followers(self):
+        plan = plan_post_fanout(self.create_post("p"))
+
+        self.assertCountEqual(plan.recipients, [self.friend, self.follower])
+
+    def test_friends_only_post_goes_to_friends(self):
+        plan = plan_post_fanout(self.create_post("fo"))
+
+        self.assertEqual(plan.recipients, [self.friend])
+
+    def test_friend_who_follows_is_planned_once(self):
+        plan = plan_post_fanout(self.create_post("fo"), include_followers=True)
+
+        self.assertCountEqual(plan.recipients, [self.friend, self.follower])
+        self.assertEqual(plan.saved, 1)
+        node, authors = plan.by_node[self.remote_node.pk]
+        self.assertEqual(node, self.remote_node)
+        self.assertEqual(len(authors), 2)
+
+        plan.queue({"type": "post"})
+        self.assertEqual(OutboxActivity.objects.count(), 1)
+        self.assertEqual(OutboxDelivery.objects.count(), 2)
+
+
+class IndexBenchmarkTestCase(TestCase):
+    def test_federation_lookups_use_their_indexes(self):
+        checks = check_indexes(rows=200)
+
+        for check in checks:
+            self.assertTrue(check.uses_index, f"{check.label}: {check.plan}")
+        # the seeded rows are rolled back
+        self.assertFalse(Post.objects.exists())
+
+    def test_seeded_tables_exist(self):
+        self.assertLessEqual(
+            set(SEEDED_TABLES), set(connection.introspection.table_names())
+        )
+
+
+class SocialGraphTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        admin = User.objects.create_user(username="admin", password="admin")
+        node = Node.objects.create(
+            url="http://testserver/api/", created_by=admin, is_remote=False
+        )
+        self.authors = [
+            AuthorProfile.objects.create(
+                user=User.objects.create_user(
+                    username=name,
+                    password="password",
+                    local_node=node,
+                    user_serial=name,
+                )
+            )
+            for name in ("alice", "bob", "carol")
+        ]
+        self.alice, self.bob, self.carol = self.authors
+
+    def test_graph_is_cached(self):
+        Follower.objects.create(
+            actor=self.bob, object=self.alice, status="a", created_by=self.bob
+        )
+        Follower.objects.create(
+            actor=self.alice, object=self.carol, status="p", created_by=self.alice
+        )
+
+        with self.assertNumQueries(2):
+            graph = social_graph(self.alice)
+        with self.assertNumQueries(0):
+            self.assertIs(type(social_graph(self.alice.id)), type(graph))
+
+        self.assertEqual(graph.followers, frozenset([self.bob.id]))
+        self.assertEqual(graph.requested, frozenset([self.carol.id]))
+        self.assertEqual(social_graph(self.carol).requests, frozenset([self.alice.id]))
+
+    def test_changes_invalidate_both_authors(self):
+        self.assertEqual(social_graph(self.alice).friends, frozenset())
+        self.assertEqual(social_graph(self.bob).friends, frozenset())
+
+        friendship = Friends.objects.create(
+            user1=self.alice, user2=self.bob, created_by=self.alice
+        )
+        self.assertEqual(social_graph(self.alice).friends, frozenset([self.bob.id]))
+        self.assertEqual(social_graph(self.bob).friends, frozenset([self.alice.id]))
+
+        follow = Follower.objects.create(
+            actor=self.carol, object=self.alice, status="p", created_by=self.carol
+        )
+        self.assertEqual(social_graph(self.alice).requests, frozenset([self.carol.id]))
+        follow.status = "a"
+        follow.save()
+        self.assertEqual(social_graph(self.alice).requests, frozenset())
+        self.assertEqual(social_graph(self.carol).following, frozenset([self.alice.id]))
+
+        friendship.delete()
+        self.assertEqual(social_graph(self.bob).friends, frozenset())
+
+    def test_long_lived_only_in_a_shared_cache(self):
+        with mock.patch.object(graph_cache.cache, "set") as cache_set:
+            social_graph(self.alice)
+        self.assertEqual(
+            cache_set.call_args.args[2], graph_cache.GRAPH_LOCAL_CACHE_SECONDS
+        )
+
+        with mock.patch.object(graph_cache, "is_shared", return_value=True):
+            with mock.patch.object(graph_cache.cache, "set") as cache_set:
+                social_graph(self.bob)
+        self.assertEqual(cache_set.call_args.args[2], graph_cache.GRAPH_CACHE_SECONDS)
@@ -10,5 +10,6 @@ router = DefaultRouter()
 urlpatterns = [
     path("notifications/", views.notifications_view, name="notifications"),
     path("<str:username>/", views.home, name="home"),
+    path("<str:username>/stream/", views.home_stream, name="home_stream"),
     # author-specific inbox
 ]
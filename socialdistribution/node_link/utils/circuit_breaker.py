@@ -0,0 +1,180 @@
+import time
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+
+from node_link.models import Node
+
+FAILURE_THRESHOLD = getattr(settings, "NODE_BREAKER_FAILURE_THRESHOLD", 5)
+RESET_SECONDS = getattr(settings, "NODE_BREAKER_RESET_SECONDS", 60)
+LATENCY_WINDOW = getattr(settings, "NODE_LATENCY_WINDOW", 50)
+
+
+class NodeUnavailable(requests.exceptions.ConnectionError):
+    """
+    Raised instead of contacting a node whose circuit breaker is open.
+    It is a RequestException, so existing error handling treats it like a failed request.
+    """
+
+
+def retry_at(node):
+    """
+    When an open breaker will let a probe request through.
+    """
+    opened_at = node.breaker_opened_at or timezone.now()
+    return opened_at + timedelta(seconds=RESET_SECONDS)
+
+
+def allow_request(node):
+    """
+    Decide whether a request to `node` may be sent, reading the breaker state from the database
+    so every worker process shares it.
+
+    Closed: always. Open: no, until RESET_SECONDS have passed; then the breaker goes half-open
+    and only the caller that made the transition may send a probe. Half-open: no, a probe is
+    already in flight, unless it has not reported back within RESET_SECONDS (its worker died),
+    in which case one caller may send a new probe.
+    """
+    state = (
+        Node.objects.filter(pk=node.pk)
+        .values("breaker_state", "breaker_opened_at", "consecutive_failures")
+        .first()
+    )
+    if state is None:
+        return True
+    node.breaker_state = state["breaker_state"]
+    node.breaker_opened_at = state["breaker_opened_at"]
+    node.consecutive_failures = state["consecutive_failures"]
+
+    if node.breaker_state == "c":
+        return True
+    now = timezone.now()
+    if node.breaker_state in ("o", "h") and now >= retry_at(node):
+        # only one caller wins the transition and gets to probe; the probe start is
+        # stored so a probe that never reports back only blocks for RESET_SECONDS
+        won = Node.objects.filter(
+            pk=node.pk,
+            breaker_state=node.breaker_state,
+            breaker_opened_at=node.breaker_opened_at,
+        ).update(breaker_state="h", breaker_opened_at=now)
+        if won:
+            node.breaker_state = "h"
+            node.breaker_opened_at = now
+        return bool(won)
+    return False
+
+
+def _record_latency(node, latency_ms):
+    if latency_ms is None:
+        return node.recent_latencies_ms
+    latencies = list(node.recent_latencies_ms or []) + [round(latency_ms, 1)]
+    return latencies[-LATENCY_WINDOW:]
+
+
+def record_success(node, latency_ms=None):
+    """
+    A request to `node` succeeded: close the breaker and reset the failure count.
+    """
+    node.recent_latencies_ms = _record_latency(node, latency_ms)
+    node.breaker_state = "c"
+    node.breaker_opened_at = None
+    node.consecutive_failures = 0
+    node.last_success_at = timezone.now()
+    Node.objects.filter(pk=node.pk).update(
+        breaker_state=node.breaker_state,
+        breaker_opened_at=None,
+        consecutive_failures=0,
+        last_success_at=node.last_success_at,
+        recent_latencies_ms=node.recent_latencies_ms,
+    )
+
+
+def record_failure(node, error, latency_ms=None):
+    """
+    A request to `node` failed: open the breaker after FAILURE_THRESHOLD consecutive
+    failures, or straight away if the half-open probe failed.
+
+    The count is incremented and compared in the database, so failures recorded at the
+    same time by other units or workers are never lost.
+    """
+    now = timezone.now()
+    node.recent_latencies_ms = _record_latency(node, latency_ms)
+    node.last_failure_at = now
+    node.last_error = str(error)
+    nodes = Node.objects.filter(pk=node.pk)
+    nodes.update(
+        consecutive_failures=F("consecutive_failures") + 1,
+        last_failure_at=now,
+        last_error=node.last_error,
+        recent_latencies_ms=node.recent_latencies_ms,
+    )
+    nodes.filter(
+        Q(breaker_state="h")
+        | Q(breaker_state="c", consecutive_failures__gte=FAILURE_THRESHOLD)
+    ).update(breaker_state="o", breaker_opened_at=now)
+    state = nodes.values(
+        "breaker_state", "breaker_opened_at", "consecutive_failures"
+    ).first()
+    if state is not None:
+        node.breaker_state = state["breaker_state"]
+        node.breaker_opened_at = state["breaker_opened_at"]
+        node.consecutive_failures = state["consecutive_failures"]
+
+
+def reset(node):
+    """
+    Close the breaker by hand (e.g. from the admin once the peer is back).
+    """
+    node.breaker_state = "c"
+    node.breaker_opened_at = None
+    node.consecutive_failures = 0
+    Node.objects.filter(pk=node.pk).update(
+        breaker_state="c", breaker_opened_at=None, consecutive_failures=0
+    )
+
+
+def is_node_failure(error=None, response=None):
+    """
+    Only connection problems, timeouts and 5xx responses count against a node;
+    a 4xx means the node answered and the request itself was wrong.
+    """
+    if response is None and error is not None:
+        response = getattr(error, "response", None)
+    if response is not None:
+        return response.status_code >= 500
+    return error is not None
+
+
+def guarded_request(node, send):
+    """
+    Run `send()` (which performs one HTTP request and returns the response) through
+    the breaker of `node`, recording the outcome and latency.
+    Must be called from the thread that owns the database connection.
+
+    Raises:
+        NodeUnavailable: If the breaker is open.
+        requests.exceptions.RequestException: If the request fails.
+    """
+    if not allow_request(node):
+        raise NodeUnavailable(f"Circuit breaker open for {node.url}")
+
+    start = time.monotonic()
+    try:
+        response = send()
+        response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        latency_ms = (time.monotonic() - start) * 1000
+        if is_node_failure(error=e):
+            record_failure(node, e, latency_ms)
+        else:
+            record_success(node, latency_ms)
+        raise
+    except Exception as e:
+        # anything else still ends the probe, or the breaker would stay half-open
+        record_failure(node, e, (time.monotonic() - start) * 1000)
+        raise
+    record_success(node, (time.monotonic() - start) * 1000)
+    return response
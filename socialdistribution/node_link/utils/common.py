@@ -1,37 +1,33 @@
 # Django Imports
 from django.shortcuts import get_object_or_404
-from django.db.models import Q
 from django.contrib.auth.decorators import login_required
 from django.http import HttpResponseRedirect, HttpResponseForbidden
 from django.contrib import messages
 from django.urls import reverse
+from django.utils.http import parse_etags
+from rest_framework import status
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
 
 # Project Imports
-from authorApp.models import Friends, User
+from authorApp.models import User
 from postApp.models import Post
+from node_link.utils.visibility import can_view
 
+import hashlib
+import json
 import re
 
 
 def has_access(request, post_uuid, username):
+    """
+    Whether the logged in author may see a post, see `node_link.utils.visibility`.
 
-    post = get_object_or_404(Post, uuid=post_uuid)
-
-    if (
-        post.author.id == request.user.author_profile.id
-        or post.visibility == "p"
-        or post.visibility == "u"
-        or (
-            post.visibility == "fo"
-            and Friends.objects.filter(
-                Q(user1=request.user.author_profile, user2=post.author)
-                | Q(user2=request.user.author_profile, user1=post.author)
-            ).exists()
-        )
-    ) and not post.visibility == "d":
-        return True
-    return False
+    Raises:
+        Http404: If the post does not exist.
+    """
+    post = get_object_or_404(Post.objects.only("id"), uuid=post_uuid)
+    return can_view(request.user.author_profile, post)
 
 
 def is_approved(view_func):
@@ -66,3 +62,32 @@ def remove_api_suffix(url):
     if url.endswith("api/"):
         return re.sub(r"/api/$", "", url)  # Remove the trailing 'api/' if present
     return url
+
+
+def content_hash(data):
+    """
+    sha256 of the canonical JSON representation of `data` (key order does not matter).
+    """
+    payload = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def content_etag(data):
+    """
+    Strong ETag computed from the JSON representation of a response body.
+    """
+    return f'"{content_hash(data)[:32]}"'
+
+
+def etag_response(request, data, etag=None):
+    """
+    Return `data` with an ETag, or an empty 304 if the client already has this version.
+    `etag` is computed from `data` unless given (e.g. stored with a cached body).
+    """
+    etag = etag or content_etag(data)
+    if etag in parse_etags(request.headers.get("If-None-Match", "")):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(data)
+    response["ETag"] = etag
+    return response
@@ -1,7 +1,10 @@
 import requests
 from requests.auth import HTTPBasicAuth
 from urllib.parse import urlparse
-from node_link.models import Node
+from django.db import transaction
+from node_link.models import Node, OutboxActivity, OutboxDelivery
+from node_link.utils.node_client import get_client
+from node_link.utils.circuit_breaker import guarded_request
 
 
 def extract_base_url(full_url):
@@ -14,18 +17,85 @@ def extract_base_url(full_url):
     return base_url
 
 
+def post_to_inbox(inbox_url, json, node, local_node=None):
+    """
+    POST a JSON activity to a remote inbox using the remote node's credentials.
+
+    Args:
+        inbox_url (str): The inbox URL of the remote author.
+        json (dict): The activity JSON object to send.
+        node (Node): The remote node that hosts the inbox.
+        local_node (Node): Our own node, used for the `X-original-host` header.
+
+    Returns:
+        requests.Response: The response of the remote node.
+
+    Raises:
+        requests.exceptions.RequestException: If the request fails or returns an HTTP error.
+    """
+    response = get_client(node, local_node).post(inbox_url, json=json)
+    response.raise_for_status()  # Raise an exception for HTTP errors
+    return response
+
+
+def probe_batch_inbox(node, client):
+    """
+    Ask a remote node whether it accepts batched inbox deliveries.
+
+    Returns:
+        int: The largest batch the node accepts, or 0 if it has no batch inbox.
+    """
+    try:
+        response = client.get(node.batch_inbox_url)
+        response.raise_for_status()
+        data = response.json()
+    except (requests.exceptions.RequestException, ValueError):
+        return 0
+    if not isinstance(data, dict) or data.get("type") != "inbox_batch":
+        return 0
+    try:
+        return max(0, int(data.get("max_items", 0)))
+    except (TypeError, ValueError):
+        return 0
+
+
+def post_batch_to_inbox(node, items, local_node=None):
+    """
+    POST several activities to the batch inbox of a remote node in one request.
+
+    Args:
+        node (Node): The remote node.
+        items (list[dict]): {"author": <recipient FQID>, "activity": {...}} for every activity.
+        local_node (Node): Our own node, used for the `X-original-host` header.
+
+    Returns:
+        list[dict]: The per-item results reported by the node, in the order of `items`.
+
+    Raises:
+        requests.exceptions.RequestException: If the request fails or returns an HTTP error.
+        ValueError: If the response is not a batch result for every item.
+    """
+    response = get_client(node, local_node).post(
+        node.batch_inbox_url, json={"type": "inbox_batch", "items": items}
+    )
+    response.raise_for_status()
+    data = response.json()
+    results = data.get("items") if isinstance(data, dict) else None
+    if not isinstance(results, list) or len(results) != len(items):
+        raise ValueError(f"Invalid batch inbox response from {node.url}")
+    return results
+
+
 def send_to_remote_inboxes(json, author):
     """
-    Send the post JSON object to the inbox of all remote users.
+    Send the post JSON object to the inbox of a remote author right away.
+    Views should use `queue_for_remote_inboxes` instead so that they never wait on a remote node.
 
     Args:
         author(AuthorProfile): Author to send to
         json (dict): The post JSON object to send.
     """
-    # Find all remote users (usernames containing '__')
-
-    # Extract the remote author's username
-    if not author.user.local_node.is_active:
+    if not author.user.local_node or not author.user.local_node.is_active:
         return
 
     # Construct the inbox URL
@@ -33,20 +103,51 @@ def send_to_remote_inboxes(json, author):
     local_node = Node.objects.filter(is_remote=False).first()
     # Send the POST request to the inbox
     try:
-        if author.user.local_node and author.user.local_node.is_active:
-
-            headers = {"X-original-host": local_node.url}
-            response = requests.post(
-                inbox_url,
-                json=json,
-                auth=(
-                    author.user.local_node.username,
-                    author.user.local_node.raw_password,
-                ),
-                timeout=10,
-                headers=headers,
-            )
-            response.raise_for_status()  # Raise an exception for HTTP errors
-            print(f"Successfully sent to {inbox_url}. Response: {response.status_code}")
+        node = author.user.local_node
+        response = guarded_request(
+            node, lambda: post_to_inbox(inbox_url, json, node, local_node)
+        )
+        print(f"Successfully sent to {inbox_url}. Response: {response.status_code}")
     except requests.exceptions.RequestException as e:
         print(f"Failed to send to {inbox_url}. Error: {str(e)}")
+
+
+def queue_for_remote_inboxes(json, authors):
+    """
+    Queue a JSON activity for delivery to the inboxes of the given authors.
+    Only authors on active remote nodes get a delivery; the `process_outbox`
+    management command sends them in the background.
+
+    Args:
+        json (dict): The activity JSON object to send.
+        authors (iterable[AuthorProfile]): The recipients.
+
+    Returns:
+        OutboxActivity: The queued activity, or None if there was no remote recipient.
+    """
+    recipients = [
+        author
+        for author in authors
+        if author.user.local_node
+        and author.user.local_node.is_remote
+        and author.user.local_node.is_active
+    ]
+    if not recipients:
+        return None
+
+    with transaction.atomic():
+        activity = OutboxActivity.objects.create(
+            payload=json, activity_type=str(json.get("type", ""))
+        )
+        OutboxDelivery.objects.bulk_create(
+            [
+                OutboxDelivery(
+                    activity=activity,
+                    recipient=author,
+                    node=author.user.local_node,
+                    inbox_url=f"{author.fqid}/inbox",
+                )
+                for author in recipients
+            ]
+        )
+    return activity
@@ -0,0 +1,182 @@
+from django.conf import settings
+
+from authorApp.models import AuthorProfile
+from node_link.models import Node
+from node_link.utils.communication import queue_for_remote_inboxes
+from node_link.utils.fanout_executor import deliver_all, summarize
+from node_link.utils.social_graph import social_graph
+
+# "outbox" queues deliveries for the `process_outbox` worker, "direct" sends them during the request
+DELIVERY_MODE = getattr(settings, "FEDERATION_DELIVERY_MODE", "outbox")
+
+
+class FanoutPlan:
+    """
+    The exact set of remote authors that should receive one activity, grouped by their node.
+
+    Attributes:
+        recipients (list[AuthorProfile]): Unique remote recipients.
+        naive_count (int): Deliveries the separate friends and followers loops would have made.
+    """
+
+    def __init__(self, recipients, naive_count):
+        self.recipients = recipients
+        self.naive_count = naive_count
+
+    def __bool__(self):
+        return bool(self.recipients)
+
+    def __len__(self):
+        return len(self.recipients)
+
+    @property
+    def saved(self):
+        """
+        Number of duplicate deliveries avoided by planning over a set.
+        """
+        return self.naive_count - len(self.recipients)
+
+    @property
+    def by_node(self):
+        """
+        Recipients grouped by remote node: {node_id: (node, [authors])}.
+        """
+        groups = {}
+        for author in self.recipients:
+            node = author.user.local_node
+            groups.setdefault(node.pk, (node, []))[1].append(author)
+        return groups
+
+    def queue(self, payload):
+        """
+        Queue the payload once for every planned recipient.
+        """
+        if not self.recipients:
+            return None
+        print(
+            f"Fan-out: {len(self.recipients)} deliveries to {len(self.by_node)} node(s), "
+            f"{self.saved} duplicate(s) skipped."
+        )
+        return queue_for_remote_inboxes(payload, self.recipients)
+
+    def send(self, payload):
+        """
+        Send the payload to every planned recipient right away, in parallel.
+
+        Returns:
+            list[DeliveryResult]: One result per recipient.
+        """
+        return send_to_authors(payload, self.recipients)
+
+    def deliver(self, payload):
+        """
+        Deliver the payload according to FEDERATION_DELIVERY_MODE.
+        """
+        if DELIVERY_MODE == "direct":
+            return self.send(payload)
+        return self.queue(payload)
+
+
+def send_to_authors(payload, authors):
+    """
+    Send a payload to the inboxes of remote authors in parallel through the fan-out executor.
+    Deliveries that failed because the node was down or its breaker was open are queued
+    in the outbox so they are retried later.
+
+    Returns:
+        list[DeliveryResult]: One result per author on an active remote node.
+    """
+    recipients = [
+        author
+        for author in authors
+        if author.user.local_node and author.user.local_node.is_remote
+    ]
+    if not recipients:
+        return []
+
+    local_node = Node.objects.filter(is_remote=False).first()
+    results = deliver_all(
+        [
+            (author, f"{author.fqid}/inbox", author.user.local_node, payload)
+            for author in recipients
+        ],
+        local_node,
+    )
+    summary = summarize(results)
+    print(
+        f"Fan-out: sent {summary['sent']}, failed {summary['failed']}, "
+        f"skipped {summary['skipped']}."
+    )
+
+    retry = [r.key for r in results if r.skipped or r.node_failed]
+    if retry:
+        queue_for_remote_inboxes(payload, retry)
+    return results
+
+
+def deliver_to_authors(payload, authors):
+    """
+    Deliver a payload to remote authors, either through the outbox or directly
+    depending on FEDERATION_DELIVERY_MODE.
+    """
+    if DELIVERY_MODE == "direct":
+        return send_to_authors(payload, authors)
+    return queue_for_remote_inboxes(payload, authors)
+
+
+def friend_ids(author):
+    """
+    Ids of the authors that are friends with `author`.
+    """
+    return social_graph(author).friends
+
+
+def follower_ids(author):
+    """
+    Ids of the authors whose follow request to `author` was accepted.
+    """
+    return social_graph(author).followers
+
+
+def plan_fanout(author, friends=False, followers=False):
+    """
+    Compute the remote recipients of an activity by `author` with set semantics,
+    so an author who is both a friend and a follower is only sent it once.
+
+    Args:
+        author (AuthorProfile): The author of the activity.
+        friends (bool): Send to the author's friends.
+        followers (bool): Send to the author's accepted followers.
+    """
+    audience = set()
+    naive_count = 0
+    for wanted, ids_for in ((friends, friend_ids), (followers, follower_ids)):
+        if wanted:
+            ids = ids_for(author)
+            naive_count += len(ids)
+            audience |= ids
+
+    if not audience:
+        return FanoutPlan([], naive_count)
+
+    recipients = list(
+        AuthorProfile.objects.filter(
+            id__in=audience,
+            user__local_node__is_remote=True,
+            user__local_node__is_active=True,
+        ).select_related("user__local_node")
+    )
+    return FanoutPlan(recipients, naive_count)
+
+
+def plan_post_fanout(post, include_followers=False):
+    """
+    Plan the delivery of a post: friends-only posts go to friends, anything else to followers.
+    Edits pass `include_followers=True` so followers also hear about friends-only changes.
+    """
+    friends_only = post.visibility == "fo"
+    return plan_fanout(
+        post.author,
+        friends=friends_only,
+        followers=include_followers or not friends_only,
+    )
@@ -0,0 +1,227 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+
+from node_link.utils import circuit_breaker
+from node_link.utils.communication import post_batch_to_inbox, post_to_inbox
+
+CONCURRENCY = getattr(settings, "FANOUT_CONCURRENCY", 32)
+PER_NODE_CONCURRENCY = getattr(settings, "FANOUT_PER_NODE_CONCURRENCY", 8)
+# we never send bigger batches than we would accept ourselves
+BATCH_MAX_ITEMS = getattr(settings, "INBOX_BATCH_MAX_ITEMS", 100)
+
+
+class DeliveryResult:
+    """
+    Outcome of sending one activity to one inbox.
+
+    Attributes:
+        key: Whatever the caller used to identify the delivery (e.g. an author or an OutboxDelivery).
+        inbox_url (str): The inbox the activity was sent to.
+        node (Node): The node hosting the inbox.
+        status_code (int): HTTP status of the response, if there was one.
+        error (str): Why the delivery failed, or None.
+        skipped (bool): The delivery was not attempted because the node's breaker is open.
+        node_failed (bool): The failure counts against the node's health.
+        latency_ms (float): Round-trip time of the request.
+    """
+
+    def __init__(self, key, inbox_url, node):
+        self.key = key
+        self.inbox_url = inbox_url
+        self.node = node
+        self.status_code = None
+        self.error = None
+        self.skipped = False
+        self.node_failed = False
+        self.latency_ms = None
+
+    @property
+    def ok(self):
+        return self.error is None and not self.skipped
+
+
+def summarize(results):
+    """
+    Count the results by outcome: {"sent", "failed", "skipped"}.
+    """
+    summary = {"sent": 0, "failed": 0, "skipped": 0}
+    for result in results:
+        if result.skipped:
+            summary["skipped"] += 1
+        elif result.ok:
+            summary["sent"] += 1
+        else:
+            summary["failed"] += 1
+    return summary
+
+
+def _interleave(units):
+    """
+    Order units round-robin across nodes so one busy node does not hold all pool threads
+    waiting on its per-node limit.
+    """
+    by_node = {}
+    for unit in units:
+        by_node.setdefault(unit[0].pk, []).append(unit)
+    queues = list(by_node.values())
+    ordered = []
+    for i in range(max((len(q) for q in queues), default=0)):
+        ordered.extend(q[i] for q in queues if i < len(q))
+    return ordered
+
+
+def _plan_units(to_send):
+    """
+    Group the deliveries into requests: nodes that advertise a batch inbox get their
+    deliveries in as few batches as possible, every other delivery is its own request.
+
+    Returns:
+        list[tuple]: (node, [(result, payload), ...]) for every request to make.
+    """
+    by_node = {}
+    for result, payload, node in to_send:
+        by_node.setdefault(node.pk, (node, []))[1].append((result, payload))
+
+    units = []
+    for node, entries in by_node.values():
+        size = min(node.batch_inbox_max_items, BATCH_MAX_ITEMS)
+        if node.supports_batch_inbox and size > 1 and len(entries) > 1:
+            units.extend(
+                (node, entries[i : i + size]) for i in range(0, len(entries), size)
+            )
+        else:
+            units.extend((node, [entry]) for entry in entries)
+    return units
+
+
+def _fail(results, error):
+    response = getattr(error, "response", None)
+    for result in results:
+        result.status_code = getattr(response, "status_code", None)
+        result.error = str(error)
+        result.node_failed = circuit_breaker.is_node_failure(error=error)
+
+
+def _post(node, entries, local_node, node_limit):
+    """
+    Send one request: a single delivery, or a batch to the node's batch inbox.
+    Runs in a pool thread so it must not touch the database.
+    """
+    results = [result for result, _ in entries]
+    with node_limit:
+        start = time.monotonic()
+        try:
+            if len(entries) == 1:
+                result, payload = entries[0]
+                response = post_to_inbox(result.inbox_url, payload, node, local_node)
+                result.status_code = response.status_code
+            else:
+                items = [
+                    {
+                        "author": result.inbox_url.rsplit("/inbox", 1)[0],
+                        "activity": payload,
+                    }
+                    for result, payload in entries
+                ]
+                replies = post_batch_to_inbox(node, items, local_node)
+                for result, reply in zip(results, replies):
+                    if not isinstance(reply, dict):
+                        result.error = f"Unexpected batch reply: {reply}"
+                        result.node_failed = True
+                        continue
+                    result.status_code = reply.get("status")
+                    if (
+                        not isinstance(result.status_code, int)
+                        or result.status_code >= 300
+                    ):
+                        result.error = str(reply.get("body") or reply)
+                        result.node_failed = (
+                            not isinstance(result.status_code, int)
+                            or result.status_code >= 500
+                        )
+        except requests.exceptions.RequestException as e:
+            _fail(results, e)
+        except Exception as e:
+            # e.g. the node answered but not with a batch result; counted against the
+            # node so a half-open breaker always gets the outcome of its probe
+            for result in results:
+                result.error = str(e)
+                result.node_failed = True
+        latency_ms = (time.monotonic() - start) * 1000
+    for result in results:
+        result.latency_ms = latency_ms
+    return results
+
+
+def deliver_all(jobs, local_node=None, concurrency=None, per_node=None):
+    """
+    Send activities to many inboxes in parallel, with at most `concurrency` requests in flight
+    overall and at most `per_node` to any single node.
+
+    Breaker checks and health updates happen in the calling thread, which owns the database
+    connection; the pool threads only do HTTP. Inactive nodes and nodes whose breaker is open
+    are not contacted; a half-open node gets a single probe request. Deliveries to nodes with
+    a batch inbox are sent together in batches.
+
+    Args:
+        jobs (list[tuple]): (key, inbox_url, node, payload) for each delivery.
+        local_node (Node): Our own node, used for the `X-original-host` header.
+        concurrency (int): Global limit, defaults to FANOUT_CONCURRENCY.
+        per_node (int): Per-node limit, defaults to FANOUT_PER_NODE_CONCURRENCY.
+
+    Returns:
+        list[DeliveryResult]: One result per job, in the order of `jobs`.
+    """
+    concurrency = concurrency or CONCURRENCY
+    per_node = per_node or PER_NODE_CONCURRENCY
+
+    results = []
+    to_send = []
+    nodes = {}
+    allowed = {}
+    probing = set()
+    for key, inbox_url, node, payload in jobs:
+        # one instance per node so breaker state and health updates accumulate
+        node = nodes.setdefault(node.pk, node)
+        result = DeliveryResult(key, inbox_url, node)
+        results.append(result)
+        if not node.is_active:
+            result.error = f"The node {node.url} is not active."
+            continue
+        if node.pk not in allowed:
+            allowed[node.pk] = circuit_breaker.allow_request(node)
+        if not allowed[node.pk]:
+            result.skipped = True
+            result.error = f"Circuit breaker open for {node.url}"
+            continue
+        if node.breaker_state == "h":
+            if node.pk in probing:
+                result.skipped = True
+                result.error = f"Waiting for probe to {node.url}"
+                continue
+            probing.add(node.pk)
+        to_send.append((result, payload, node))
+
+    units = _plan_units(to_send)
+    node_limits = {node.pk: threading.BoundedSemaphore(per_node) for node, _ in units}
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(units)))) as pool:
+        futures = [
+            pool.submit(_post, node, entries, local_node, node_limits[node.pk])
+            for node, entries in _interleave(units)
+        ]
+        for future in futures:
+            future.result()
+
+    # one health update per request
+    for node, entries in units:
+        results_sent = [result for result, _ in entries]
+        latency_ms = results_sent[0].latency_ms
+        if all(result.node_failed for result in results_sent):
+            circuit_breaker.record_failure(node, results_sent[0].error, latency_ms)
+        else:
+            circuit_breaker.record_success(node, latency_ms)
+    return results
@@ -1,20 +1,83 @@
+import hashlib
+import json
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+from functools import partial
+from urllib.parse import urlparse
+
 import requests
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from authorApp.models import AuthorProfile, User
 from node_link.models import Node
+from node_link.signals import update_notification_pictures
+from node_link.utils import response_cache
+from node_link.utils.circuit_breaker import (
+    NodeUnavailable,
+    allow_request,
+    guarded_request,
+    is_node_failure,
+    record_failure,
+    record_success,
+)
+from node_link.utils.node_client import get_client
 from authorApp.serializers import AuthorProfileSerializer
 
+SYNC_TTL_SECONDS = getattr(settings, "REMOTE_AUTHORS_TTL_SECONDS", 300)
+# page size asked for first; halved down to MIN_PAGE_SIZE if a node rejects it
+PAGE_SIZE = getattr(settings, "REMOTE_AUTHORS_PAGE_SIZE", 100)
+MIN_PAGE_SIZE = 10
+MAX_PAGES = getattr(settings, "REMOTE_AUTHORS_MAX_PAGES", 1000)
+CRAWL_CONCURRENCY = getattr(settings, "REMOTE_AUTHORS_CRAWL_CONCURRENCY", 8)
+FINGERPRINT_FIELDS = ("id", "host", "displayName", "github", "profileImage")
+USER_FIELDS = (
+    "display_name",
+    "github_user",
+    "profileImage",
+    "local_node",
+    "user_serial",
+)
+
+
+def stale_nodes(nodes=None):
+    """
+    Active remote nodes whose authors were not synced within REMOTE_AUTHORS_TTL_SECONDS.
+    """
+    nodes = nodes if nodes is not None else Node.objects.all()
+    cutoff = timezone.now() - timedelta(seconds=SYNC_TTL_SECONDS)
+    return nodes.filter(is_remote=True, is_active=True).filter(
+        Q(authors_synced_at__isnull=True) | Q(authors_synced_at__lt=cutoff)
+    )
+
 
-def fetch_remote_authors():
+def fetch_remote_authors(nodes=None, stale_only=False):
     """
-    Periodically fetch the remote authors by calling the remote node's author endpoint.
-    Starts with the initial endpoint and loops through paginated results.
+    Fetch the remote authors by calling the remote nodes' author endpoint.
+    All nodes are crawled concurrently, each page by page.
+    Runs from the `fetch_remote_authors` management command, never on the request path.
+
+    Args:
+        nodes (QuerySet[Node]): Only sync these nodes (defaults to every node).
+        stale_only (bool): Skip nodes synced within REMOTE_AUTHORS_TTL_SECONDS.
+
+    Returns:
+        int: Number of nodes that were synced completely.
     """
     # Get all ACTIVE and REMOTE nodes
-    remote_nodes = Node.objects.filter(is_remote=True, is_active=True)
-    local_node = Node.objects.filter(is_remote=False).first()
+    if stale_only:
+        remote_nodes = stale_nodes(nodes)
+    else:
+        remote_nodes = (nodes if nodes is not None else Node.objects.all()).filter(
+            is_remote=True, is_active=True
+        )
 
     if not remote_nodes:
         print("No remote nodes found.")
-        return
+        return 0
 
     # Retrieve the local node's URL
     try:
@@ -22,73 +85,303 @@ def fetch_remote_authors():
         local_host = local_node.url.rstrip("/")
     except Node.DoesNotExist:
         print("Local node not found.")
-        return
+        return 0
 
     print("Fetching authors from remote nodes...")
 
-    # Loop through each remote node and fetch authors
-    for node in remote_nodes:
-        authors_url = node.url.rstrip("/") + "/authors/"
-        auth = (node.username, node.raw_password)
-        headers = {"X-original-host": local_node.url}
+    # crawl every node at the same time
+    crawls = crawl_nodes(list(remote_nodes), local_node, local_host)
+    synced = 0
+    for crawl in crawls:
+        print(crawl.report())
+        if crawl.ok:
+            Node.objects.filter(pk=crawl.node.pk).update(
+                authors_synced_at=timezone.now()
+            )
+            synced += 1
+
+    print("Fetching authors completed.")
+    return synced
+
+
+def conditional_headers(validator):
+    """
+    If-None-Match/If-Modified-Since headers for a page we fetched before.
+    """
+    headers = {}
+    if validator.get("etag"):
+        headers["If-None-Match"] = validator["etag"]
+    if validator.get("last_modified"):
+        headers["If-Modified-Since"] = validator["last_modified"]
+    return headers
+
+
+class NodeCrawl:
+    """
+    State of the crawl of one node's paginated `authors/` endpoint.
+
+    Pages are requested with a large `size`; a page shorter than the first one, an empty page,
+    a 404 past the first page or a page repeating the previous one (the node ignores `page`)
+    ends the crawl. If the node rejects the large size, it is halved until it is accepted.
+    """
+
+    def __init__(self, node, client):
+        self.node = node
+        self.client = client
+        self.authors_url = node.url.rstrip("/") + "/authors/"
+        self.old_validators = node.author_page_validators or {}
+        self.validators = {}
+        self.size = PAGE_SIZE
+        self.first_count = None
+        self.previous_ids = None
+        self.pages = 0
+        self.authors = 0
+        self.unchanged_pages = 0
+        self.done = False
+        self.ok = False
+        self.error = None
+        self.started = time.monotonic()
+        self.elapsed = None
+
+    def key(self, page):
+        return f"{page}:{self.size}"
 
-        # First fetch from `api/authors/` (without `?page`)
+    def fetch(self, page):
+        """
+        Request one page. Runs in a pool thread so it must not touch the database.
+
+        Returns:
+            tuple: (page, response or None, error or None, latency in ms)
+        """
+        validator = self.old_validators.get(self.key(page), {})
+        start = time.monotonic()
         try:
-            response = requests.get(authors_url, auth=auth, timeout=10, headers=headers)
-            response.raise_for_status()
-            authors_data = response.json()
-            authors_list = authors_data.get("authors", [])
+            response = self.client.get(
+                self.authors_url,
+                params={"page": page, "size": self.size},
+                headers=conditional_headers(validator),
+            )
+            return page, response, None, (time.monotonic() - start) * 1000
+        except Exception as e:
+            # any error is recorded in `receive`, so a half-open breaker learns the outcome
+            return page, None, e, (time.monotonic() - start) * 1000
 
-            # Process authors from the first response
-            print(f"Processing authors from {authors_url}...")
-            process_authors(authors_list, local_host, node)
+    def finish(self, error=None):
+        self.done = True
+        self.ok = error is None
+        self.error = error
 
-        except requests.RequestException as e:
-            print(f"Error fetching authors from {authors_url}: {e}")
-            continue
-        except ValueError as e:
-            print(f"Invalid JSON response from {authors_url}: {e}")
-            continue
+    def receive(self, page, response, error, latency_ms):
+        """
+        Handle a fetched page in the main thread: record the node's health, remember the
+        page's validators and decide what to fetch next.
 
-        # Continue fetching remaining pages
-        page = 2
-        size = 10  # Adjust size if needed
+        Returns:
+            tuple: (next page to fetch or None, authors to import or None)
+        """
+        if error is None and response.status_code >= 500:
+            error = requests.HTTPError(
+                f"{response.status_code} Server Error", response=response
+            )
+        if error is not None:
+            if is_node_failure(error=error):
+                record_failure(self.node, error, latency_ms)
+            self.finish(error)
+            return None, None
+        record_success(self.node, latency_ms)
 
-        while True:
+        key = self.key(page)
+        if response.status_code == 304:
+            validator = self.old_validators.get(key, {})
+            self.validators[key] = validator
+            count = validator.get("count", 0)
+            authors_list = None
+            self.unchanged_pages += 1
+        elif response.status_code == 404 and page > 1:
+            # some nodes answer 404 past the last page
+            self.finish()
+            return None, None
+        elif response.status_code == 400 and page == 1 and self.size > MIN_PAGE_SIZE:
+            # the node rejects large pages, try again with a smaller size
+            self.size = max(MIN_PAGE_SIZE, self.size // 2)
+            return 1, None
+        elif response.status_code >= 400:
+            self.finish(f"HTTP {response.status_code} for page {page}")
+            return None, None
+        else:
             try:
-                params = {"page": page, "size": size}
-                response = requests.get(
-                    authors_url, auth=auth, timeout=10, headers=headers, params=params
+                authors_list = response.json().get("authors", [])
+            except (ValueError, AttributeError) as e:
+                self.finish(f"Invalid JSON response for page {page}: {e}")
+                return None, None
+            if not isinstance(authors_list, list):
+                self.finish(f"Invalid authors list for page {page}")
+                return None, None
+
+            count = len(authors_list)
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if etag or last_modified:
+                self.validators[key] = {
+                    "etag": etag,
+                    "last_modified": last_modified,
+                    "count": count,
+                }
+            ids = [a.get("id") for a in authors_list if isinstance(a, dict)]
+            if count and ids == self.previous_ids:
+                # the node ignores `page` and keeps sending the same authors
+                self.finish()
+                return None, None
+            self.previous_ids = ids
+
+        self.pages += 1
+        self.authors += count
+        if page == 1:
+            self.first_count = count
+        if count == 0 or count < self.first_count or page >= MAX_PAGES:
+            self.finish()
+            return None, authors_list
+        return page + 1, authors_list
+
+    def save_validators(self):
+        """
+        Store the validators of the pages seen. A failed crawl keeps the ones it did not reach.
+        """
+        validators = (
+            self.validators if self.ok else {**self.old_validators, **self.validators}
+        )
+        if validators != self.old_validators:
+            self.node.author_page_validators = validators
+            Node.objects.filter(pk=self.node.pk).update(
+                author_page_validators=validators
+            )
+
+    def report(self):
+        """
+        One line summary of the crawl for the sync logs.
+        """
+        outcome = "ok" if self.ok else f"failed ({self.error})"
+        return (
+            f"{self.node.url}: {outcome}, {self.pages} page(s) of up to {self.size}, "
+            f"{self.authors} author(s), {self.unchanged_pages} unchanged page(s), "
+            f"{self.elapsed or 0:.2f}s"
+        )
+
+
+def crawl_nodes(nodes, local_node, local_host):
+    """
+    Crawl the authors of several nodes concurrently. Pool threads only do HTTP; breaker
+    checks and imports run in the calling thread. The next page of a node is requested
+    before the current one is imported, so fetching and importing overlap.
+
+    Returns:
+        list[NodeCrawl]: The finished crawl of every node.
+    """
+    node_cache = active_remote_nodes()
+    crawls = [NodeCrawl(node, get_client(node, local_node)) for node in nodes]
+    if not crawls:
+        return crawls
+
+    workers = max(1, min(CRAWL_CONCURRENCY, len(crawls)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = {}
+
+        def request_page(crawl, page):
+            if not allow_request(crawl.node):
+                crawl.finish(
+                    NodeUnavailable(f"Circuit breaker open for {crawl.node.url}")
                 )
-                response.raise_for_status()
-                authors_data = response.json()
+                return
+            pending[pool.submit(crawl.fetch, page)] = crawl
 
-                # Extract authors list from the response
-                authors_list = authors_data.get("authors", [])
-                if not authors_list:
-                    print(f"No more authors to fetch from {authors_url} (page {page}).")
-                    break  # Exit loop if no authors are found
+        for crawl in crawls:
+            request_page(crawl, 1)
 
-                print(f"Processing page {page} from {authors_url}...")
-                process_authors(authors_list, local_host, node)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                crawl = pending.pop(future)
+                next_page, authors_list = crawl.receive(*future.result())
+                # prefetch the next page while this one is imported
+                if next_page:
+                    request_page(crawl, next_page)
+                if authors_list:
+                    process_authors(authors_list, local_host, crawl.node, node_cache)
+                if crawl.done:
+                    crawl.elapsed = time.monotonic() - crawl.started
 
-                page += 1  # Move to the next page
+    for crawl in crawls:
+        if crawl.elapsed is None:
+            crawl.elapsed = time.monotonic() - crawl.started
+        crawl.save_validators()
+    return crawls
 
-            except requests.RequestException as e:
-                print(f"Error fetching authors from {authors_url} (page {page}): {e}")
-                break
-            except ValueError as e:
-                print(f"Invalid JSON response from {authors_url} (page {page}): {e}")
-                break
 
-    print("Fetching authors completed.")
+def fetch_remote_author(fqid):
+    """
+    Fetch a single remote author we do not know yet (e.g. the sender of an inbox activity
+    that arrived before the next scheduled sync).
+
+    Returns:
+        AuthorProfile: The imported author, or None if it could not be fetched.
+    """
+    node = next(
+        (
+            node
+            for node in Node.objects.filter(is_remote=True, is_active=True)
+            if fqid.startswith(node.url)
+        ),
+        None,
+    )
+    local_node = Node.objects.filter(is_remote=False, is_active=True).first()
+    if node is None or local_node is None:
+        return None
+
+    client = get_client(node, local_node)
+    try:
+        response = guarded_request(node, partial(client.get, fqid))
+        author_data = response.json()
+    except requests.RequestException as e:
+        print(f"Error fetching author {fqid}: {e}")
+        return None
+    except ValueError as e:
+        print(f"Invalid JSON response from {fqid}: {e}")
+        return None
+
+    process_authors([author_data], local_node.url.rstrip("/"), node)
+    return AuthorProfile.objects.filter(fqid=fqid).first()
 
 
-def process_authors(authors_list, local_host, node):
+def active_remote_nodes():
     """
-    Process and save the authors from the response.
+    Active remote nodes by URL, loaded once per sync run instead of once per author.
+    """
+    return {
+        node.url: node for node in Node.objects.filter(is_remote=True, is_active=True)
+    }
+
+
+def author_fingerprint(data):
+    """
+    Hash of the fields we import for a remote author, to detect authors that have not changed.
+    """
+    fields = {field: data.get(field) for field in FINGERPRINT_FIELDS}
+    payload = json.dumps(fields, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def parse_authors(authors_list, local_host, node, nodes):
+    """
+    Validate a page of authors in memory, without touching the database.
+
+    Returns:
+        dict: {username: (author node, serial, validated data)} for every importable author.
     """
+    parsed = {}
     for author_data in authors_list:
+        if not isinstance(author_data, dict):
+            print(f"Invalid author data from {node.url}: {author_data}")
+            continue
         host = author_data.get("host")
         if not host:
             print(f"Author data missing 'host': {author_data}")
@@ -100,20 +393,134 @@ def process_authors(authors_list, local_host, node):
             continue
 
         # Ensure the associated node is active
-        try:
-            Node.objects.get(url=host, is_remote=True, is_active=True)
-        except Node.DoesNotExist:
+        author_node = nodes.get(host)
+        if author_node is None:
             print(
                 f"Associated node for author '{author_data.get('displayName')}' is not active: {host} or does not exist."
             )
             continue
 
-        # Save the author data using the serializer
         serializer = AuthorProfileSerializer(data=author_data)
-        if serializer.is_valid():
-            serializer.save()
-            print(
-                f"Imported author '{author_data.get('displayName')}' from {node.url}."
-            )
-        else:
+        if not serializer.is_valid() or not serializer.validated_data.get("id"):
             print(f"Invalid data for author from {node.url}: {serializer.errors}")
+            continue
+
+        # same username and serial as AuthorProfileSerializer.create
+        data = serializer.validated_data
+        serial = data["id"].rstrip("/").split("/")[-1]
+        username = f"{urlparse(host).netloc.replace('.', '_')}__{serial}"
+        parsed[username] = (author_node, serial, data)
+    return parsed
+
+
+def process_authors(authors_list, local_host, node, nodes=None):
+    """
+    Process and save the authors from the response.
+    The page is validated in memory and upserted with bulk queries in one transaction,
+    so the number of queries does not grow with the number of authors.
+
+    Args:
+        authors_list (list[dict]): Authors as returned by a node's `authors/` endpoint.
+        local_host (str): Our own node's URL, whose authors are skipped.
+        node (Node): The node the page came from.
+        nodes (dict): Active remote nodes by URL (see `active_remote_nodes`), shared by a sync run.
+
+    Returns:
+        dict: Number of authors created, updated and skipped as unchanged.
+    """
+    if nodes is None:
+        nodes = active_remote_nodes()
+    parsed = parse_authors(authors_list, local_host, node, nodes)
+    summary = {"created": 0, "updated": 0, "unchanged": 0}
+    if not parsed:
+        return summary
+
+    # skip authors whose data is the same as on the last sync
+    fingerprints = {
+        f"{author_node.url}authors/{serial}": (username, author_fingerprint(data))
+        for username, (author_node, serial, data) in parsed.items()
+    }
+    for fqid, fingerprint in AuthorProfile.objects.filter(
+        fqid__in=list(fingerprints)
+    ).values_list("fqid", "remote_fingerprint"):
+        username, new_fingerprint = fingerprints[fqid]
+        if fingerprint == new_fingerprint:
+            del parsed[username]
+            summary["unchanged"] += 1
+    if not parsed:
+        print(f"All {summary['unchanged']} authors from {node.url} are unchanged.")
+        return summary
+
+    changed_images = []
+    with transaction.atomic():
+        users = User.objects.in_bulk(list(parsed), field_name="username")
+        new_users, updated_users = [], []
+        for username, (author_node, serial, data) in parsed.items():
+            values = {
+                "display_name": data.get("displayName"),
+                "github_user": data.get("github"),
+                "profileImage": data.get("profileImage", ""),
+                "local_node": author_node,
+                "user_serial": serial,
+            }
+            user = users.get(username)
+            if user is None:
+                new_users.append(User(username=username, **values))
+                continue
+            if user.profileImage != values["profileImage"]:
+                changed_images.append(user)
+            for field, value in values.items():
+                setattr(user, field, value)
+            updated_users.append(user)
+
+        User.objects.bulk_create(new_users)
+        User.objects.bulk_update(updated_users, list(USER_FIELDS))
+        if new_users:
+            users = User.objects.in_bulk(list(parsed), field_name="username")
+
+        profiles = {
+            profile.user_id: profile
+            for profile in AuthorProfile.objects.filter(user__in=list(users.values()))
+        }
+        new_profiles, updated_profiles = [], []
+        for username, (author_node, serial, data) in parsed.items():
+            user = users[username]
+            # same fqid as AuthorProfile.save, which bulk queries bypass
+            fqid = f"{author_node.url}authors/{serial}"
+            fingerprint = fingerprints[fqid][1]
+            profile = profiles.get(user.pk)
+            if profile is None:
+                new_profiles.append(
+                    AuthorProfile(
+                        user=user,
+                        github=data.get("github"),
+                        fqid=fqid,
+                        remote_fingerprint=fingerprint,
+                    )
+                )
+            else:
+                profile.github = data.get("github")
+                profile.fqid = fqid
+                profile.remote_fingerprint = fingerprint
+                updated_profiles.append(profile)
+
+        AuthorProfile.objects.bulk_create(new_profiles)
+        AuthorProfile.objects.bulk_update(
+            updated_profiles, ["github", "fqid", "remote_fingerprint"]
+        )
+        # bulk queries send no signals
+        response_cache.invalidate(
+            response_cache.AUTHORS,
+            *(response_cache.author_scope(profile.pk) for profile in updated_profiles),
+        )
+
+    for user in changed_images:
+        update_notification_pictures(user, user.profileImage)
+
+    summary["created"] = len(new_profiles)
+    summary["updated"] = len(updated_profiles)
+    print(
+        f"Imported {summary['created']} new and updated {summary['updated']} authors from {node.url} "
+        f"({summary['unchanged']} unchanged)."
+    )
+    return summary
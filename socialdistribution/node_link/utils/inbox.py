@@ -0,0 +1,303 @@
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from rest_framework import status
+
+from authorApp.models import AuthorProfile, Follower, Friends
+from authorApp.serializers import FollowerSerializer
+from node_link.models import SeenActivity
+from node_link.utils.common import content_hash
+from node_link.utils.fetch_remote_authors import fetch_remote_author
+from postApp.models import Post
+from postApp.serializers import CommentSerializer, LikeSerializer, PostSerializer
+
+SEEN_ACTIVITY_DAYS = getattr(settings, "INBOX_SEEN_ACTIVITY_DAYS", 30)
+# follows carry no id and are idempotent already, so only these are deduplicated
+DEDUPLICATED_TYPES = ("post", "comment", "like")
+
+
+def accept_remote_follow(author, remote_author):
+    """
+    A remote author we asked to follow sent us a post, so our follow request was accepted.
+    Mark it accepted and become friends if the remote author follows us back.
+
+    Returns:
+        bool: Whether `author` follows `remote_author`.
+    """
+    if not remote_author.user.local_node.is_remote:
+        return False
+    to_update = Follower.objects.filter(object=remote_author, actor=author).first()
+    if to_update is None:
+        return False
+
+    # update follow
+    to_update.status = "a"
+    to_update.save()
+    # update friends
+    mutual_follow = Follower.objects.filter(
+        actor=remote_author, object=author, status="a"
+    ).exists()
+
+    if mutual_follow:
+        # Establish friendship
+        try:
+            # Ensure consistent ordering by user ID
+            user1, user2 = (
+                (remote_author, author)
+                if remote_author.id < author.id
+                else (author, remote_author)
+            )
+            Friends.objects.create(user1=user1, user2=user2, created_by=remote_author)
+            print(f"You are now friends with {author.user.user_serial}.")
+        except IntegrityError:
+            # Friendship already exists
+            print(f"You are already friends with {author.user.user_serial}.")
+    return True
+
+
+def get_inbox_serializer(author, data):
+    """
+    Build the serializer that stores one incoming activity for `author`.
+
+    Returns:
+        tuple: (serializer or None, error response (status_code, body) or None)
+    """
+    object_type = data.get("type")
+
+    # filter base on type
+    if object_type == "post":
+        post_id = data.get("id")  # Retrieve the ID of the post
+        if not post_id:
+            return None, (
+                status.HTTP_400_BAD_REQUEST,
+                {"error": "Post ID is required."},
+            )
+
+        remote_author = get_object_or_404(AuthorProfile, fqid=data["author"]["id"])
+        if not accept_remote_follow(author, remote_author):
+            return None, (
+                status.HTTP_403_FORBIDDEN,
+                {"error": "The author does not follow the sender."},
+            )
+
+        # Query the database to check if the post exists
+        post_instance = Post.objects.filter(fqid=post_id).first()
+        if post_instance:
+            # If the post exists, pass it to the serializer for updating
+            return (
+                PostSerializer(post_instance, data=data, context={"author": author}),
+                None,
+            )
+        # If the post doesn't exist, initialize the serializer for creating a new post
+        return PostSerializer(data=data, context={"author": author}), None
+    if object_type == "like":
+        return LikeSerializer(data=data, context={"author": author}), None
+    if object_type == "comment":
+        return CommentSerializer(data=data, context={"author": author}), None
+    if object_type == "follow":
+        return FollowerSerializer(data=data, context={"author": author}), None
+    return None, (status.HTTP_400_BAD_REQUEST, {"error": "Unsupported object type"})
+
+
+def sender_fqid(data):
+    """
+    FQID of the remote author who created an activity.
+    """
+    sender = data.get("actor") if data.get("type") == "follow" else data.get("author")
+    if isinstance(sender, dict):
+        return sender.get("id")
+    return None
+
+
+def ensure_sender_known(data):
+    """
+    Remote authors are synced in the background, so a sender may not be known yet.
+    Fetch just that author instead of crawling every node.
+    """
+    ensure_senders_known([data])
+
+
+def ensure_senders_known(activities):
+    """
+    Fetch the unknown senders of several activities, each once, with one query to find
+    them. This is HTTP, so callers run it before opening a transaction.
+    """
+    fqids = {
+        fqid for fqid in map(sender_fqid, activities) if isinstance(fqid, str) and fqid
+    }
+    if not fqids:
+        return
+    known = set(
+        AuthorProfile.objects.filter(fqid__in=fqids).values_list("fqid", flat=True)
+    )
+    for fqid in fqids - known:
+        fetch_remote_author(fqid)
+
+
+def activity_fingerprint(data):
+    """
+    Identify an activity for deduplication. Computed before any serializer runs,
+    since the post serializer rewrites some fields of the data it is given.
+
+    Returns:
+        tuple: (activity id, sha256 key of the type and id, hash of the whole activity),
+        or None if the activity is not deduplicated.
+    """
+    activity_id = data.get("id")
+    if data.get("type") not in DEDUPLICATED_TYPES or not isinstance(activity_id, str):
+        return None
+    key = hashlib.sha256(f"{data['type']} {activity_id}".encode("utf-8")).hexdigest()
+    return activity_id, key, content_hash(data)
+
+
+def is_replay(author, fingerprint):
+    """
+    Whether `author` already applied this exact activity (same id and same content).
+    A single indexed UPDATE, which also counts the replay.
+    """
+    if fingerprint is None:
+        return False
+    _, key, digest = fingerprint
+    return (
+        SeenActivity.objects.filter(
+            recipient=author, activity_key=key, content_hash=digest
+        ).update(replays=F("replays") + 1, last_seen_at=timezone.now())
+        > 0
+    )
+
+
+def remember_activity(author, fingerprint):
+    """
+    Record an applied activity so that copies of it are dropped by `is_replay`.
+    """
+    if fingerprint is not None:
+        activity_id, key, digest = fingerprint
+        SeenActivity.objects.update_or_create(
+            recipient=author,
+            activity_key=key,
+            defaults={"activity_id": activity_id, "content_hash": digest},
+        )
+
+
+def forget_old_activities():
+    """
+    Drop the dedup records of activities not seen for INBOX_SEEN_ACTIVITY_DAYS days.
+    """
+    cutoff = timezone.now() - timedelta(days=SEEN_ACTIVITY_DAYS)
+    return SeenActivity.objects.filter(last_seen_at__lt=cutoff).delete()[0]
+
+
+REPLAY_RESPONSE = (status.HTTP_200_OK, {"status": "already processed"})
+
+
+def process_inbox_activity(author, data, fetch_sender=True):
+    """
+    Validate and store one post/like/comment/follow activity sent to the inbox of `author`.
+    An activity that was already applied is acknowledged without touching the serializers.
+
+    Args:
+        author (AuthorProfile): The recipient.
+        data (dict): The activity.
+        fetch_sender (bool): Fetch an unknown sender first. Callers running inside a
+            transaction pass False and call `ensure_senders_known` before opening it.
+
+    Returns:
+        tuple: (HTTP status code, response body)
+    """
+    fingerprint = activity_fingerprint(data)
+    if is_replay(author, fingerprint):
+        return REPLAY_RESPONSE
+    if fetch_sender:
+        ensure_sender_known(data)
+    try:
+        serializer, error = get_inbox_serializer(author, data)
+        if error:
+            return error
+        # save the object to our database
+        if serializer.is_valid():
+            serializer.save()
+            remember_activity(author, fingerprint)
+            return status.HTTP_201_CREATED, {"status": "sucessful"}
+        return status.HTTP_400_BAD_REQUEST, serializer.errors
+    except Http404 as e:
+        return status.HTTP_404_NOT_FOUND, {"error": str(e) or "Not found."}
+
+
+def resolve_recipients(references):
+    """
+    Look up the local authors named by a batch in one query.
+    An author may be referenced by FQID, inbox URL or username (the author serial of the inbox URL).
+
+    Returns:
+        dict: {reference: AuthorProfile}
+    """
+    keys = {}
+    for ref in references:
+        if isinstance(ref, str) and ref:
+            keys[ref] = ref[: -len("/inbox")] if ref.endswith("/inbox") else ref
+    authors = AuthorProfile.objects.filter(
+        Q(fqid__in=keys.values()) | Q(user__username__in=keys.values()),
+        user__local_node__is_remote=False,
+    ).select_related("user__local_node")
+
+    by_key = {}
+    for author in authors:
+        by_key[author.fqid] = author
+        by_key[author.user.username] = author
+    return {ref: by_key[key] for ref, key in keys.items() if key in by_key}
+
+
+def process_inbox_batch(items):
+    """
+    Store a batch of activities in one transaction. Every item runs in its own savepoint,
+    so a bad item is rolled back and reported without affecting the others.
+
+    Args:
+        items (list[dict]): {"author": <FQID or serial of a local author>, "activity": {...}}
+
+    Returns:
+        list[dict]: {"index", "status", "body"} for every item, in order.
+    """
+    recipients = resolve_recipients(
+        item.get("author") for item in items if isinstance(item, dict)
+    )
+    # no HTTP while the transaction holds its locks
+    ensure_senders_known(
+        item["activity"]
+        for item in items
+        if isinstance(item, dict) and isinstance(item.get("activity"), dict)
+    )
+    results = []
+    with transaction.atomic():
+        for index, item in enumerate(items):
+            if not isinstance(item, dict) or not isinstance(item.get("activity"), dict):
+                code, body = status.HTTP_400_BAD_REQUEST, {
+                    "error": "Each item needs an author and an activity."
+                }
+            elif item.get("author") not in recipients:
+                code, body = status.HTTP_404_NOT_FOUND, {"error": "Author not found"}
+            else:
+                try:
+                    with transaction.atomic():
+                        code, body = process_inbox_activity(
+                            recipients[item["author"]],
+                            item["activity"],
+                            fetch_sender=False,
+                        )
+                        if code >= 300:
+                            # undo anything the failed item already wrote
+                            transaction.set_rollback(True)
+                except Exception as e:
+                    print(f"Unexpected error in inbox batch item {index}: {e}")
+                    code, body = status.HTTP_500_INTERNAL_SERVER_ERROR, {
+                        "error": "An unexpected error occurred",
+                        "details": str(e),
+                    }
+            results.append({"index": index, "status": code, "body": body})
+    return results
@@ -0,0 +1,233 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework import status
+
+from node_link.models import InboxActivity
+from node_link.utils.inbox import (
+    REPLAY_RESPONSE,
+    activity_fingerprint,
+    ensure_senders_known,
+    is_replay,
+    process_inbox_activity,
+    resolve_recipients,
+)
+from node_link.utils.outbox import worker_name
+
+MAX_ATTEMPTS = getattr(settings, "INBOX_MAX_ATTEMPTS", 3)
+BACKOFF_SECONDS = getattr(settings, "INBOX_BACKOFF_SECONDS", 30)
+MAX_BACKOFF_SECONDS = getattr(settings, "INBOX_MAX_BACKOFF_SECONDS", 3600)
+CLAIM_TIMEOUT_SECONDS = getattr(settings, "INBOX_CLAIM_TIMEOUT_SECONDS", 600)
+
+# the fields each activity type needs before it is worth queueing
+REQUIRED_FIELDS = {
+    "post": ("id", "author"),
+    "comment": ("author", "post", "comment"),
+    "like": ("author", "object"),
+    "follow": ("actor", "object"),
+}
+
+
+def inbox_async_enabled():
+    """
+    Whether inboxes queue activities (INBOX_ASYNC) instead of applying them before responding.
+    Read on every request so it can be switched without a code change.
+    """
+    return getattr(settings, "INBOX_ASYNC", False)
+
+
+def check_activity(data):
+    """
+    Cheap schema check done before queueing, without any database query.
+
+    Returns:
+        str: Why the activity is rejected, or None if it can be queued.
+    """
+    if not isinstance(data, dict):
+        return "The activity must be a JSON object."
+    object_type = data.get("type")
+    if object_type not in REQUIRED_FIELDS:
+        return "Unsupported object type"
+    missing = [field for field in REQUIRED_FIELDS[object_type] if not data.get(field)]
+    if missing:
+        return f"Missing field(s) for {object_type}: {', '.join(missing)}"
+    return None
+
+
+def enqueue_activity(author, data, sender_node=None):
+    """
+    Store an activity for `author` to be processed by the `process_inbox` command.
+    """
+    return InboxActivity.objects.create(
+        recipient=author,
+        sender_node=sender_node,
+        activity_type=data["type"],
+        payload=data,
+    )
+
+
+def enqueue_inbox_batch(items, sender_node=None):
+    """
+    Queue a batch of {"author", "activity"} items with one insert.
+
+    Returns:
+        list[dict]: {"index", "status", "body"} for every item, in order.
+    """
+    recipients = resolve_recipients(
+        item.get("author") for item in items if isinstance(item, dict)
+    )
+    results, queued = [], []
+    for index, item in enumerate(items):
+        activity = item.get("activity") if isinstance(item, dict) else None
+        error = check_activity(activity)
+        if error:
+            results.append(
+                {
+                    "index": index,
+                    "status": status.HTTP_400_BAD_REQUEST,
+                    "body": {"error": error},
+                }
+            )
+        elif item.get("author") not in recipients:
+            results.append(
+                {
+                    "index": index,
+                    "status": status.HTTP_404_NOT_FOUND,
+                    "body": {"error": "Author not found"},
+                }
+            )
+        elif is_replay(recipients[item["author"]], activity_fingerprint(activity)):
+            code, body = REPLAY_RESPONSE
+            results.append({"index": index, "status": code, "body": body})
+        else:
+            results.append(
+                {
+                    "index": index,
+                    "status": status.HTTP_202_ACCEPTED,
+                    "body": {"status": "queued"},
+                }
+            )
+            queued.append(
+                InboxActivity(
+                    recipient=recipients[item["author"]],
+                    sender_node=sender_node,
+                    activity_type=activity["type"],
+                    payload=activity,
+                )
+            )
+    InboxActivity.objects.bulk_create(queued)
+    return results
+
+
+def retry_delay(attempts):
+    """
+    Exponential backoff for an activity that has failed `attempts` times.
+    """
+    return timedelta(
+        seconds=min(BACKOFF_SECONDS * 2 ** (attempts - 1), MAX_BACKOFF_SECONDS)
+    )
+
+
+def release_stale_claims():
+    """
+    Put activities back in the queue if the processor that claimed them died.
+    """
+    cutoff = timezone.now() - timedelta(seconds=CLAIM_TIMEOUT_SECONDS)
+    return InboxActivity.objects.filter(status="i", claimed_at__lt=cutoff).update(
+        status="p", claimed_by="", claimed_at=None
+    )
+
+
+def claim_activities(batch_size, worker=None):
+    """
+    Atomically claim the oldest `batch_size` pending activities that are due, like the
+    outbox does.
+    """
+    worker = worker or worker_name()
+    now = timezone.now()
+
+    with transaction.atomic():
+        pending = InboxActivity.objects.filter(status="p", next_attempt_at__lte=now)
+        if connection.features.has_select_for_update_skip_locked:
+            pending = pending.select_for_update(skip_locked=True)
+        ids = list(
+            pending.order_by("received_at", "id").values_list("id", flat=True)[
+                :batch_size
+            ]
+        )
+        InboxActivity.objects.filter(id__in=ids, status="p").update(
+            status="i", claimed_by=worker, claimed_at=now
+        )
+
+    return list(
+        InboxActivity.objects.filter(status="i", claimed_by=worker, id__in=ids)
+        .select_related("recipient__user")
+        .order_by("received_at", "id")
+    )
+
+
+def apply_activity(activity):
+    """
+    Apply one queued activity in its own transaction and record the outcome.
+    """
+    activity.attempts += 1
+    try:
+        # fetching an unknown sender is HTTP, so it happens outside the transaction
+        ensure_senders_known([activity.payload])
+        with transaction.atomic():
+            code, body = process_inbox_activity(
+                activity.recipient, activity.payload, fetch_sender=False
+            )
+            if code >= 300:
+                transaction.set_rollback(True)
+    except Exception as e:
+        print(f"Unexpected error processing inbox activity {activity.pk}: {e}")
+        activity.last_error = str(e)
+        if activity.attempts >= MAX_ATTEMPTS:
+            activity.status = "f"
+        else:
+            activity.status = "p"
+            activity.next_attempt_at = timezone.now() + retry_delay(activity.attempts)
+    else:
+        activity.result_status = code
+        activity.status = "d" if code < 300 else "f"
+        activity.last_error = "" if code < 300 else str(body)
+
+    activity.claimed_by = ""
+    activity.claimed_at = None
+    activity.processed_at = timezone.now()
+    activity.save(
+        update_fields=[
+            "status",
+            "attempts",
+            "result_status",
+            "last_error",
+            "claimed_by",
+            "claimed_at",
+            "processed_at",
+            "next_attempt_at",
+        ]
+    )
+
+
+def process_inbox_queue(batch_size=100):
+    """
+    Claim a batch of queued activities and apply them in the order they arrived.
+
+    Returns:
+        dict: Number of activities claimed, applied, rejected and left to retry.
+    """
+    release_stale_claims()
+    activities = claim_activities(batch_size)
+    summary = {"claimed": len(activities), "done": 0, "failed": 0, "retry": 0}
+    for activity in activities:
+        apply_activity(activity)
+        if activity.status == "d":
+            summary["done"] += 1
+        elif activity.status == "f":
+            summary["failed"] += 1
+        else:
+            summary["retry"] += 1
+    return summary
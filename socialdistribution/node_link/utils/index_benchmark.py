@@ -0,0 +1,168 @@
+import time
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from authorApp.models import AuthorProfile, User
+from node_link.models import Node, Notification
+from postApp.models import Comment, Like, Post
+
+BENCH_URL = "http://index-benchmark.invalid/api/"
+# tables `seed` fills
+SEEDED_TABLES = (
+    "postApp_post",
+    "postApp_comment",
+    "postApp_like",
+    "node_link_notification",
+)
+
+
+class IndexCheck:
+    """
+    One federation lookup and the index that should serve it.
+
+    Attributes:
+        label (str): What the lookup is used for.
+        index (str): Name of the index the plan must use.
+        plan (str): The EXPLAIN output.
+        uses_index (bool): Whether the plan mentions the index.
+        elapsed_ms (float): Time taken to run the lookup once.
+    """
+
+    def __init__(self, label, index, queryset):
+        self.label = label
+        self.index = index
+        self.queryset = queryset
+        self.plan = ""
+        self.uses_index = False
+        self.elapsed_ms = None
+
+    def run(self):
+        # SQLite: "SEARCH ... USING INDEX <name>", PostgreSQL: "Index Scan using <name>"
+        self.plan = self.queryset.explain()
+        self.uses_index = self.index in self.plan
+        start = time.monotonic()
+        list(self.queryset)
+        self.elapsed_ms = (time.monotonic() - start) * 1000
+        return self
+
+
+def seed(rows):
+    """
+    Fill the federation tables with `rows` posts, comments, likes and notifications
+    on a throwaway node, so the planner sees realistically sized tables.
+
+    Returns:
+        tuple: (a post, a comment, a like, a notification) to look up.
+    """
+    admin = User.objects.create(username="index_benchmark_admin")
+    node = Node.objects.create(url=BENCH_URL, is_remote=True, created_by=admin)
+    author_count = min(rows, 100)
+    users = User.objects.bulk_create(
+        User(
+            username=f"index-benchmark_invalid__a{i}",
+            user_serial=f"a{i}",
+            local_node=node,
+        )
+        for i in range(author_count)
+    )
+    authors = AuthorProfile.objects.bulk_create(
+        AuthorProfile(user=user, fqid=f"{BENCH_URL}authors/{user.user_serial}")
+        for user in users
+    )
+
+    def author(i):
+        return authors[i % author_count]
+
+    now = timezone.now()
+    stamps = {"created_at": now, "updated_at": now, "deleted_at": now}
+
+    posts = Post.objects.bulk_create(
+        Post(
+            node=node,
+            author=author(i),
+            created_by=author(i),
+            post_serial=str(i),
+            fqid=f"{BENCH_URL}authors/{author(i).user.user_serial}/posts/{i}",
+            **stamps,
+        )
+        for i in range(rows)
+    )
+    comments = Comment.objects.bulk_create(
+        Comment(
+            post=post,
+            author=author(i + 1),
+            created_by=author(i + 1),
+            content="benchmark",
+            comment_serial=str(i),
+            fqid=f"{BENCH_URL}authors/{author(i + 1).user.user_serial}/commented/{i}",
+            **stamps,
+        )
+        for i, post in enumerate(posts)
+    )
+    likes = Like.objects.bulk_create(
+        Like(
+            post=post,
+            author=author(i + 1),
+            created_by=author(i + 1),
+            like_serial=str(i),
+            fqid=f"{BENCH_URL}authors/{author(i + 1).user.user_serial}/liked/{i}",
+            **stamps,
+        )
+        for i, post in enumerate(posts)
+    )
+    notifications = Notification.objects.bulk_create(
+        Notification(
+            user=like.post.author,
+            message="benchmark",
+            notification_type="like",
+            related_object_id=str(like.id),
+        )
+        for like in likes
+    )
+
+    if connection.vendor == "postgresql":
+        # let the planner see the new row counts
+        with connection.cursor() as cursor:
+            for table in SEEDED_TABLES:
+                cursor.execute(f"ANALYZE {connection.ops.quote_name(table)}")
+
+    middle = rows // 2
+    return posts[middle], comments[middle], likes[middle], notifications[middle]
+
+
+def check_indexes(rows=10000):
+    """
+    Seed large tables, EXPLAIN every federation lookup and roll everything back.
+
+    Returns:
+        list[IndexCheck]: One check per lookup, with its plan and timing.
+    """
+    with transaction.atomic():
+        post, comment, like, notification = seed(rows)
+        checks = [
+            IndexCheck(
+                "Post by fqid", "post_fqid_idx", Post.objects.filter(fqid=post.fqid)
+            ),
+            IndexCheck(
+                "Comment by fqid",
+                "comment_fqid_idx",
+                Comment.objects.filter(fqid=comment.fqid),
+            ),
+            IndexCheck(
+                "Like by fqid", "like_fqid_idx", Like.objects.filter(fqid=like.fqid)
+            ),
+            IndexCheck(
+                "Notification by user, type and object",
+                "notification_lookup_idx",
+                Notification.objects.filter(
+                    user=notification.user,
+                    notification_type="like",
+                    related_object_id=notification.related_object_id,
+                ),
+            ),
+        ]
+        for check in checks:
+            check.run()
+        transaction.set_rollback(True)
+    return checks
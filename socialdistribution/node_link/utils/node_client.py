@@ -0,0 +1,106 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+TIMEOUT = getattr(settings, "NODE_HTTP_TIMEOUT", 10)
+POOL_CONNECTIONS = getattr(settings, "NODE_HTTP_POOL_CONNECTIONS", 4)
+POOL_MAXSIZE = getattr(settings, "NODE_HTTP_POOL_MAXSIZE", 16)
+
+_clients = {}
+_clients_lock = threading.Lock()
+# the session for third-party APIs, created on first use
+_external = {}
+
+
+def build_session():
+    """
+    Create a requests session with a bounded keep-alive connection pool.
+    Retries are left to the callers (e.g. the outbox) so a dead node is not hammered.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=0
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class NodeClient:
+    """
+    Long-lived HTTP session for talking to one remote node.
+    Basic auth and the `X-original-host` header are set once on the session,
+    so every request reuses the pooled TCP/TLS connections to that node.
+    """
+
+    def __init__(self, node, original_host=None):
+        self.node = node
+        self.fingerprint = client_fingerprint(node, original_host)
+        self.session = build_session()
+        self.session.auth = (node.username, node.raw_password)
+        if original_host:
+            self.session.headers["X-original-host"] = original_host
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", TIMEOUT)
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+def client_fingerprint(node, original_host):
+    return (node.url, node.username, node.raw_password, original_host)
+
+
+def get_client(node, local_node=None):
+    """
+    Return the shared NodeClient for a saved node, creating it on first use.
+    The client is rebuilt if the node's URL or credentials have changed.
+
+    Args:
+        node (Node): The remote node to talk to.
+        local_node (Node): Our own node, used for the `X-original-host` header.
+    """
+    original_host = local_node.url if local_node else None
+    if node.pk is None:
+        # unsaved nodes (e.g. while validating in the admin) get a throwaway client
+        return NodeClient(node, original_host)
+
+    fingerprint = client_fingerprint(node, original_host)
+    with _clients_lock:
+        client = _clients.get(node.pk)
+        if client is None or client.fingerprint != fingerprint:
+            if client is not None:
+                client.close()
+            client = NodeClient(node, original_host)
+            _clients[node.pk] = client
+        return client
+
+
+def drop_client(node_pk):
+    """
+    Close and forget the pooled client of a node (e.g. after it was deleted).
+    """
+    with _clients_lock:
+        client = _clients.pop(node_pk, None)
+    if client is not None:
+        client.close()
+
+
+def external_session():
+    """
+    Shared pooled session for third-party APIs that are not federation nodes (e.g. GitHub).
+    """
+    with _clients_lock:
+        if "session" not in _external:
+            _external["session"] = build_session()
+        return _external["session"]
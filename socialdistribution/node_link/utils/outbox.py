@@ -0,0 +1,195 @@
+import socket
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from node_link.models import Node, OutboxDelivery
+from node_link.utils import circuit_breaker
+from node_link.utils.fanout_executor import deliver_all
+
+MAX_ATTEMPTS = getattr(settings, "OUTBOX_MAX_ATTEMPTS", 8)
+BACKOFF_SECONDS = getattr(settings, "OUTBOX_BACKOFF_SECONDS", 30)
+MAX_BACKOFF_SECONDS = getattr(settings, "OUTBOX_MAX_BACKOFF_SECONDS", 3600)
+CLAIM_TIMEOUT_SECONDS = getattr(settings, "OUTBOX_CLAIM_TIMEOUT_SECONDS", 600)
+
+
+def worker_name():
+    """
+    Identifies this worker process in `OutboxDelivery.claimed_by`.
+    """
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def retry_delay(attempts):
+    """
+    Exponential backoff for a delivery that has failed `attempts` times.
+    """
+    return timedelta(
+        seconds=min(BACKOFF_SECONDS * 2 ** (attempts - 1), MAX_BACKOFF_SECONDS)
+    )
+
+
+def release_stale_claims():
+    """
+    Put deliveries back in the queue if the worker that claimed them died mid-flight.
+    """
+    cutoff = timezone.now() - timedelta(seconds=CLAIM_TIMEOUT_SECONDS)
+    return OutboxDelivery.objects.filter(status="i", claimed_at__lt=cutoff).update(
+        status="p", claimed_by="", claimed_at=None
+    )
+
+
+def claim_due_deliveries(batch_size, worker=None):
+    """
+    Atomically claim up to `batch_size` pending deliveries that are due.
+    Rows locked by another worker are skipped where the database supports it;
+    the conditional update keeps two workers from claiming the same row elsewhere.
+    """
+    worker = worker or worker_name()
+    now = timezone.now()
+
+    with transaction.atomic():
+        due = OutboxDelivery.objects.filter(status="p", next_attempt_at__lte=now)
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        ids = list(
+            due.order_by("next_attempt_at").values_list("id", flat=True)[:batch_size]
+        )
+        OutboxDelivery.objects.filter(id__in=ids, status="p").update(
+            status="i", claimed_by=worker, claimed_at=now
+        )
+
+    return list(
+        OutboxDelivery.objects.filter(status="i", claimed_by=worker, id__in=ids)
+        .select_related("activity", "node")
+        .order_by("next_attempt_at")
+    )
+
+
+def defer(delivery, until, reason):
+    """
+    Put a claimed delivery back without counting an attempt (e.g. its node's breaker is open).
+    """
+    delivery.status = "p"
+    delivery.next_attempt_at = until
+    delivery.last_error = reason
+    delivery.claimed_by = ""
+    delivery.claimed_at = None
+    delivery.save(
+        update_fields=[
+            "status",
+            "next_attempt_at",
+            "last_error",
+            "claimed_by",
+            "claimed_at",
+        ]
+    )
+
+
+# the node may accept the same request later
+RETRYABLE_CLIENT_ERRORS = (408, 429)
+
+
+def is_permanent_failure(status_code):
+    """
+    Whether a response means the delivery can never succeed (a 4xx other than timeout
+    or rate limiting). Server errors and transport errors (no status) are retried.
+    """
+    return (
+        isinstance(status_code, int)
+        and 400 <= status_code < 500
+        and status_code not in RETRYABLE_CLIENT_ERRORS
+    )
+
+
+def record_result(delivery, error, status_code=None):
+    """
+    Store the outcome of a delivery attempt and schedule a retry if it failed.
+    Deliveries rejected with a permanent 4xx are given up on straight away.
+    """
+    now = timezone.now()
+    delivery.attempts += 1
+    delivery.claimed_by = ""
+    delivery.claimed_at = None
+
+    if error is None:
+        delivery.status = "s"
+        delivery.last_error = ""
+        delivery.delivered_at = now
+    else:
+        delivery.last_error = error
+        if (
+            delivery.attempts >= MAX_ATTEMPTS
+            or not delivery.node.is_active
+            or is_permanent_failure(status_code)
+        ):
+            delivery.status = "f"
+        else:
+            delivery.status = "p"
+            delivery.next_attempt_at = now + retry_delay(delivery.attempts)
+
+    delivery.save(
+        update_fields=[
+            "status",
+            "attempts",
+            "last_error",
+            "next_attempt_at",
+            "claimed_by",
+            "claimed_at",
+            "delivered_at",
+        ]
+    )
+
+
+def process_outbox(batch_size=100, concurrency=8):
+    """
+    Claim a batch of due deliveries, send them with the fan-out executor and record the results.
+
+    Returns:
+        dict: Number of deliveries claimed, sent, retried, deferred and given up on.
+    """
+    release_stale_claims()
+    deliveries = claim_due_deliveries(batch_size)
+    summary = {
+        "claimed": len(deliveries),
+        "sent": 0,
+        "retry": 0,
+        "failed": 0,
+        "deferred": 0,
+    }
+    if not deliveries:
+        return summary
+
+    local_node = Node.objects.filter(is_remote=False).first()
+    results = deliver_all(
+        [(d, d.inbox_url, d.node, d.activity.payload) for d in deliveries],
+        local_node,
+        concurrency=concurrency,
+    )
+
+    for result in results:
+        delivery = result.key
+        if result.skipped:
+            # the node's breaker is open: try again once it may be probed, without using an attempt
+            until = circuit_breaker.retry_at(result.node)
+            defer(
+                delivery,
+                max(until, timezone.now() + timedelta(seconds=1)),
+                result.error,
+            )
+            summary["deferred"] += 1
+            continue
+
+        record_result(delivery, result.error, result.status_code)
+        if delivery.status == "s":
+            summary["sent"] += 1
+        elif delivery.status == "p":
+            summary["retry"] += 1
+        else:
+            summary["failed"] += 1
+            print(f"Giving up on {delivery.inbox_url}: {delivery.last_error}")
+
+    return summary
@@ -0,0 +1,152 @@
+import hashlib
+import uuid
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from node_link.models import CacheVersion
+from node_link.utils.common import etag_response
+from postApp.models import Comment, Post
+
+RESPONSE_CACHE_SECONDS = getattr(settings, "RESPONSE_CACHE_SECONDS", 300)
+# bump when the cached structure changes, so old entries are never read back
+CACHE_FORMAT = 2
+
+# what a cached body is built from; every write replaces the version of the scopes it touches
+EVERYTHING = "all"  # every body: nodes (embedded everywhere) and counter repairs
+AUTHORS = "authors"  # the author list
+
+
+def author_scope(author_id):
+    """
+    One author, embedded in their profile and in each of their posts.
+    """
+    return f"author:{author_id}"
+
+
+def posts_scope(author_id):
+    """
+    The post list of one author, with the counters and latest children of every post.
+    """
+    return f"posts:{author_id}"
+
+
+def post_scope(post_id):
+    """
+    One post, with its counters and latest comments and likes.
+    """
+    return f"post:{post_id}"
+
+
+def versions(scopes):
+    """
+    Current version of each scope, in the order given, with one query; None the first
+    time a scope is asked for (its version is created then, for the next request).
+    """
+    found = dict(
+        CacheVersion.objects.filter(scope__in=scopes).values_list("scope", "version")
+    )
+    missing = [scope for scope in scopes if scope not in found]
+    if missing:
+        CacheVersion.objects.bulk_create(
+            [CacheVersion(scope=scope) for scope in missing], ignore_conflicts=True
+        )
+        return None
+    return [found[scope].hex for scope in scopes]
+
+
+def response_etag(request, scopes, audience="public"):
+    """
+    Strong ETag of a GET, from its path and query (in any parameter order), the audience
+    it is built for and the versions of the scopes the body is built from. Computed
+    without building the body; None if a scope has no version yet.
+    """
+    current = versions(sorted({EVERYTHING, *scopes}))
+    if current is None:
+        return None
+    query = urlencode(sorted(request.GET.lists()), doseq=True)
+    validator = "|".join([str(CACHE_FORMAT), audience, f"{request.path}?{query}"])
+    digest = hashlib.sha256("|".join([validator, *current]).encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def cached_response(request, scopes, build, audience="public"):
+    """
+    Answer a GET with a strong ETag computed from versions alone: a client that already
+    has it gets a 304 before anything is built, and other clients get the body cached
+    under that ETag. A repeat poll costs one indexed query.
+
+    The versions live in the database, so a body cached by one process is never served
+    by another after a change, even with a per-process cache.
+
+    Args:
+        request (Request): The GET request.
+        scopes (list[str]): What the body is built from (see `author_scope` etc.);
+            None if it cannot be cached, e.g. the rows were not found.
+        build (callable): Returns the body; a Response it returns (e.g. a 403) is sent
+            as is and not cached.
+        audience (str): Requests that may see different rows for the same URL must pass
+            different audiences (see `node_link.utils.visibility.audience`).
+
+    Returns:
+        Response: The body, or an empty 304.
+    """
+    if request.method != "GET":
+        return build()
+    etag = None if scopes is None else response_etag(request, scopes, audience)
+    if etag is None:
+        data = build()
+        return data if isinstance(data, Response) else etag_response(request, data)
+
+    if etag in parse_etags(request.headers.get("If-None-Match", "")):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        response["ETag"] = etag
+        return response
+    key = f"response:{etag[1:-1]}"
+    data = cache.get(key)
+    if data is None:
+        data = build()
+        if isinstance(data, Response):
+            return data
+        cache.set(key, data, RESPONSE_CACHE_SECONDS)
+    return etag_response(request, data, etag)
+
+
+def invalidate(*scopes):
+    """
+    Replace the versions of `scopes`, in the current transaction: responses built from
+    the old rows keep the old ETags and cache keys, which are never used again.
+    """
+    CacheVersion.objects.bulk_create(
+        # sorted, so concurrent writers lock the rows in the same order
+        [
+            CacheVersion(scope=scope, version=uuid.uuid4())
+            for scope in sorted(set(scopes))
+        ],
+        update_conflicts=True,
+        unique_fields=["scope"],
+        update_fields=["version"],
+    )
+
+
+def invalidate_posts(post_ids=(), comment_ids=()):
+    """
+    Invalidate posts whose comments or likes changed, and the post lists of their
+    authors. Posts that no longer exist are skipped (their deletion invalidated them).
+    """
+    post_ids = set(post_ids)
+    if comment_ids:
+        post_ids.update(
+            Comment.objects.filter(pk__in=comment_ids).values_list("post_id", flat=True)
+        )
+    scopes = []
+    for post_id, author_id in Post.objects.filter(pk__in=post_ids).values_list(
+        "pk", "author_id"
+    ):
+        scopes += [post_scope(post_id), posts_scope(author_id)]
+    if scopes:
+        invalidate(*scopes)
@@ -0,0 +1,16 @@
+from django.conf import settings
+
+# backends whose entries live in a single process
+PROCESS_LOCAL_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def is_shared(alias="default"):
+    """
+    Whether every web worker and background process reads the same cache (Redis, the
+    database, ...), so an entry invalidated by one of them is invalidated for all.
+    """
+    backend = settings.CACHES.get(alias, {}).get("BACKEND", "")
+    return backend not in PROCESS_LOCAL_BACKENDS
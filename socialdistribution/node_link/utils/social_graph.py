@@ -0,0 +1,116 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+from authorApp.models import Follower, Friends
+from node_link.utils.shared_cache import is_shared
+
+GRAPH_CACHE_SECONDS = getattr(settings, "SOCIAL_GRAPH_CACHE_SECONDS", 3600)
+# with a per-process cache other processes never see our invalidations, so entries are
+# only reused for a few seconds (within a request or a fan-out)
+GRAPH_LOCAL_CACHE_SECONDS = getattr(settings, "SOCIAL_GRAPH_LOCAL_CACHE_SECONDS", 5)
+# bump when the cached structure changes, so old entries are never read back
+GRAPH_FORMAT = 1
+
+
+class SocialGraph:
+    """
+    The relations of one author, as frozensets of author ids.
+
+    Attributes:
+        friends (frozenset): Authors that are friends with the author.
+        following (frozenset): Authors the author follows (accepted).
+        followers (frozenset): Authors following the author (accepted).
+        requested (frozenset): Authors the author asked to follow, still pending.
+        requests (frozenset): Authors that asked to follow the author, still pending.
+        denied (frozenset): Authors that denied the author's follow request.
+    """
+
+    def __init__(self, friends, following, followers, requested, requests, denied):
+        self.friends = frozenset(friends)
+        self.following = frozenset(following)
+        self.followers = frozenset(followers)
+        self.requested = frozenset(requested)
+        self.requests = frozenset(requests)
+        self.denied = frozenset(denied)
+
+
+def _version_key(author_id):
+    return f"social_graph:{GRAPH_FORMAT}:version:{author_id}"
+
+
+def _graph_key(author_id, version):
+    return f"social_graph:{GRAPH_FORMAT}:{author_id}:{version}"
+
+
+def load_graph(author_id):
+    """
+    Read the relations of an author from the database (two queries).
+    """
+    friends = set()
+    for u1, u2 in Friends.objects.filter(
+        Q(user1_id=author_id) | Q(user2_id=author_id)
+    ).values_list("user1_id", "user2_id"):
+        friends.add(u2 if u1 == author_id else u1)
+
+    outgoing = {"a": set(), "p": set(), "d": set()}
+    incoming = {"a": set(), "p": set(), "d": set()}
+    for actor_id, object_id, status in Follower.objects.filter(
+        Q(actor_id=author_id) | Q(object_id=author_id)
+    ).values_list("actor_id", "object_id", "status"):
+        if actor_id == author_id:
+            outgoing.setdefault(status, set()).add(object_id)
+        if object_id == author_id:
+            incoming.setdefault(status, set()).add(actor_id)
+
+    return SocialGraph(
+        friends=friends,
+        following=outgoing["a"],
+        followers=incoming["a"],
+        requested=outgoing["p"],
+        requests=incoming["p"],
+        denied=outgoing["d"],
+    )
+
+
+def social_graph(author):
+    """
+    The relations of `author` (an AuthorProfile or its id), from the cache when possible.
+
+    Entries are keyed by a per-author version that `invalidate` replaces. With a shared
+    cache (e.g. REDIS_URL) no process reads a graph cached before the last change, whichever
+    process made it; with the default per-process cache a change made elsewhere is only seen
+    once the entry expires, after GRAPH_LOCAL_CACHE_SECONDS.
+    """
+    author_id = getattr(author, "id", author)
+    version_key = _version_key(author_id)
+    version = cache.get(version_key)
+    if version is None:
+        # never a reused number: an evicted version must not bring old graphs back
+        cache.add(version_key, uuid.uuid4().hex, None)
+        version = cache.get(version_key)
+    graph = cache.get(_graph_key(author_id, version)) if version else None
+    if graph is None:
+        graph = load_graph(author_id)
+        if version:
+            timeout = GRAPH_CACHE_SECONDS if is_shared() else GRAPH_LOCAL_CACHE_SECONDS
+            cache.set(_graph_key(author_id, version), graph, timeout)
+    return graph
+
+
+def _bump(author_ids):
+    cache.set_many(
+        {_version_key(author_id): uuid.uuid4().hex for author_id in author_ids}, None
+    )
+
+
+def invalidate(*author_ids):
+    """
+    Make the cached graphs of the given authors stale, now and again once the current
+    transaction commits (a graph read meanwhile by another worker is still the old one).
+    """
+    _bump(author_ids)
+    transaction.on_commit(lambda: _bump(author_ids))
@@ -0,0 +1,159 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+
+from authorApp.models import AuthorProfile
+from node_link.models import TimelineEntry
+from node_link.utils.cursor import keyset_page
+from node_link.utils.visibility import stream_filter
+from postApp.models import Post
+
+TIMELINE_LENGTH = getattr(settings, "HOME_TIMELINE_LENGTH", 50)
+
+
+def is_local(author):
+    node = author.user.local_node
+    return node is not None and not node.is_remote
+
+
+def local_authors():
+    """
+    The authors that have a home timeline: everyone on our own node.
+    """
+    return AuthorProfile.objects.filter(user__local_node__is_remote=False)
+
+
+def audience(post):
+    """
+    The local authors whose timeline should contain `post`.
+    """
+    if post.visibility == "d":
+        return local_authors().none()
+    own = Q(id=post.author_id)
+    if post.visibility == "p":
+        return local_authors()
+    if post.visibility == "fo":
+        readers = (
+            own
+            | Q(friendships_initiated__user2_id=post.author_id)
+            | Q(friendships_received__user1_id=post.author_id)
+        )
+    elif post.visibility == "u":
+        readers = own | Q(
+            followers_initiated__object_id=post.author_id,
+            followers_initiated__status="a",
+        )
+    else:
+        readers = own
+    return local_authors().filter(readers).distinct()
+
+
+def _add_entries(owners, posts):
+    """
+    Insert the missing entries for every author in `owners` and post in `posts` (querysets).
+    """
+    post_rows = list(posts.values_list("id", "updated_at"))
+    owner_ids = list(owners.values_list("id", flat=True))
+    if not post_rows or not owner_ids:
+        return
+    have = set(
+        TimelineEntry.objects.filter(owner__in=owners, post__in=posts).values_list(
+            "owner_id", "post_id"
+        )
+    )
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(owner_id=owner_id, post_id=pk, sort_at=updated_at)
+            for owner_id in owner_ids
+            for pk, updated_at in post_rows
+            if (owner_id, pk) not in have
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def refresh_post(post):
+    """
+    Put a created or edited post on the timelines of its audience, move it to the top
+    of the ones it stays on and take it off the others (e.g. once it is deleted).
+    """
+    with transaction.atomic():
+        readers = audience(post)
+        TimelineEntry.objects.filter(post=post).exclude(
+            owner__in=readers.values("id")
+        ).delete()
+        TimelineEntry.objects.filter(post=post).update(sort_at=post.updated_at)
+        _add_entries(readers, Post.objects.filter(pk=post.pk))
+
+
+def add_new_posts(posts):
+    """
+    Put posts inserted with `bulk_create` (which sends no post_save) on the timelines
+    of their audience.
+    """
+    groups = {}
+    for post in posts:
+        groups.setdefault((post.author_id, post.visibility), []).append(post)
+    with transaction.atomic():
+        for group in groups.values():
+            _add_entries(
+                audience(group[0]), Post.objects.filter(pk__in=[p.pk for p in group])
+            )
+
+
+def refresh_pair(viewer, author, add=True):
+    """
+    Follow or friend state between `viewer` and `author` changed: update which posts of
+    `author` are on the timeline of `viewer`.
+
+    Args:
+        add (bool): Also add newly visible posts. False while the relation is being deleted,
+            since that can only hide posts (and `viewer` may be going away too).
+    """
+    if not is_local(viewer):
+        return
+    with transaction.atomic():
+        posts = Post.objects.filter(author=author)
+        visible = posts.filter(stream_filter(viewer))
+        TimelineEntry.objects.filter(owner=viewer, post__in=posts).exclude(
+            post__in=visible
+        ).delete()
+        if add:
+            _add_entries(AuthorProfile.objects.filter(pk=viewer.pk), visible)
+
+
+def rebuild_timeline(owner):
+    """
+    Recompute the whole timeline of a local author from the posts table.
+
+    Returns:
+        int: Number of entries on the timeline.
+    """
+    with transaction.atomic():
+        TimelineEntry.objects.filter(owner=owner).delete()
+        _add_entries(
+            AuthorProfile.objects.filter(pk=owner.pk),
+            Post.objects.filter(stream_filter(owner)),
+        )
+    return TimelineEntry.objects.filter(owner=owner).count()
+
+
+def home_timeline(owner, cursor=None, limit=None):
+    """
+    One page of the timeline of `owner`, newest first, keyset-paginated on (sort_at, id).
+
+    Returns:
+        tuple: (post UUIDs, cursor of the next page or None)
+
+    Raises:
+        ValueError: If the cursor is invalid.
+    """
+    entries = (
+        TimelineEntry.objects.filter(owner=owner)
+        .annotate(post_uuid=F("post__uuid"))
+        .only("id", "sort_at")
+    )
+    entries, next_cursor = keyset_page(
+        entries, ["-sort_at", "-id"], cursor, limit or TIMELINE_LENGTH
+    )
+    return [entry.post_uuid for entry in entries], next_cursor
@@ -0,0 +1,84 @@
+from django.db.models import Q
+
+from authorApp.models import AuthorProfile, Follower, Friends
+from postApp.models import Post
+
+
+def viewer_of(request):
+    """
+    The author making a request, or None for a remote node or a user without a profile.
+    """
+    user = request.user
+    if not getattr(user, "is_authenticated", False):
+        return None
+    try:
+        profile = user.author_profile
+    except (AttributeError, AuthorProfile.DoesNotExist):
+        return None
+    return profile if isinstance(profile, AuthorProfile) else None
+
+
+def _friends_of(viewer):
+    # Friends rows are stored once per pair, in either column
+    return Q(author__in=Friends.objects.filter(user1=viewer).values("user2")) | Q(
+        author__in=Friends.objects.filter(user2=viewer).values("user1")
+    )
+
+
+def visibility_filter(viewer):
+    """
+    Posts `viewer` may open: public and unlisted posts, friends-only posts of friends
+    and their own posts, never deleted ones. Without a viewer only public and unlisted posts.
+    """
+    visible = Q(visibility__in=["p", "u"])
+    if viewer is not None:
+        visible |= Q(author=viewer) | Q(visibility="fo") & _friends_of(viewer)
+    return visible & ~Q(visibility="d")
+
+
+def stream_filter(viewer):
+    """
+    Posts on the home stream of `viewer`: like `visibility_filter`, except that unlisted
+    posts only show up from authors `viewer` follows (or their own).
+    """
+    following = Follower.objects.filter(actor=viewer, status="a").values("object")
+    return (
+        Q(visibility="p")
+        | Q(visibility="fo") & _friends_of(viewer)
+        | Q(visibility="u", author__in=following)
+        | Q(author=viewer)
+    ) & ~Q(visibility="d")
+
+
+def visible_posts(viewer, queryset=None):
+    """
+    The subset of `queryset` (all posts by default) that `viewer` may see, as one SQL filter.
+    """
+    queryset = Post.objects.all() if queryset is None else queryset
+    return queryset.filter(visibility_filter(viewer))
+
+
+def can_view(viewer, post):
+    """
+    Whether `viewer` may see a single post.
+    """
+    return visible_posts(viewer, Post.objects.filter(pk=post.pk)).exists()
+
+
+def audience(viewer, author_id):
+    """
+    Which posts of the author `author_id` `viewer` may see: "friends" (friends-only
+    posts included, for the author and their friends) or "public". Viewers with the same
+    audience see the same posts, so responses can be shared between them.
+
+    Read from the database rather than a cached social graph: a stale "friends" would
+    hand friends-only posts to someone who was just unfriended.
+    """
+    if viewer is None:
+        return "public"
+    if viewer.pk == author_id:
+        return "friends"
+    is_friend = Friends.objects.filter(
+        Q(user1=viewer, user2_id=author_id) | Q(user2=viewer, user1_id=author_id)
+    ).exists()
+    return "friends" if is_friend else "public"
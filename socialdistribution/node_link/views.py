@@ -5,7 +5,7 @@ from rest_framework.decorators import (
     authentication_classes,
 )
 from django.shortcuts import render
-from django.http import HttpResponseNotAllowed
+from django.http import HttpResponseBadRequest, HttpResponseNotAllowed
 from django.contrib.auth.decorators import login_required
 from django.db import IntegrityError
 from django.db.models import Q
@@ -24,8 +24,9 @@ from node_link.models import Node, Notification
 from authorApp.models import Friends, Follower, AuthorProfile
 from postApp.models import Post
 from node_link.utils.common import is_approved
+from node_link.utils.timeline import home_timeline
 
-from postApp.utils.fetch_github_activity import fetch_github_events
+from postApp.utils.cards import card_batch_urls
 
 # post edit/create methods
 
@@ -37,46 +38,45 @@ def home(request, username):
         template_name = "home.html"
         user = request.user.author_profile
 
-        github_activity = fetch_github_events(request)
+        # the timeline is kept up to date when posts, follows and friendships change;
+        # only the first page is rendered, the rest is loaded by `home_stream`
+        all_posts, next_cursor = home_timeline(user)
 
-        friends = list(
-            Friends.objects.filter(Q(user1=user) | Q(user2=user)).values_list(
-                "user1", "user2"
-            )
-        )
-        friends = list(set(u_id for tup in friends for u_id in tup))
-        following = list(
-            Follower.objects.filter(Q(actor=user, status="a")).values_list(
-                "object", flat=True
-            )
-        )
-
-        # Get all posts
-        all_posts = list(
-            Post.objects.filter(
-                Q(visibility="p")  # all public
-                | Q(
-                    visibility="fo",  # all friends only
-                    author_id__in=friends,
-                )
-                | Q(
-                    visibility="u",  # all unlisted
-                    author_id__in=following,
-                )
-                | Q(author_id=user.id) & ~Q(visibility="d")
-            )
-            .distinct()
-            .order_by("-updated_at")
-            .values_list("uuid", flat=True)
-        )
-
-        context = {"all_ids": all_posts, "github_activity": github_activity}
+        context = {
+            "all_ids": all_posts,
+            "card_urls": card_batch_urls(request.user.username, all_posts),
+            "next_cursor": next_cursor,
+        }
 
         # Return the rendered template
         return render(request, template_name, context)
     return HttpResponseNotAllowed("Invalid Method;go home")
 
 
+@is_approved
+def home_stream(request, username):
+    """
+    The next page of the home stream, as post cards followed by the trigger that loads the page after it.
+    """
+    if request.method != "GET":
+        return HttpResponseNotAllowed("Invalid Method;go home")
+    try:
+        all_posts, next_cursor = home_timeline(
+            request.user.author_profile, request.GET.get("cursor")
+        )
+    except ValueError:
+        return HttpResponseBadRequest("Invalid cursor.")
+    return render(
+        request,
+        "home_stream.html",
+        {
+            "all_ids": all_posts,
+            "card_urls": card_batch_urls(request.user.username, all_posts),
+            "next_cursor": next_cursor,
+        },
+    )
+
+
 @is_approved
 def notifications_view(request):
     notifications = Notification.objects.filter(
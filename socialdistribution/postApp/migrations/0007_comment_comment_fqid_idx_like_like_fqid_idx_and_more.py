@@ -0,0 +1,27 @@
+# Generated by Django 5.1.1 on 2026-10-18 19:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authorApp", "0013_authorprofile_remote_fingerprint"),
+        ("node_link", "0015_notification_notification_lookup_idx"),
+        ("postApp", "0006_alter_post_contenttype"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(fields=["fqid"], name="comment_fqid_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="like",
+            index=models.Index(fields=["fqid"], name="like_fqid_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(fields=["fqid"], name="post_fqid_idx"),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.1.1 on 2026-10-18 20:26
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_children(apps, schema_editor):
+    Post = apps.get_model("postApp", "Post")
+    Comment = apps.get_model("postApp", "Comment")
+    Like = apps.get_model("postApp", "Like")
+    CommentLike = apps.get_model("postApp", "CommentLike")
+
+    def children(model, parent_field):
+        return Coalesce(
+            Subquery(
+                model.objects.filter(**{parent_field: OuterRef("pk")})
+                .order_by()
+                .values(parent_field)
+                .annotate(total=Count("pk"))
+                .values("total")
+            ),
+            0,
+        )
+
+    Post.objects.update(
+        comment_count=children(Comment, "post"), like_count=children(Like, "post")
+    )
+    Comment.objects.update(like_count=children(CommentLike, "comment"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("postApp", "0007_comment_comment_fqid_idx_like_like_fqid_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="comment",
+            name="like_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="comment_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="like_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_children, migrations.RunPython.noop),
+    ]
@@ -40,14 +40,24 @@ class Post(MixinApp):
 
     post_serial = models.TextField(blank=True, editable=False)
     fqid = models.TextField(blank=True, editable=False)  # Field for the unique fqid
+    # kept up to date by signals and bulk imports (postApp/utils/counters.py)
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    like_count = models.PositiveIntegerField(default=0, editable=False)
 
-    def save(self, *args, **kwargs):
+    class Meta:
+        # remote posts are looked up by fqid (inbox, SinglePostView, PostImageViewFQID)
+        indexes = [models.Index(fields=["fqid"], name="post_fqid_idx")]
+
+    def build_fqid(self):
         # Generate fqid dynamically
         node_url = self.node.url  # Assuming the `Node` model has a `url` field
         username = (
             self.author.user.user_serial
         )  # Assuming `AuthorProfile` is linked to a User model with a username
-        self.fqid = f"{node_url}authors/{username}/posts/{self.post_serial}"
+        return f"{node_url}authors/{username}/posts/{self.post_serial}"
+
+    def save(self, *args, **kwargs):
+        self.fqid = self.build_fqid()
         super().save(*args, **kwargs)
 
 
@@ -68,14 +78,31 @@ class Comment(MixinApp):
     uuid = models.UUIDField(default=uuid.uuid4, unique=True)
     comment_serial = models.TextField(blank=True, editable=False)
     fqid = models.TextField(blank=True, editable=False)  # Field for the unique fqid
+    # number of CommentLike rows, kept up to date like the counters of Post
+    like_count = models.PositiveIntegerField(default=0, editable=False)
 
-    def save(self, *args, **kwargs):
+    class Meta:
+        indexes = [
+            models.Index(fields=["fqid"], name="comment_fqid_idx"),
+            # keyset pages of a post's or an author's comments, newest first
+            models.Index(
+                fields=["post", "-created_at", "-id"], name="comment_post_page_idx"
+            ),
+            models.Index(
+                fields=["author", "-created_at", "-id"], name="comment_author_page_idx"
+            ),
+        ]
+
+    def build_fqid(self):
         # Generate fqid dynamically
         node_url = self.author.user.local_node.url
         username = (
             self.author.user.user_serial
         )  # Assuming `AuthorProfile` is linked to a User model with a username
-        self.fqid = f"{node_url}authors/{username}/commented/{self.comment_serial}"
+        return f"{node_url}authors/{username}/commented/{self.comment_serial}"
+
+    def save(self, *args, **kwargs):
+        self.fqid = self.build_fqid()
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -113,7 +140,7 @@ class Like(MixinApp):
     like_serial = models.TextField(blank=True, editable=False)
     fqid = models.TextField(blank=True, editable=False)  # Field for the unique fqid
 
-    def save(self, *args, **kwargs):
+    def build_fqid(self):
         # Generate fqid dynamically
         node_url = (
             self.author.user.local_node.url
@@ -121,13 +148,26 @@ class Like(MixinApp):
         username = (
             self.author.user.user_serial
         )  # Assuming `AuthorProfile` is linked to a User model with a username
-        self.fqid = f"{node_url}authors/{username}/liked/{self.like_serial}"
+        return f"{node_url}authors/{username}/liked/{self.like_serial}"
+
+    def save(self, *args, **kwargs):
+        self.fqid = self.build_fqid()
         super().save(*args, **kwargs)
 
     class Meta:
         constraints = [
             models.UniqueConstraint(fields=["author", "post"], name="unique_like")
         ]
+        indexes = [
+            models.Index(fields=["fqid"], name="like_fqid_idx"),
+            # keyset pages of a post's likes and of the things an author liked
+            models.Index(
+                fields=["post", "-created_at", "-id"], name="like_post_page_idx"
+            ),
+            models.Index(
+                fields=["author", "-created_at", "-id"], name="like_author_page_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.author.user.username} liked '{self.post.title}'"
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from django.db.models import Prefetch
 from postApp.models import Post, Comment, Like
 from authorApp.models import AuthorProfile, User
 from node_link.models import Node
@@ -8,6 +9,12 @@ from django.shortcuts import get_object_or_404
 import uuid
 from datetime import datetime
 from node_link.utils.common import remove_api_suffix
+from postApp.utils.embedded import save_embedded
+from postApp.utils.fieldsets import PostFieldset
+
+# comments and likes embedded in a serialized post
+EMBEDDED_SIZE = 5
+AUTHOR_RELATED = "author__user__local_node"
 
 
 class PostSerializer(serializers.ModelSerializer):
@@ -40,9 +47,22 @@ class PostSerializer(serializers.ModelSerializer):
             "visibility",
         ]
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # sparse fieldsets: fields the client did not ask for are never computed
+        fieldset = self.context.get("fieldset")
+        if fieldset is not None:
+            for name in list(self.fields):
+                if not fieldset.includes(name):
+                    self.fields.pop(name)
+
     def get_id(self, obj):
         return obj.fqid
 
+    def embeds(self, name):
+        fieldset = self.context.get("fieldset")
+        return fieldset is None or fieldset.embeds(name)
+
     def get_visibility(self, obj):
         return obj.get_visibility_display()
 
@@ -62,33 +82,82 @@ class PostSerializer(serializers.ModelSerializer):
             "profileImage": obj.author.user.profileImage,
         }
 
+    @staticmethod
+    def setup_eager_loading(queryset, fieldset=None):
+        """
+        Load everything the serializer reads for a page of posts in a fixed number of
+        queries: the posts with their node and author, one query for the latest comments
+        of all posts and one for the latest likes (sliced per post with a window function).
+        Counts come from the counter columns. Parts left out by `fieldset` are not loaded.
+        """
+        fieldset = fieldset or PostFieldset()
+        queryset = queryset.select_related("node", AUTHOR_RELATED)
+        if not fieldset.includes("content"):
+            # base64 images make this by far the largest column
+            queryset = queryset.defer("content")
+        if fieldset.embeds("comments"):
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    "comments",
+                    queryset=Comment.objects.select_related(AUTHOR_RELATED).order_by(
+                        "-created_at", "-id"
+                    )[:EMBEDDED_SIZE],
+                    to_attr="latest_comments",
+                )
+            )
+        if fieldset.embeds("likes"):
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    "postliked",
+                    queryset=Like.objects.select_related(AUTHOR_RELATED).order_by(
+                        "-created_at", "-id"
+                    )[:EMBEDDED_SIZE],
+                    to_attr="latest_likes",
+                )
+            )
+        return queryset
+
     def get_comments(self, obj):
-        comments = obj.comments.all().order_by("-created_at")[:5]
         host = obj.node.url
         host_no_api = remove_api_suffix(host)
-        return {
+        summary = {
             "type": "comments",
             "page": f"{host_no_api}/{obj.author.user.username}/posts_list/{obj.uuid}",
             "id": f"{obj.node.url.rstrip('/')}/authors/{obj.author.user.user_serial}/posts/{obj.post_serial}/comments",
             "page_number": 1,
-            "size": 5,
-            "count": obj.comments.count(),
-            "src": CommentSerializer(comments, many=True, context=self.context).data,
+            "size": EMBEDDED_SIZE,
+            "count": obj.comment_count,
         }
+        if self.embeds("comments"):
+            comments = getattr(obj, "latest_comments", None)
+            if comments is None:
+                comments = obj.comments.all().order_by("-created_at", "-id")[
+                    :EMBEDDED_SIZE
+                ]
+            summary["src"] = CommentSerializer(
+                comments, many=True, context=self.context
+            ).data
+        return summary
 
     def get_likes(self, obj):
-        likes = obj.postliked.all().order_by("-created_at")[:5]
         host = obj.node.url
         host_no_api = remove_api_suffix(host)
-        return {
+        summary = {
             "type": "likes",
             "page": f"{host_no_api}/{obj.author.user.username}/posts_list/{obj.uuid}",
             "id": f"{host}authors/{obj.author.user.user_serial}/posts/{obj.post_serial}/likes",
             "page_number": 1,
-            "size": 5,
-            "count": obj.postliked.count(),
-            "src": LikeSerializer(likes, many=True, context=self.context).data,
+            "size": EMBEDDED_SIZE,
+            "count": obj.like_count,
         }
+        if self.embeds("likes"):
+            likes = getattr(obj, "latest_likes", None)
+            if likes is None:
+                likes = obj.postliked.all().order_by("-created_at", "-id")[
+                    :EMBEDDED_SIZE
+                ]
+            summary["src"] = LikeSerializer(likes, many=True, context=self.context).data
+        return summary
 
     def get_page(self, obj):
         """
@@ -145,12 +214,14 @@ class PostSerializer(serializers.ModelSerializer):
             "a": "application/base64",
         }
 
-        representation["visibility"] = visibility_mapping.get(
-            instance.visibility, instance.visibility
-        )
-        representation["contentType"] = content_type_mapping.get(
-            instance.contentType, instance.contentType
-        )
+        if "visibility" in representation:
+            representation["visibility"] = visibility_mapping.get(
+                instance.visibility, instance.visibility
+            )
+        if "contentType" in representation:
+            representation["contentType"] = content_type_mapping.get(
+                instance.contentType, instance.contentType
+            )
 
         return representation
 
@@ -231,18 +302,7 @@ class PostSerializer(serializers.ModelSerializer):
         post = Post.objects.create(**validated_data)
 
         # create comments
-        try:
-            for comment in self.initial_data["comments"]["src"]:
-                print(comment)
-                cs = CommentSerializer(data=comment)
-                if cs.is_valid():
-                    cs.save()
-            for like in self.initial_data["likes"]["src"]:
-                ls = LikeSerializer(data=like)
-                if ls.is_valid():
-                    ls.save()
-        except Exception as e:
-            print(f"Post Serializer Error:{e}")
+        self.save_embedded()
         return post
 
     def update(self, instance, validated_data):
@@ -275,24 +335,23 @@ class PostSerializer(serializers.ModelSerializer):
 
         # Save the updated post
         post.save()
+        self.save_embedded()
+
+        return post
+
+    def save_embedded(self):
+        """
+        Store the comments and likes embedded in an incoming post (`comments.src`, `likes.src`)
+        in bulk, skipping the ones we already have.
+        """
         try:
-            for comment in self.initial_data["comments"]["src"]:
-                if not Comment.objects.filter(fqid=comment["id"]):
-
-                    cs = CommentSerializer(data=comment)
-                    if cs.is_valid():
-                        cs.save()
-            for like in self.initial_data["likes"]["src"]:
-                if not Like.objects.filter(fqid=like["id"]):
-
-                    ls = LikeSerializer(data=like)
-                    if ls.is_valid():
-                        ls.save()
+            save_embedded(
+                self.initial_data.get("comments", {}).get("src", []),
+                self.initial_data.get("likes", {}).get("src", []),
+            )
         except Exception as e:
             print(f"Post Serializer Error:{e}")
 
-        return post
-
     def map_visibility(self, visibility):
         """
         Map external visibility to internal representation.
@@ -344,6 +403,15 @@ class CommentSerializer(serializers.ModelSerializer):
             "likes",
         ]
 
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """
+        Select the authors, posts and nodes the serializer reads along with the comments.
+        """
+        return queryset.select_related(
+            AUTHOR_RELATED, "post__node", "post__author__user__local_node"
+        )
+
     def get_author(self, obj):
         if isinstance(obj, dict):
             # If obj is a dict, assume it's already serialized
@@ -446,7 +514,7 @@ class CommentSerializer(serializers.ModelSerializer):
     def get_likes(self, obj):
         """
         Construct the likes field for the comment.
-        Since likes are not implemented, src is empty and count is zero.
+        Comment likes are not federated, so src is empty; count is the local counter.
         """
         comment_id = obj.fqid
         host_no_api = remove_api_suffix(obj.post.node.url)
@@ -458,7 +526,7 @@ class CommentSerializer(serializers.ModelSerializer):
             "page": f"{host_no_api}/{post_author.user.username}/posts_list/{post.uuid}",
             "page_number": 1,
             "size": 5,
-            "count": 0,
+            "count": obj.like_count,
             "src": [],  # No likes implemented, so this is empty
         }
 
@@ -491,9 +559,10 @@ class CommentsSerializer(serializers.Serializer):
     type = serializers.CharField(default="comments")
     page = serializers.CharField()  # URL of the comments page
     id = serializers.CharField()  # ID of the comments API
-    page_number = serializers.IntegerField()
+    # both None in cursor mode
+    page_number = serializers.IntegerField(allow_null=True)
     size = serializers.IntegerField()
-    count = serializers.IntegerField()
+    count = serializers.IntegerField(allow_null=True)
     src = serializers.SerializerMethodField()
 
     def get_src(self, obj):
@@ -519,6 +588,13 @@ class LikeSerializer(serializers.ModelSerializer):
             "object",
         ]
 
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """
+        Select the authors and posts the serializer reads along with the likes.
+        """
+        return queryset.select_related(AUTHOR_RELATED, "post")
+
     def get_published(self, obj):
         return obj.created_at.isoformat() if hasattr(obj, "created_at") else None
 
@@ -3,17 +3,47 @@ from django.test import TestCase, Client
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
-from authorApp.models import AuthorProfile, User
+from authorApp.models import AuthorProfile, Friends, User
 from postApp.models import Post, Comment, Like
 from node_link.models import Node, Notification
+from postApp.utils.embedded import save_embedded
+from node_link.utils import response_cache
+from node_link.utils.cursor import encode_cursor
+from node_link.utils.visibility import visible_posts
+from postApp.utils.fetch_github_activity import poll_github_activity
 
 from rest_framework.test import APITestCase
 from rest_framework import status
 
 import uuid
-from PIL import Image
 import io
+from datetime import timedelta
+from unittest import mock
+from PIL import Image
+
+
+def create_authors(node, *names):
+    """
+    An approved local author for each name, in the same order.
+    """
+    return tuple(
+        AuthorProfile.objects.create(
+            user=User.objects.create_user(
+                username=name,
+                password="password",
+                is_approved=True,
+                display_name=name.title(),
+                local_node=node,
+                user_serial=name,
+            )
+        )
+        for name in names
+    )
 
 
 class PostAppViewsTestCase(TestCase):
@@ -792,3 +822,739 @@ class PostAppViewsTestCase(TestCase):
             data=share_data,
         )
         self.assertEqual(response.status_code, 403)  # Forbidden
+
+
+class EmbeddedReconciliationTestCase(TestCase):
+    def setUp(self):
+        admin = User.objects.create_user(username="admin", password="admin")
+        self.node = Node.objects.create(
+            url="http://remote-node.com/api/", is_remote=True, created_by=admin
+        )
+        users = [
+            User.objects.create(
+                username=f"remote-node_com__u{i}",
+                user_serial=f"u{i}",
+                display_name=f"U{i}",
+                local_node=self.node,
+            )
+            for i in range(30)
+        ]
+        self.authors = [AuthorProfile.objects.create(user=user) for user in users]
+        self.post = Post.objects.create(
+            title="Remote post",
+            author=self.authors[0],
+            node=self.node,
+            created_by=self.authors[0],
+            post_serial="42",
+        )
+
+    def like(self, author, serial):
+        return {
+            "type": "like",
+            "id": f"{self.node.url}authors/{author.user.user_serial}/liked/{serial}",
+            "author": {"type": "author", "id": author.fqid},
+            "object": self.post.fqid,
+        }
+
+    def test_embedded_items_are_inserted_in_bulk(self):
+        likes = [self.like(author, i) for i, author in enumerate(self.authors)]
+        comments = [
+            {
+                "type": "comment",
+                "id": f"{self.node.url}authors/u1/commented/c1",
+                "comment": "Nice",
+                "author": {"type": "author", "id": self.authors[1].fqid},
+                "post": self.post.fqid,
+            }
+        ]
+
+        # lookups, inserts, the counters, the cache versions and the transaction,
+        # whatever the number of likes
+        with self.assertNumQueries(13):
+            save_embedded(comments, likes)
+
+        self.assertEqual(self.post.postliked.count(), 30)
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.like_count, self.post.comment_count), (30, 1))
+        self.assertEqual(self.post.comments.get().fqid, comments[0]["id"])
+        # everyone but the post's author liking their own post is notified about
+        self.assertEqual(
+            Notification.objects.filter(
+                user=self.authors[0], notification_type="like"
+            ).count(),
+            29,
+        )
+
+    def test_known_and_repeated_items_are_skipped(self):
+        save_embedded([], [self.like(self.authors[1], "a")])
+        unknown = dict(self.like(self.authors[2], "b"), object="http://nowhere/posts/1")
+
+        created_comments, created_likes = save_embedded(
+            [],
+            [
+                self.like(self.authors[1], "a"),
+                # same author and post under a new id
+                self.like(self.authors[1], "z"),
+                self.like(self.authors[3], "c"),
+                self.like(self.authors[3], "c"),
+                unknown,
+            ],
+        )
+
+        self.assertEqual(created_comments, [])
+        self.assertEqual([like.author for like in created_likes], [self.authors[3]])
+        self.assertEqual(self.post.postliked.count(), 2)
+
+
+class PostCardsTestCase(TestCase):
+    def setUp(self):
+        admin = User.objects.create_user(username="admin", password="admin")
+        self.node = Node.objects.create(
+            url="http://testnode.com/api/", created_by=admin
+        )
+        self.viewer, self.friend, self.stranger = create_authors(
+            self.node, "viewer", "friend", "stranger"
+        )
+        Friends.objects.create(
+            user1=self.viewer, user2=self.friend, created_by=self.viewer
+        )
+        self.client.login(username="viewer", password="password")
+
+    def make_post(self, author, visibility, title="Post"):
+        return Post.objects.create(
+            author=author,
+            title=title,
+            content="*hello*",
+            contentType="m",
+            visibility=visibility,
+            node=self.node,
+            created_by=author,
+        )
+
+    def cards(self, posts):
+        return self.client.get(
+            reverse("postApp:post_cards", args=["viewer"]),
+            {"uuid": [str(post.uuid) for post in posts]},
+        )
+
+    def test_cards_are_rendered_in_a_fixed_number_of_queries(self):
+        posts = [
+            self.make_post(author, visibility, f"Post {i}")
+            for i, (author, visibility) in enumerate(
+                [(self.friend, "fo"), (self.stranger, "p"), (self.viewer, "u")] * 7
+            )
+        ]
+        Like.objects.create(
+            post=posts[0], author=self.viewer, created_by=self.viewer, like_serial="1"
+        )
+
+        # session, user, author profile and the posts
+        with self.assertNumQueries(4):
+            response = self.cards(posts[:20])
+
+        self.assertEqual(response.status_code, 200)
+        cards = response.context["cards"]
+        self.assertEqual([card["post"] for card in cards], posts[:20])
+        self.assertTrue(cards[0]["post"].user_has_liked)
+        self.assertEqual(cards[0]["post"].like_count, 1)
+        self.assertIn("<em>hello</em>", cards[0]["content"])
+
+    def test_cards_leave_out_posts_the_viewer_may_not_see(self):
+        visible = self.make_post(self.friend, "fo")
+        hidden = self.make_post(self.stranger, "fo")
+        deleted = self.make_post(self.viewer, "d")
+
+        response = self.cards([hidden, visible, deleted])
+
+        self.assertEqual(
+            [card["post"] for card in response.context["cards"]], [visible]
+        )
+
+
+class PostVisibilityTestCase(TestCase):
+    def setUp(self):
+        admin = User.objects.create_user(username="admin", password="admin")
+        self.node = Node.objects.create(
+            url="http://testnode.com/api/", created_by=admin
+        )
+        self.viewer, self.friend, self.stranger = create_authors(
+            self.node, "viewer", "friend", "stranger"
+        )
+        Friends.objects.create(
+            user1=self.friend, user2=self.viewer, created_by=self.friend
+        )
+        self.posts = {
+            visibility: Post.objects.create(
+                author=self.friend,
+                title=visibility,
+                content="hello",
+                visibility=visibility,
+                node=self.node,
+                created_by=self.friend,
+            )
+            for visibility in ("p", "u", "fo", "d")
+        }
+
+    def titles(self, posts):
+        return sorted(post.title for post in posts)
+
+    def test_visible_posts(self):
+        self.assertEqual(self.titles(visible_posts(self.viewer)), ["fo", "p", "u"])
+        self.assertEqual(self.titles(visible_posts(self.stranger)), ["p", "u"])
+        self.assertEqual(self.titles(visible_posts(self.friend)), ["fo", "p", "u"])
+        self.assertEqual(self.titles(visible_posts(None)), ["p", "u"])
+
+    def test_author_posts_api_only_lists_visible_posts(self):
+        url = reverse("postApp:author-posts", args=["friend"])
+
+        self.client.login(username="stranger", password="password")
+        response = self.client.get(url)
+        self.assertEqual(
+            sorted(post["title"] for post in response.json()["src"]), ["p", "u"]
+        )
+
+        self.client.login(username="viewer", password="password")
+        response = self.client.get(url)
+        self.assertEqual(
+            sorted(post["title"] for post in response.json()["src"]),
+            ["fo", "p", "u"],
+        )
+
+    def test_profile_only_shows_visible_posts(self):
+        self.client.login(username="stranger", password="password")
+
+        response = self.client.get(
+            reverse("authorApp:profile_display", args=["friend"])
+        )
+
+        self.assertEqual(self.titles(response.context["all_ids"]), ["p", "u"])
+
+
+class GithubActivityTestCase(TestCase):
+    def setUp(self):
+        admin = User.objects.create_user(username="admin", password="admin")
+        self.node = Node.objects.create(
+            url="http://testserver/api/", created_by=admin, is_remote=False
+        )
+        self.user = User.objects.create_user(
+            username="octo",
+            password="password",
+            is_approved=True,
+            local_node=self.node,
+            user_serial="octo",
+            github_user="octocat",
+        )
+        self.author = AuthorProfile.objects.create(
+            user=self.user, github_token="secret"
+        )
+        self.events = [
+            {"id": "3", "type": "WatchEvent", "repo": {"name": "octo/new"}},
+            {
+                "id": "2",
+                "type": "IssuesEvent",
+                "repo": {"name": "octo/repo"},
+                "payload": {"action": "opened", "issue": {"title": "Bug"}},
+            },
+            {"id": "1", "type": "ForkEvent", "repo": {"name": "octo/old"}},
+        ]
+
+    def response(self, status_code, body=None, etag='W/"v1"'):
+        return mock.Mock(
+            status_code=status_code,
+            headers={"ETag": etag, "X-Poll-Interval": "120"},
+            json=lambda: body,
+        )
+
+    @mock.patch("requests.Session.request")
+    def test_new_events_become_posts(self, mock_request):
+        self.author.last_github_event_id = "1"
+        self.author.save()
+        mock_request.return_value = self.response(200, self.events)
+
+        polls = poll_github_activity()
+
+        headers = mock_request.call_args.kwargs["headers"]
+        self.assertEqual(headers["Authorization"], "Bearer secret")
+        self.assertNotIn("If-None-Match", headers)
+        self.assertEqual(len(polls[0].posts), 2)
+        self.assertEqual(
+            list(
+                Post.objects.filter(author=self.author)
+                .order_by("created_at")
+                .values_list("content", flat=True)
+            ),
+            ["Issue 'Bug' opened in octo/repo.", "New GitHub WatchEvent in octo/new."],
+        )
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.last_github_event_id, "3")
+        self.assertEqual(self.author.github_etag, 'W/"v1"')
+        self.assertGreater(
+            self.author.github_next_poll_at, timezone.now() + timedelta(seconds=100)
+        )
+        # not due again before X-Poll-Interval has passed
+        self.assertEqual(poll_github_activity(), [])
+
+    @mock.patch("requests.Session.request")
+    def test_unchanged_events_are_not_posted_again(self, mock_request):
+        AuthorProfile.objects.filter(pk=self.author.pk).update(github_etag='W/"v1"')
+        mock_request.return_value = self.response(304)
+
+        poll_github_activity()
+
+        headers = mock_request.call_args.kwargs["headers"]
+        self.assertEqual(headers["If-None-Match"], 'W/"v1"')
+        self.assertFalse(Post.objects.exists())
+
+    @mock.patch("requests.Session.request")
+    def test_truncated_events_still_become_posts(self, mock_request):
+        mock_request.return_value = self.response(
+            200,
+            [
+                {"id": "5", "type": "PullRequestEvent", "payload": {}},
+                {"id": "4", "type": "IssuesEvent", "repo": {}, "payload": None},
+                {"type": "WatchEvent", "repo": {"name": "octo/no-id"}},
+            ],
+        )
+
+        poll_github_activity()
+
+        self.assertEqual(
+            list(
+                Post.objects.filter(author=self.author)
+                .order_by("created_at")
+                .values_list("content", flat=True)
+            ),
+            [
+                "Issue 'untitled' updated in a repository.",
+                "Pull request 'untitled' updated in a repository.",
+            ],
+        )
+
+    @mock.patch("postApp.utils.fetch_github_activity.timeline.add_new_posts")
+    @mock.patch("requests.Session.request")
+    def test_failed_save_does_not_stop_the_poll(self, mock_request, add_new_posts):
+        other = AuthorProfile.objects.create(
+            user=User.objects.create_user(
+                username="other",
+                password="password",
+                local_node=self.node,
+                user_serial="other",
+                github_user="other",
+            )
+        )
+        mock_request.return_value = self.response(200, self.events)
+        add_new_posts.side_effect = [RuntimeError("boom"), None]
+
+        polls = poll_github_activity()
+
+        self.assertEqual(len(polls), 2)
+        self.assertEqual([bool(poll.error) for poll in polls].count(True), 1)
+        # only the author whose save worked got posts
+        self.assertEqual(Post.objects.count(), 3)
+        for author in (self.author, other):
+            author.refresh_from_db()
+            # the bad batch is skipped rather than retried on every poll
+            self.assertEqual(author.last_github_event_id, "3")
+            self.assertIsNotNone(author.github_next_poll_at)
+
+    @mock.patch("requests.Session.request")
+    def test_home_does_not_call_github(self, mock_request):
+        self.client.login(username="octo", password="password")
+
+        response = self.client.get(reverse("node_link:home", args=["octo"]))
+
+        self.assertEqual(response.status_code, 200)
+        mock_request.assert_not_called()
+
+
+class PostListQueriesTestCase(TestCase):
+    def setUp(self):
+        admin = User.objects.create_user(username="admin", password="admin")
+        self.node = Node.objects.create(
+            url="http://testnode.com/api/", created_by=admin
+        )
+        self.authors = [
+            AuthorProfile.objects.create(
+                user=User.objects.create_user(
+                    username=name,
+                    password="password",
+                    is_approved=True,
+                    local_node=self.node,
+                    user_serial=name,
+                )
+            )
+            for name in ("writer", "reader1", "reader2")
+        ]
+        self.writer = self.authors[0]
+        self.client.login(username="reader1", password="password")
+
+    def add_posts(self, count):
+        for i in range(count):
+            post = Post.objects.create(
+                author=self.writer,
+                title=f"Post {i}",
+                content="hello",
+                visibility="p",
+                node=self.node,
+                created_by=self.writer,
+            )
+            for j in range(7):
+                author = self.authors[1 + j % 2]
+                Comment.objects.create(
+                    post=post,
+                    author=author,
+                    created_by=author,
+                    content=f"Comment {j}",
+                    comment_serial=f"{i}-{j}",
+                )
+            for author in self.authors[1:]:
+                Like.objects.create(
+                    post=post, author=author, created_by=author, like_serial=f"{i}"
+                )
+
+    def list_posts(self):
+        return self.client.get(
+            reverse("postApp:author-posts", args=["writer"]), {"size": 50}
+        )
+
+    def test_post_list_runs_a_fixed_number_of_queries(self):
+        self.add_posts(2)
+        # session, user, author, viewer profile, friendship, cache versions, count,
+        # posts, latest comments, latest likes
+        with self.assertNumQueries(10):
+            self.list_posts()
+
+        self.add_posts(10)
+        with self.assertNumQueries(10):
+            response = self.list_posts()
+
+        posts = response.json()["src"]
+        self.assertEqual(len(posts), 12)
+        self.assertEqual(posts[0]["comments"]["count"], 7)
+        self.assertEqual(len(posts[0]["comments"]["src"]), 5)
+        self.assertEqual(posts[0]["comments"]["src"][0]["comment"], "Comment 6")
+        self.assertEqual(posts[0]["likes"]["count"], 2)
+        self.assertEqual(len(posts[0]["likes"]["src"]), 2)
+        self.assertEqual(posts[0]["likes"]["src"][0]["object"], posts[0]["id"])
+
+    def test_sparse_fieldsets_skip_omitted_parts(self):
+        self.add_posts(3)
+        url = reverse("postApp:author-posts", args=["writer"])
+        # session, user, author, viewer profile, friendship, cache versions, count, posts
+        with self.assertNumQueries(8):
+            response = self.client.get(url, {"fields": "title,likes", "embed": ""})
+        posts = response.json()["src"]
+        self.assertEqual(set(posts[0]), {"type", "id", "title", "likes"})
+        self.assertEqual(posts[0]["likes"]["count"], 2)
+        self.assertNotIn("src", posts[0]["likes"])
+
+        with self.assertNumQueries(9):
+            response = self.client.get(
+                url, {"exclude": "content,likes", "embed": "comments"}
+            )
+        post = response.json()["src"][0]
+        self.assertNotIn("content", post)
+        self.assertNotIn("likes", post)
+        self.assertEqual(len(post["comments"]["src"]), 5)
+
+        response = self.client.get(url, {"fields": "title,nope"})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(url, {"embed": "authors"})
+        self.assertEqual(response.status_code, 400)
+
+
+class ResponseCacheTestCase(TestCase):
+    def setUp(self):
+        admin = User.objects.create_user(username="admin", password="admin")
+        self.node = Node.objects.create(
+            url="http://testnode.com/api/", created_by=admin
+        )
+        self.writer, self.reader = [
+            AuthorProfile.objects.create(
+                user=User.objects.create_user(
+                    username=name,
+                    password="password",
+                    is_approved=True,
+                    local_node=self.node,
+                    user_serial=name,
+                )
+            )
+            for name in ("writer", "reader")
+        ]
+        self.post = Post.objects.create(
+            author=self.writer,
+            title="Cached",
+            content="hello",
+            post_serial="1",
+            visibility="p",
+            node=self.node,
+            created_by=self.writer,
+        )
+        Post.objects.create(
+            author=self.writer,
+            title="Friends only",
+            content="hello",
+            post_serial="2",
+            visibility="fo",
+            node=self.node,
+            created_by=self.writer,
+        )
+        self.client.login(username="reader", password="password")
+
+    def test_repeat_polls_are_served_from_the_cache(self):
+        url = reverse("postApp:post-detail", args=[self.post.fqid])
+        self.client.get(url)
+        etag = self.client.get(url)["ETag"]
+
+        # session, user, post and cache versions: the body is never built
+        with self.assertNumQueries(4):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        with mock.patch("postApp.views.PostSerializer") as serializer:
+            response = self.client.get(url)
+        serializer.assert_not_called()
+        self.assertEqual(response.json()["title"], "Cached")
+
+        Like.objects.create(
+            post=self.post, author=self.reader, created_by=self.reader, like_serial="1"
+        )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response.json()["likes"]["count"], 1)
+
+    def test_versions_are_scoped_to_what_changed(self):
+        other = Post.objects.create(
+            author=self.reader,
+            title="Elsewhere",
+            post_serial="3",
+            visibility="p",
+            node=self.node,
+            created_by=self.reader,
+        )
+        post_url = reverse("postApp:post-detail", args=[self.post.fqid])
+        list_url = reverse("postApp:author-posts", args=["writer"])
+        authors_url = reverse("authorApp:author-list")
+        self.client.get(post_url)
+        etags = [self.client.get(url)["ETag"] for url in (post_url, list_url)]
+
+        # a like on another author's post leaves this author's responses alone
+        Like.objects.create(
+            post=other, author=self.writer, created_by=self.writer, like_serial="2"
+        )
+        self.assertEqual(
+            [self.client.get(url)["ETag"] for url in (post_url, list_url)], etags
+        )
+
+        authors_etag = self.client.get(authors_url)["ETag"]
+        Comment.objects.create(
+            post=self.post, author=self.reader, created_by=self.reader, content="Hi"
+        )
+        self.assertNotEqual(self.client.get(post_url)["ETag"], etags[0])
+        self.assertNotEqual(self.client.get(list_url)["ETag"], etags[1])
+        self.assertEqual(self.client.get(authors_url)["ETag"], authors_etag)
+
+        # posts embed their author
+        etags = [self.client.get(url)["ETag"] for url in (post_url, list_url)]
+        self.writer.user.display_name = "Renamed"
+        self.writer.user.save()
+        self.assertEqual(
+            self.client.get(post_url).json()["author"]["displayName"], "Renamed"
+        )
+        self.assertNotEqual(self.client.get(list_url)["ETag"], etags[1])
+
+    def test_cached_post_lists_depend_on_the_audience(self):
+        url = reverse("postApp:author-posts", args=["writer"])
+        self.assertEqual(self.client.get(url).json()["count"], 1)
+
+        friendship = Friends.objects.create(
+            user1=self.writer, user2=self.reader, created_by=self.writer
+        )
+        self.assertEqual(self.client.get(url).json()["count"], 2)
+
+        # the cached friends page must not outlive the friendship
+        friendship.delete()
+        self.assertEqual(self.client.get(url).json()["count"], 1)
+        friendship.save()
+
+        self.client.login(username="writer", password="password")
+        self.assertEqual(self.client.get(url).json()["count"], 2)
+
+
+class CounterTestCase(TestCase):
+    def setUp(self):
+        admin = User.objects.create_user(username="admin", password="admin")
+        self.node = Node.objects.create(
+            url="http://testnode.com/api/", created_by=admin
+        )
+        self.author = AuthorProfile.objects.create(
+            user=User.objects.create_user(
+                username="writer",
+                password="password",
+                is_approved=True,
+                local_node=self.node,
+                user_serial="writer",
+            )
+        )
+        self.post = Post.objects.create(
+            author=self.author,
+            title="Post",
+            content="hello",
+            node=self.node,
+            created_by=self.author,
+        )
+        self.client.login(username="writer", password="password")
+
+    def counts(self):
+        self.post.refresh_from_db()
+        return self.post.comment_count, self.post.like_count
+
+    def test_counters_follow_creates_and_deletes(self):
+        like = Like.objects.create(
+            post=self.post, author=self.author, created_by=self.author
+        )
+        comments = [
+            Comment.objects.create(
+                post=self.post, author=self.author, created_by=self.author
+            )
+            for _ in range(3)
+        ]
+        self.assertEqual(self.counts(), (3, 1))
+
+        like.delete()
+        comments[0].delete()
+        self.assertEqual(self.counts(), (2, 0))
+
+    def test_repair_command_recounts(self):
+        Comment.objects.create(
+            post=self.post, author=self.author, created_by=self.author
+        )
+        Post.objects.filter(pk=self.post.pk).update(comment_count=7, like_count=4)
+
+        call_command("repair_counters", stdout=io.StringIO())
+
+        self.assertEqual(self.counts(), (1, 0))
+
+    def test_likes_endpoint_does_not_count_rows(self):
+        Like.objects.create(post=self.post, author=self.author, created_by=self.author)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse("postApp:post-likes", args=["writer", str(self.post.uuid)])
+            )
+
+        self.assertEqual(response.json()["count"], 1)
+        self.assertFalse(
+            [q for q in queries.captured_queries if "COUNT(" in q["sql"].upper()]
+        )
+
+
+class CursorPaginationTestCase(TestCase):
+    def setUp(self):
+        admin = User.objects.create_user(username="admin", password="admin")
+        self.node = Node.objects.create(
+            url="http://testnode.com/api/", created_by=admin
+        )
+        self.authors = [
+            AuthorProfile.objects.create(
+                user=User.objects.create_user(
+                    username=f"u{i}",
+                    password="password",
+                    local_node=self.node,
+                    user_serial=f"u{i}",
+                )
+            )
+            for i in range(12)
+        ]
+        self.writer = self.authors[0]
+        self.post = Post.objects.create(
+            author=self.writer,
+            title="Popular",
+            node=self.node,
+            created_by=self.writer,
+        )
+        for i, author in enumerate(self.authors):
+            Like.objects.create(
+                post=self.post, author=author, created_by=author, like_serial=str(i)
+            )
+            Comment.objects.create(
+                post=self.post,
+                author=author,
+                created_by=author,
+                content=f"Comment {i}",
+                comment_serial=str(i),
+            )
+        self.client.login(username="u0", password="password")
+
+    def walk(self, url, key):
+        items, cursor, pages = [], "", 0
+        while cursor is not None:
+            data = self.client.get(url, {"cursor": cursor, "size": 5}).json()
+            items += [item[key] for item in data["src"]]
+            cursor = data["next"]
+            pages += 1
+        return items, pages
+
+    def test_likes_are_paged_with_a_cursor(self):
+        url = reverse("postApp:post-likes", args=["u0", str(self.post.uuid)])
+
+        ids, pages = self.walk(url, "id")
+
+        self.assertEqual(pages, 3)
+        self.assertEqual(
+            ids,
+            list(
+                Like.objects.order_by("-created_at", "-id").values_list(
+                    "fqid", flat=True
+                )
+            ),
+        )
+        # the page contract still works
+        data = self.client.get(url, {"page": 3}).json()
+        self.assertEqual((data["page_number"], len(data["src"])), (3, 2))
+        self.assertNotIn("next", data)
+
+    def test_comments_are_paged_with_a_cursor(self):
+        url = reverse("postApp:post-comments", args=["u0", str(self.post.uuid)])
+
+        comments, pages = self.walk(url, "comment")
+
+        self.assertEqual(pages, 3)
+        self.assertEqual(comments, [f"Comment {i}" for i in reversed(range(12))])
+
+    def test_author_comments_are_paged_with_a_cursor(self):
+        commenter = self.authors[1]
+        for i in range(6):
+            Comment.objects.create(
+                post=self.post,
+                author=commenter,
+                created_by=commenter,
+                content=f"More {i}",
+                comment_serial=f"more{i}",
+            )
+        url = reverse("postApp:author-commented", args=["u1"])
+
+        comments, pages = self.walk(url, "comment")
+
+        self.assertEqual(pages, 2)
+        self.assertEqual(
+            comments, [f"More {i}" for i in reversed(range(6))] + ["Comment 1"]
+        )
+        data = self.client.get(url, {"cursor": ""}).json()
+        # not counted in cursor mode
+        self.assertEqual((data["page_number"], data["count"]), (None, None))
+        data = self.client.get(url, {"page": 2}).json()
+        self.assertEqual((data["page_number"], data["count"]), (2, 7))
+        self.assertEqual(len(data["src"]), 2)
+
+    def test_invalid_cursor_is_rejected(self):
+        url = reverse("postApp:author-liked", args=["u0"])
+
+        response = self.client.get(url, {"cursor": "not-a-cursor"})
+
+        self.assertEqual(response.status_code, 400)
+        # well formed, but the values do not fit (created_at, id)
+        response = self.client.get(url, {"cursor": encode_cursor(["soon", "x"])})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(url, {"page": "last"})
+        self.assertEqual(response.status_code, 400)
@@ -28,6 +28,7 @@ urlpatterns = [
     path(
         "<str:username>/post_card/<uuid:post_uuid>/", views.post_card, name="one_post"
     ),
+    path("<str:username>/post_cards/", views.post_cards, name="post_cards"),
     path(
         "<str:username>/delete_post/<uuid:post_uuid>/",
         views.delete_post,
@@ -0,0 +1,54 @@
+from urllib.parse import urlencode
+
+import commonmark
+from django.conf import settings
+from django.db.models import Exists, OuterRef
+from django.urls import reverse
+
+from node_link.utils.visibility import visible_posts
+from postApp.models import Like, Post
+
+MAX_CARDS = getattr(settings, "POST_CARDS_MAX", 50)
+DEFAULT_AVATAR = "https://s3.amazonaws.com/37assets/svn/765-default-avatar.png"
+
+
+def render_content(post):
+    """
+    The content of a post as shown on its card (Markdown is converted to HTML).
+    """
+    if post.contentType == "m":
+        # Convert Markdown to HTML
+        parser = commonmark.Parser()
+        renderer = commonmark.HtmlRenderer()
+        return renderer.render(parser.parse(post.content))
+    return post.content
+
+
+def card_posts(viewer, uuids):
+    """
+    The posts with the given UUIDs that `viewer` may see, in the order of `uuids`, fetched
+    with one query. Each post is annotated with `user_has_liked`.
+    """
+    posts = (
+        visible_posts(viewer, Post.objects.filter(uuid__in=uuids))
+        .select_related("author__user__local_node")
+        .annotate(
+            user_has_liked=Exists(
+                Like.objects.filter(post=OuterRef("pk"), author=viewer)
+            ),
+        )
+    )
+    by_uuid = {post.uuid: post for post in posts}
+    return [by_uuid[uuid] for uuid in uuids if uuid in by_uuid]
+
+
+def card_batch_urls(username, uuids):
+    """
+    URLs of the `post_cards` endpoint that render the given posts, at most MAX_CARDS per URL.
+    """
+    base = reverse("postApp:post_cards", args=[username])
+    uuids = [str(uuid) for uuid in uuids]
+    return [
+        f"{base}?{urlencode([('uuid', uuid) for uuid in uuids[i : i + MAX_CARDS]])}"
+        for i in range(0, len(uuids), MAX_CARDS)
+    ]
@@ -0,0 +1,77 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+from node_link.utils import response_cache
+from postApp.models import Comment, CommentLike, Like, Post
+
+
+def adjust(model, pk, **deltas):
+    """
+    Add `deltas` to counter columns of one row in a single UPDATE, so concurrent
+    requests never lose an increment. Counters do not go below zero.
+    """
+    model.objects.filter(pk=pk).update(
+        **{
+            field: Greatest(F(field) + delta, 0) if delta < 0 else F(field) + delta
+            for field, delta in deltas.items()
+        }
+    )
+
+
+def add_children(comments=(), likes=()):
+    """
+    Count comments and likes inserted in bulk (which sends no post_save) on their posts,
+    with one UPDATE per post.
+    """
+    added = {}
+    for field, children in (("comment_count", comments), ("like_count", likes)):
+        for post_id, n in Counter(child.post_id for child in children).items():
+            added.setdefault(post_id, {})[field] = n
+    for post_id, deltas in added.items():
+        adjust(Post, post_id, **deltas)
+    response_cache.invalidate_posts(added)
+
+
+def children_count(model, parent_field):
+    """
+    Subquery counting the rows of `model` that point to the outer row through `parent_field`.
+    """
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{parent_field: OuterRef("pk")})
+            .order_by()
+            .values(parent_field)
+            .annotate(total=Count("pk"))
+            .values("total")
+        ),
+        0,
+    )
+
+
+def recount(posts=None, comments=None):
+    """
+    Recompute every counter from the child tables, one UPDATE statement per table.
+
+    Args:
+        posts (QuerySet): Posts to repair, all of them by default.
+        comments (QuerySet): Comments to repair, all of them by default.
+
+    Returns:
+        tuple: (number of posts, number of comments) updated.
+    """
+    posts = Post.objects.all() if posts is None else posts
+    comments = Comment.objects.all() if comments is None else comments
+    with transaction.atomic():
+        post_rows = posts.update(
+            comment_count=children_count(Comment, "post"),
+            like_count=children_count(Like, "post"),
+        )
+        comment_rows = comments.update(
+            like_count=children_count(CommentLike, "comment")
+        )
+    # any post may have changed
+    response_cache.invalidate(response_cache.EVERYTHING)
+    return post_rows, comment_rows
@@ -0,0 +1,128 @@
+from django.db import transaction
+
+from authorApp.models import AuthorProfile
+from node_link.models import Notification
+from node_link.signals import like_notification
+from postApp.models import Comment, Like, Post
+from postApp.utils.counters import add_children
+
+
+def _serial(fqid):
+    return fqid.rstrip("/").split("/")[-1]
+
+
+def _author_id(item):
+    author = item.get("author")
+    return author.get("id") if isinstance(author, dict) else None
+
+
+def _new_objects(model, items, build):
+    """
+    Build the `model` rows for `items` that we do not have yet, checking both the incoming
+    ids and the fqids the rows will get with one query. Repeated ids are only built once.
+    """
+    candidates = []
+    for item in items:
+        obj = build(item)
+        if obj is not None:
+            obj.fqid = obj.build_fqid()
+            candidates.append((item["id"], obj))
+
+    ids = {incoming for incoming, _ in candidates} | {o.fqid for _, o in candidates}
+    known = set(model.objects.filter(fqid__in=ids).values_list("fqid", flat=True))
+    new = []
+    for incoming, obj in candidates:
+        if incoming not in known and obj.fqid not in known:
+            known.update((incoming, obj.fqid))
+            new.append(obj)
+    return new
+
+
+def save_embedded(comments, likes):
+    """
+    Store the comments and likes embedded in an incoming post (`comments.src`, `likes.src`).
+
+    The posts and authors they reference are resolved with one IN query each, the rows we
+    already have are found with one query per type, and only the missing rows are inserted
+    in bulk. Items that reference an unknown post or author, or that lack an id, are skipped.
+
+    Args:
+        comments (list[dict]): Comment objects as sent by the remote node.
+        likes (list[dict]): Like objects as sent by the remote node.
+
+    Returns:
+        tuple: (list of created Comments, list of created Likes)
+    """
+    comments = [c for c in comments if isinstance(c, dict) and c.get("id")]
+    likes = [l for l in likes if isinstance(l, dict) and l.get("id")]
+
+    post_ids = {c.get("post") for c in comments} | {l.get("object") for l in likes}
+    author_ids = {_author_id(item) for item in comments + likes}
+    posts = {
+        post.fqid: post
+        for post in Post.objects.filter(fqid__in=post_ids - {None}).select_related(
+            "author"
+        )
+    }
+    authors = {
+        author.fqid: author
+        for author in AuthorProfile.objects.filter(
+            fqid__in=author_ids - {None}
+        ).select_related("user__local_node")
+    }
+
+    def build_comment(item):
+        post = posts.get(item.get("post"))
+        author = authors.get(_author_id(item))
+        if not post or not author or not item.get("comment"):
+            return None
+        return Comment(
+            content=item["comment"],
+            post=post,
+            author=author,
+            created_by=author,
+            updated_by=author,
+            comment_serial=_serial(item["id"]),
+        )
+
+    def build_like(item):
+        post = posts.get(item.get("object"))
+        author = authors.get(_author_id(item))
+        if not post or not author:
+            return None
+        return Like(
+            post=post,
+            author=author,
+            created_by=author,
+            updated_by=author,
+            like_serial=_serial(item["id"]),
+        )
+
+    new_comments = _new_objects(Comment, comments, build_comment)
+    new_likes = _new_objects(Like, likes, build_like)
+    if new_likes:
+        # an author likes a post at most once, even under a new like id
+        liked = set(
+            Like.objects.filter(
+                post__in={like.post for like in new_likes},
+                author__in={like.author for like in new_likes},
+            ).values_list("author_id", "post_id")
+        )
+        unique_likes = []
+        for like in new_likes:
+            if (like.author.id, like.post.id) not in liked:
+                liked.add((like.author.id, like.post.id))
+                unique_likes.append(like)
+        new_likes = unique_likes
+
+    with transaction.atomic():
+        Comment.objects.bulk_create(new_comments)
+        Like.objects.bulk_create(new_likes)
+        add_children(comments=new_comments, likes=new_likes)
+        # bulk_create does not send post_save, so count and notify the post authors here
+        Notification.objects.bulk_create(
+            notification
+            for notification in map(like_notification, new_likes)
+            if notification
+        )
+    return new_comments, new_likes
@@ -1,94 +1,248 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
 import requests
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from authorApp.models import AuthorProfile, Follower
+from node_link.models import Notification
+from node_link.signals import new_post_notifications
+from node_link.utils import response_cache, timeline
+from node_link.utils.node_client import external_session
 from postApp.models import Post
-from authorApp.models import AuthorProfile
-
-
-def fetch_github_events(request):
-    author = AuthorProfile.objects.get(pk=request.user.author_profile.pk)
-    # If user doesn't have github just return
-    if (
-        author.user.github_user == None
-        or author.user.github_user == "None"
-        or author.user.github_user == ""
-    ):
-        return []
-
-    url = f"https://api.github.com/users/{author.user.github_user}/events"
-    response = requests.get(url)
-
-    # Ensure we got a successful response
-    if response.status_code != 200:
-        print(f"Error fetching GitHub events: {response.status_code}")
-        return []
-
-    # Load the JSON data from the response
-    events = response.json()
-
-    # If the response doesn't contain the expected list of events, return an empty list
-    if not isinstance(events, list):
-        print(f"Unexpected response format: {events}")
-        return []
-
-    # Reverse the events to prioritize the most recent events
-    events.reverse()
-
-    new_posts = []
-    latest_event_id = None
 
+GITHUB_API_URL = "https://api.github.com"
+# GitHub asks for at least X-Poll-Interval seconds between polls of the events API
+POLL_INTERVAL_SECONDS = getattr(settings, "GITHUB_POLL_INTERVAL_SECONDS", 60)
+POLL_CONCURRENCY = getattr(settings, "GITHUB_POLL_CONCURRENCY", 4)
+TIMEOUT = 10
+
+
+class GithubPoll:
+    """
+    The result of polling the events of one author.
+
+    Attributes:
+        author (AuthorProfile): The polled author.
+        status (int): HTTP status of the response, None if the request failed.
+        etag (str): Validator to send with the next poll.
+        poll_interval (int): Seconds to wait before the next poll.
+        events (list): The events, newest first (empty when unchanged).
+        posts (list[Post]): The posts created for new events.
+        error (str): Why the poll failed, if it did.
+    """
+
+    def __init__(self, author):
+        self.author = author
+        self.status = None
+        self.etag = author.github_etag
+        self.poll_interval = POLL_INTERVAL_SECONDS
+        self.events = []
+        self.posts = []
+        self.error = None
+
+    def fetch(self):
+        """
+        Request the events of the author. Only does HTTP, so it can run in a pool thread.
+        """
+        headers = {"Accept": "application/vnd.github+json"}
+        if self.author.github_etag:
+            headers["If-None-Match"] = self.author.github_etag
+        if self.author.github_token:
+            headers["Authorization"] = f"Bearer {self.author.github_token}"
+        url = f"{GITHUB_API_URL}/users/{self.author.user.github_user}/events"
+        try:
+            response = external_session().get(url, headers=headers, timeout=TIMEOUT)
+        except requests.RequestException as e:
+            self.error = str(e)
+            return self
+
+        self.status = response.status_code
+        try:
+            interval = int(response.headers.get("X-Poll-Interval", 0))
+        except ValueError:
+            interval = 0
+        self.poll_interval = max(interval, POLL_INTERVAL_SECONDS)
+        if response.status_code == 304:
+            return self
+        if response.status_code != 200:
+            self.error = f"Error fetching GitHub events: {response.status_code}"
+            return self
+        try:
+            events = response.json()
+        except ValueError:
+            events = None
+        if not isinstance(events, list):
+            self.error = f"Unexpected response format: {events}"
+            return self
+        self.etag = response.headers.get("ETag", "")
+        self.events = events
+        return self
+
+
+def event_content(event):
+    """
+    The text of the post announcing a GitHub event. Missing fields get a fallback,
+    so a truncated event still gives a post.
+    """
+    repo_name = (event.get("repo") or {}).get("name") or "a repository"
+    event_type = event.get("type") or "event"
+    payload = event.get("payload") or {}
+
+    if event_type == "PushEvent":
+        commit_messages = [
+            commit.get("message", "")
+            for commit in payload.get("commits") or []
+            if isinstance(commit, dict)
+        ]
+        return f"New GitHub push to {repo_name}:\n" + "\n".join(commit_messages)
+    if event_type == "CreateEvent":
+        ref_type = payload.get("ref_type", "repository")
+        ref = payload.get("ref") or repo_name
+        return f"Created new {ref_type}: {ref} in {repo_name}."
+    action = payload.get("action") or "updated"
+    if event_type == "PullRequestEvent":
+        title = (payload.get("pull_request") or {}).get("title") or "untitled"
+        return f"Pull request '{title}' {action} in {repo_name}."
+    if event_type == "IssuesEvent":
+        title = (payload.get("issue") or {}).get("title") or "untitled"
+        return f"Issue '{title}' {action} in {repo_name}."
+    return f"New GitHub {event_type} in {repo_name}."
+
+
+def new_events(author, events):
+    """
+    The events (newest first) that came after the last one posted for `author`, oldest first.
+    Events without an id cannot be told apart and are left out.
+    """
+    fresh = []
     for event in events:
-        event_id = event["id"]
-
-        # Check if the event is new by comparing with last_github_event_id
-        if author.last_github_event_id == event_id:
-            break  # Stop if we've reached the most recent processed event
-
-        repo_name = event["repo"]["name"]
-        event_type = event["type"]
-        post_content = f"New GitHub {event_type} in {repo_name}."
-
-        if event_type == "PushEvent":
-            commit_messages = [
-                commit["message"] for commit in event["payload"]["commits"]
-            ]
-            post_content = f"New GitHub push to {repo_name}:\n" + "\n".join(
-                commit_messages
+        if not isinstance(event, dict) or not event.get("id"):
+            continue
+        if event["id"] == author.last_github_event_id:
+            break
+        fresh.append(event)
+    fresh.reverse()
+    return fresh
+
+
+def save_poll(poll):
+    """
+    Store the outcome of a poll: the new activity posts, inserted in bulk with their
+    notifications and timeline entries, and when the author may be polled next.
+    """
+    author = poll.author
+    fields = {
+        "github_next_poll_at": timezone.now() + timedelta(seconds=poll.poll_interval)
+    }
+    if poll.status == 200:
+        fields["github_etag"] = poll.etag[:255]
+        fresh = new_events(author, poll.events)
+        if fresh:
+            fields["last_github_event_id"] = fresh[-1]["id"]
+        now = timezone.now()
+        poll.posts = [
+            Post(
+                title="New GitHub Activity",
+                description="Automatically generated from GitHub activity.",
+                content=event_content(event),
+                visibility="p",
+                node=author.user.local_node,
+                author=author,
+                contentType="p",
+                created_by=author,
+                # keep the events in order on the timeline
+                created_at=now + timedelta(microseconds=i),
+                updated_at=now + timedelta(microseconds=i),
             )
-
-        elif event_type == "CreateEvent":
-            ref_type = event["payload"].get("ref_type", "repository")
-            ref = event["payload"].get("ref", repo_name)
-            post_content = f"Created new {ref_type}: {ref} in {repo_name}."
-
-        elif event_type == "PullRequestEvent":
-            action = event["payload"]["action"]
-            pr_title = event["payload"]["pull_request"]["title"]
-            post_content = f"Pull request '{pr_title}' {action} in {repo_name}."
-
-        elif event_type == "IssuesEvent":
-            action = event["payload"]["action"]
-            issue_title = event["payload"]["issue"]["title"]
-            post_content = f"Issue '{issue_title}' {action} in {repo_name}."
-
-        # Create a new post
-        Post.objects.create(
-            title="New GitHub Activity",
-            description="Automatically generated from GitHub activity.",
-            content=post_content,
-            visibility="p",
-            node=author.user.local_node,
-            author=author,
-            contentType="p",
-            created_by=author,
+            for i, event in enumerate(fresh)
+        ]
+        for post in poll.posts:
+            post.fqid = post.build_fqid()
+
+    with transaction.atomic():
+        if poll.posts:
+            Post.objects.bulk_create(poll.posts)
+            # bulk_create does not send post_save, so notify and fill the timelines here
+            followers = list(Follower.objects.filter(object=author))
+            Notification.objects.bulk_create(
+                notification
+                for post in poll.posts
+                for notification in new_post_notifications(post, followers)
+            )
+            timeline.add_new_posts(poll.posts)
+            response_cache.invalidate(response_cache.posts_scope(author.pk))
+        # update() so the profile's save signals do not run for bookkeeping fields
+        AuthorProfile.objects.filter(pk=author.pk).update(**fields)
+    return poll
+
+
+def skip_poll(poll):
+    """
+    Move past a poll whose events could not be saved, so the author is polled again
+    after the interval and the same events are not retried forever.
+    """
+    poll.posts = []
+    fields = {
+        "github_next_poll_at": timezone.now() + timedelta(seconds=poll.poll_interval)
+    }
+    if poll.status == 200:
+        fields["github_etag"] = poll.etag[:255]
+        fresh = new_events(poll.author, poll.events)
+        if fresh:
+            fields["last_github_event_id"] = fresh[-1]["id"]
+    AuthorProfile.objects.filter(pk=poll.author.pk).update(**fields)
+    return poll
+
+
+def github_authors(due_only=True):
+    """
+    Local authors that linked a GitHub account, optionally only those due for a poll.
+    """
+    authors = (
+        AuthorProfile.objects.filter(user__local_node__is_remote=False)
+        .exclude(user__github_user__isnull=True)
+        .exclude(user__github_user__in=["", "None"])
+        .select_related("user__local_node")
+    )
+    if due_only:
+        authors = authors.filter(
+            Q(github_next_poll_at__isnull=True)
+            | Q(github_next_poll_at__lte=timezone.now())
         )
-        new_posts.append(event_id)
+    return authors
 
-        # Track the latest event ID to update after processing
-        if latest_event_id is None:
-            latest_event_id = event_id
 
-    # Update last_github_event_id only if there were new events
-    if new_posts:
-        author.last_github_event_id = latest_event_id
-        author.save()
+def poll_github_activity(authors=None):
+    """
+    Poll the GitHub events of every linked author that is due, at most POLL_CONCURRENCY
+    requests at once. Pool threads only do HTTP; posts are saved in the calling thread.
+    Runs from the `poll_github_activity` management command, never on the request path.
+
+    Returns:
+        list[GithubPoll]: One poll per author.
+    """
+    authors = list(github_authors() if authors is None else authors)
+    if not authors:
+        return []
 
-    return new_posts
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=min(POLL_CONCURRENCY, len(authors))) as pool:
+        polls = list(pool.map(GithubPoll.fetch, map(GithubPoll, authors)))
+    for poll in polls:
+        try:
+            save_poll(poll)
+        except Exception as e:
+            poll.error = f"Could not save events: {e}"
+            skip_poll(poll)
+        if poll.error:
+            print(f"{poll.author.user.github_user}: {poll.error}")
+    print(
+        f"Polled GitHub for {len(polls)} author(s) in {time.monotonic() - start:.2f}s, "
+        f"{sum(len(poll.posts) for poll in polls)} new post(s)."
+    )
+    return polls
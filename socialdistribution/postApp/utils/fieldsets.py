@@ -0,0 +1,60 @@
+from rest_framework.exceptions import ValidationError
+
+# always sent, so peers can tell what an object is
+REQUIRED_FIELDS = frozenset(["type", "id"])
+EMBEDDABLE = frozenset(["comments", "likes"])
+
+
+def _names(value):
+    return {name.strip() for name in value.split(",") if name.strip()}
+
+
+class PostFieldset:
+    """
+    Which parts of a post the client asked for with `?fields=`, `?exclude=` and `?embed=`.
+
+    Attributes:
+        fields (set): Top-level fields to include, None for all of them.
+        exclude (set): Top-level fields to leave out.
+        embed (set): Which of the comments and likes objects carry their latest items
+            ("src"); both unless `?embed=` is given.
+    """
+
+    def __init__(self, fields=None, exclude=(), embed=EMBEDDABLE):
+        self.fields = set(fields) | REQUIRED_FIELDS if fields is not None else None
+        self.exclude = set(exclude) - REQUIRED_FIELDS
+        self.embed = set(embed)
+
+    @classmethod
+    def from_request(cls, request, known_fields):
+        """
+        Parse the query parameters of `request`.
+
+        Raises:
+            ValidationError: If a parameter names an unknown field (answered with 400).
+        """
+        params = getattr(request, "query_params", request.GET)
+        fields = _names(params["fields"]) if "fields" in params else None
+        exclude = _names(params.get("exclude", ""))
+        embed = _names(params["embed"]) if "embed" in params else EMBEDDABLE
+        errors = {}
+        for name, given, allowed in (
+            ("fields", fields or set(), known_fields),
+            ("exclude", exclude, known_fields),
+            ("embed", embed, EMBEDDABLE),
+        ):
+            unknown = given - set(allowed)
+            if unknown:
+                errors[name] = f"Unknown: {', '.join(sorted(unknown))}."
+        if errors:
+            raise ValidationError(errors)
+        return cls(fields, exclude, embed)
+
+    def includes(self, name):
+        return (self.fields is None or name in self.fields) and name not in self.exclude
+
+    def embeds(self, name):
+        """
+        Whether the latest items of `name` ("comments" or "likes") are sent, and so loaded.
+        """
+        return self.includes(name) and name in self.embed
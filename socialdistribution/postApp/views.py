@@ -2,10 +2,10 @@
 from django.urls import reverse
 from django.contrib import messages
 from django.core.exceptions import ValidationError
-from django.core.paginator import Paginator
 from django.core.files.images import get_image_dimensions
 from django.contrib.auth.decorators import login_required
 from django.http import (
+    HttpResponseBadRequest,
     HttpResponseForbidden,
     HttpResponseNotAllowed,
     JsonResponse,
@@ -39,11 +39,22 @@ from drf_yasg import openapi
 # Project imports
 from authorApp.models import AuthorProfile, User, Follower, Friends
 from node_link.models import Notification
-from node_link.utils.common import has_access, is_approved
-from node_link.utils.communication import send_to_remote_inboxes
+from node_link.utils.common import is_approved
+from node_link.utils.cursor import api_list_page
+from node_link.utils.fanout import deliver_to_authors, plan_fanout, plan_post_fanout
+from node_link.utils import response_cache
+from node_link.utils.response_cache import cached_response
+from node_link.utils.visibility import audience, can_view, viewer_of, visible_posts
 
 from postApp.models import Comment, Like, Post
+from postApp.utils.fieldsets import PostFieldset
 from postApp.utils.image_check import check_image
+from postApp.utils.cards import (
+    DEFAULT_AVATAR,
+    MAX_CARDS,
+    card_posts,
+    render_content,
+)
 from authorApp.serializers import AuthorProfileSerializer
 from postApp.serializers import CommentSerializer
 from node_link.utils.common import remove_api_suffix
@@ -104,33 +115,10 @@ def submit_post(request, username):
         post.post_serial = post.uuid
         post.save()
 
-        post_json = PostSerializer(post, context={"request": request}).data
-        # remote handle following(public and unlisted)
-
-        # remote handle friends only
-        if post.visibility == "fo":
-            for a in Friends.objects.filter(Q(user1=author) | Q(user2=author)):
-                print(f"user1: {a.user1}, user2: {a.user2}, author: {author}")
-
-            remote_friends = [
-                a.user2.fqid if a.user1 == author else a.user1.fqid
-                for a in Friends.objects.filter(Q(user1=author) | Q(user2=author))
-            ]
-
-            print(f"remote friends here {remote_friends}")
-
-            for a in AuthorProfile.objects.filter(fqid__in=remote_friends):
-                print(f"author: {a.fqid}")
-                send_to_remote_inboxes(post_json, a)
-
-        else:
-            remote_followers = Follower.objects.filter(
-                object=author, actor__user__local_node__is_remote=True
-            ).values_list("actor__id", flat=True)
-
-            for a in AuthorProfile.objects.filter(id__in=remote_followers):
-
-                send_to_remote_inboxes(post_json, a)
+        # remote handle friends only (friends) or following (public and unlisted)
+        plan = plan_post_fanout(post)
+        if plan:
+            plan.deliver(PostSerializer(post, context={"request": request}).data)
 
         # Redirect to the post list page
         return redirect("node_link:home", username=username)
@@ -164,14 +152,9 @@ def create_comment(request, username, post_uuid):
         comment_json = CommentSerializer(comment, context={"request": request}).data
 
         if post.author.user.local_node.is_remote:
-            send_to_remote_inboxes(comment_json, post.author)
+            deliver_to_authors(comment_json, [post.author])
         else:
-            remote_followers = Follower.objects.filter(
-                object=author, actor__user__local_node__is_remote=True
-            ).values_list("actor__id", flat=True)
-
-            for a in AuthorProfile.objects.filter(id__in=remote_followers):
-                send_to_remote_inboxes(comment_json, a)
+            plan_fanout(author, followers=True).deliver(comment_json)
 
         return render(request, "create_comment_card.html", {"success": True})
 
@@ -198,14 +181,9 @@ def like_post(request, username, post_uuid):
     like_json = LikeSerializer(like, context={"request": request}).data
 
     if post.author.user.local_node.is_remote:
-        send_to_remote_inboxes(like_json, post.author)
+        deliver_to_authors(like_json, [post.author])
     else:
-        remote_followers = Follower.objects.filter(
-            object=author, actor__user__local_node__is_remote=True
-        ).values_list("actor__id", flat=True)
-
-        for a in AuthorProfile.objects.filter(id__in=remote_followers):
-            send_to_remote_inboxes(like_json, a)
+        plan_fanout(author, followers=True).deliver(like_json)
 
     return redirect("postApp:post_detail", username, post_uuid)
 
@@ -216,36 +194,13 @@ def delete_post(request, username, post_uuid):
     post = get_object_or_404(Post, uuid=post_uuid)
     # check if they are allow to delete
     if post.author.user == request.user:
-        author = post.author
+        # plan before the visibility changes so the same audience hears about the delete
+        plan = plan_post_fanout(post)
         post.visibility = "d"
         post.save()
 
-        post_json = PostSerializer(post, context={"request": request}).data
-
-        # remote handle friends only
-        if post.visibility == "fo":
-            for a in Friends.objects.filter(Q(user1=author) | Q(user2=author)):
-                print(f"user1: {a.user1}, user2: {a.user2}, author: {author}")
-
-            remote_friends = [
-                a.user2.fqid if a.user1 == author else a.user1.fqid
-                for a in Friends.objects.filter(Q(user1=author) | Q(user2=author))
-            ]
-
-            print(f"remote friends here {remote_friends}")
-
-            for a in AuthorProfile.objects.filter(fqid__in=remote_friends):
-                print(f"author: {a.fqid}")
-                send_to_remote_inboxes(post_json, a)
-
-        else:
-            remote_followers = Follower.objects.filter(
-                object=author, actor__user__local_node__is_remote=True
-            ).values_list("actor__id", flat=True)
-
-            for a in AuthorProfile.objects.filter(id__in=remote_followers):
-
-                send_to_remote_inboxes(post_json, a)
+        if plan:
+            plan.deliver(PostSerializer(post, context={"request": request}).data)
 
     return redirect("node_link:home", username=username)
 
@@ -341,33 +296,10 @@ def submit_edit_post(request, username, post_uuid):
     post.updated_at = datetime.now()
     post.save()
 
-    author = post.author
-
-    post_json = PostSerializer(post, context={"request": request}).data
-
-    # remote handle friends only
-    if post.visibility == "fo":
-        for a in Friends.objects.filter(Q(user1=author) | Q(user2=author)):
-            print(f"user1: {a.user1}, user2: {a.user2}, author: {author}")
-
-        remote_friends = [
-            a.user2.fqid if a.user1 == author else a.user1.fqid
-            for a in Friends.objects.filter(Q(user1=author) | Q(user2=author))
-        ]
-
-        print(f"remote friends here {remote_friends}")
-
-        for a in AuthorProfile.objects.filter(fqid__in=remote_friends):
-            print(f"author: {a.fqid}")
-            send_to_remote_inboxes(post_json, a)
-
-    remote_followers = Follower.objects.filter(
-        object=author, actor__user__local_node__is_remote=True
-    ).values_list("actor__id", flat=True)
-
-    for a in AuthorProfile.objects.filter(id__in=remote_followers):
-
-        send_to_remote_inboxes(post_json, a)
+    # remote handle friends only, followers always hear about edits
+    plan = plan_post_fanout(post, include_followers=True)
+    if plan:
+        plan.deliver(PostSerializer(post, context={"request": request}).data)
 
     return redirect(
         "postApp:post_detail", username=request.user.username, post_uuid=post_uuid
@@ -391,43 +323,51 @@ def post_card(
         _type_: _description_
     """
 
-    post = get_object_or_404(Post, uuid=post_uuid)
-    # check is user has permission to see post
-    if has_access(request=request, post_uuid=post_uuid, username=username):
-
-        user_has_liked = post.postliked.filter(
-            author=request.user.author_profile
-        ).exists()
-        author = post.author
-        user_img = (
-            author.user.profileImage
-            if author.user.profileImage
-            else "https://s3.amazonaws.com/37assets/svn/765-default-avatar.png"
-        )
-
-        if post.contentType == "m":
-            # Convert Markdown to HTML
-            parser = commonmark.Parser()
-            renderer = commonmark.HtmlRenderer()
-            post_content = renderer.render(parser.parse(post.content))
-        else:
-            post_content = post.content
-
+    # one query for the post, its author, its like count and visibility
+    posts = card_posts(request.user.author_profile, [post_uuid])
+    if posts:
+        post = posts[0]
         context = {
             "post": post,
-            "post_content": post_content,
-            "user_has_liked": user_has_liked,
-            "profileImg": user_img,
+            "post_content": render_content(post),
+            "user_has_liked": post.user_has_liked,
+            "like_count": post.like_count,
+            "profileImg": post.author.user.profileImage or DEFAULT_AVATAR,
         }
         return render(request, "post_card.html", context)
+    get_object_or_404(Post.objects.only("id"), uuid=post_uuid)
     return HttpResponseForbidden("You are not supposed to be here. Go Home!")
 
 
+@is_approved
+def post_cards(request, username):
+    """renders the cards of several posts (?uuid=...&uuid=...) in one response
+
+    Posts that do not exist or that the user may not see are left out.
+    """
+    try:
+        uuids = [uuid.UUID(value) for value in request.GET.getlist("uuid")]
+    except ValueError:
+        return HttpResponseBadRequest("Invalid post id.")
+    if len(uuids) > MAX_CARDS:
+        return HttpResponseBadRequest(f"At most {MAX_CARDS} posts per request.")
+
+    cards = [
+        {
+            "post": post,
+            "content": render_content(post),
+            "profileImg": post.author.user.profileImage or DEFAULT_AVATAR,
+        }
+        for post in card_posts(request.user.author_profile, uuids)
+    ]
+    return render(request, "post_cards.html", {"cards": cards})
+
+
 @is_approved
 def post_detail(request, username, post_uuid: str):
 
     post = get_object_or_404(Post, uuid=post_uuid)
-    if has_access(request=request, post_uuid=post_uuid, username=username):
+    if can_view(request.user.author_profile, post):
         user_has_liked = False
 
         if request.user.is_authenticated:
@@ -508,7 +448,81 @@ def handle_share_post(request, author_serial, post_uuid):
         return JsonResponse({"success": True})
 
 
-class PostViewSet(viewsets.ModelViewSet):
+# opt-in keyset pagination of the comment and like lists (node_link/utils/cursor.py)
+CURSOR_PARAMETERS = [
+    openapi.Parameter(
+        "cursor",
+        openapi.IN_QUERY,
+        description="Switch to cursor pagination: empty for the first page, then the `next` of the previous page.",
+        type=openapi.TYPE_STRING,
+        required=False,
+    ),
+    openapi.Parameter(
+        "size",
+        openapi.IN_QUERY,
+        description="Page size in cursor mode.",
+        type=openapi.TYPE_INTEGER,
+        required=False,
+    ),
+]
+
+
+# sparse fieldsets of serialized posts (postApp/utils/fieldsets.py)
+FIELDSET_PARAMETERS = [
+    openapi.Parameter(
+        "fields",
+        openapi.IN_QUERY,
+        description="Comma-separated post fields to return (type and id are always sent).",
+        type=openapi.TYPE_STRING,
+        required=False,
+    ),
+    openapi.Parameter(
+        "exclude",
+        openapi.IN_QUERY,
+        description="Comma-separated post fields to leave out.",
+        type=openapi.TYPE_STRING,
+        required=False,
+    ),
+    openapi.Parameter(
+        "embed",
+        openapi.IN_QUERY,
+        description="Which of comments,likes carry their latest items; both by default, empty for none.",
+        type=openapi.TYPE_STRING,
+        required=False,
+    ),
+]
+
+
+def post_fieldset(request):
+    """
+    The fieldset asked for by a GET request, None (everything) for other methods.
+
+    Raises:
+        ValidationError: If the request names unknown fields.
+    """
+    if request.method != "GET":
+        return None
+    return PostFieldset.from_request(request, PostSerializer.Meta.fields)
+
+
+class PostFieldsetMixin:
+    """
+    Serialize and load only the parts of the posts named by `?fields=`, `?exclude=`
+    and `?embed=`.
+    """
+
+    def get_fieldset(self):
+        if not hasattr(self, "_fieldset"):
+            self._fieldset = post_fieldset(self.request)
+        return self._fieldset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["fieldset"] = self.get_fieldset()
+        return context
+
+
+class PostViewSet(PostFieldsetMixin, viewsets.ModelViewSet):
     """API endpoint for managing posts"""
 
     queryset = Post.objects.all()
@@ -517,12 +531,16 @@ class PostViewSet(viewsets.ModelViewSet):
     lookup_field = "uuid"
 
     def get_queryset(self):
+        # remote nodes and users without a profile only see public and unlisted posts
+        posts = PostSerializer.setup_eager_loading(
+            visible_posts(viewer_of(self.request)), self.get_fieldset()
+        )
         author_serial = self.kwargs.get("author_serial")
         if author_serial:
-            return Post.objects.filter(author__user__username=author_serial).order_by(
+            return posts.filter(author__user__username=author_serial).order_by(
                 "-created_at"
             )
-        return Post.objects.all()
+        return posts
 
     @swagger_auto_schema(
         operation_description="Retrieve a list of posts for a specific author.",
@@ -551,6 +569,7 @@ class PostViewSet(viewsets.ModelViewSet):
                 required=False,
                 example=10,
             ),
+            *FIELDSET_PARAMETERS,
         ],
         responses={
             200: openapi.Response(
@@ -586,6 +605,9 @@ class PostViewSet(viewsets.ModelViewSet):
                     }
                 },
             ),
+            304: openapi.Response(
+                description="The page has not changed since the ETag sent in If-None-Match."
+            ),
             401: "Unauthorized - Authentication credentials were not provided or are invalid.",
         },
         tags=["Posts"],
@@ -594,6 +616,28 @@ class PostViewSet(viewsets.ModelViewSet):
         """
         Custom list method to return paginated posts in the required format.
         """
+        author_id = (
+            AuthorProfile.objects.filter(
+                user__username=self.kwargs.get("author_serial")
+            )
+            .values_list("pk", flat=True)
+            .first()
+        )
+        if author_id is None:
+            return cached_response(request, None, self.post_page)
+        # viewers that see the same posts of this author share the cached pages
+        return cached_response(
+            request,
+            [
+                response_cache.posts_scope(author_id),
+                response_cache.author_scope(author_id),
+            ],
+            self.post_page,
+            audience=audience(viewer_of(request), author_id),
+        )
+
+    def post_page(self):
+        request = self.request
         # Get queryset
         queryset = self.filter_queryset(self.get_queryset())
 
@@ -616,7 +660,7 @@ class PostViewSet(viewsets.ModelViewSet):
             "src": serializer.data,
         }
 
-        return Response(response_data)
+        return response_data
 
     @swagger_auto_schema(
         operation_description="Create a new post for a specific author.",
@@ -835,7 +879,7 @@ class PostViewSet(viewsets.ModelViewSet):
         )
 
 
-class LocalPostViewSet(viewsets.ModelViewSet):
+class LocalPostViewSet(PostFieldsetMixin, viewsets.ModelViewSet):
     queryset = Post.objects.all()
     serializer_class = PostSerializer
     permission_classes = [IsAuthenticated]
@@ -845,6 +889,7 @@ class LocalPostViewSet(viewsets.ModelViewSet):
         operation_description=(
             "Retrieve a list of posts that are either public or unlisted and match the provided UUID."
         ),
+        manual_parameters=FIELDSET_PARAMETERS,
         responses={
             200: openapi.Response(
                 description="A list of posts.",
@@ -855,8 +900,12 @@ class LocalPostViewSet(viewsets.ModelViewSet):
         tags=["Posts"],
     )
     def get_queryset(self):
-        return Post.objects.filter(
-            visibility__in=["p", "u"], uuid=self.kwargs.get("uuid")
+        return PostSerializer.setup_eager_loading(
+            visible_posts(
+                viewer_of(self.request),
+                Post.objects.filter(uuid=self.kwargs.get("uuid")),
+            ),
+            self.get_fieldset(),
         )
 
 
@@ -1023,6 +1072,7 @@ class CommentedView(APIView):
                 type=openapi.TYPE_INTEGER,
                 required=False,
             ),
+            *CURSOR_PARAMETERS,
         ],
         responses={
             200: openapi.Response(
@@ -1084,20 +1134,19 @@ class CommentedView(APIView):
         elif author_serial:
             # List all comments by the author
             author = get_object_or_404(AuthorProfile, user__username=author_serial)
-            comments = Comment.objects.filter(author=author)
+            comments = CommentSerializer.setup_eager_loading(
+                Comment.objects.filter(author=author)
+            )
             if request.get_host() != author.user.local_node.url:
                 comments = comments.filter(post__visibility__in=["p", "u"])
 
-            # Pagination logic (~5 comments per page)
-            page_size = 5
-            page_number = int(request.query_params.get("page", 1))
-            start_index = (page_number - 1) * page_size
-            end_index = start_index + page_size
-
-            paginated_comments = comments[start_index:end_index]
+            # ~5 comments per page
+            paginated_comments, page_size, page_number, next_cursor = api_list_page(
+                request, comments
+            )
 
-            # Total comment count
-            total_count = comments.count()
+            # Total comment count (skipped in cursor mode)
+            total_count = None if page_number is None else comments.count()
 
             host_with_api = author.user.local_node.url
             host_no_api = remove_api_suffix(host_with_api)
@@ -1117,7 +1166,10 @@ class CommentedView(APIView):
 
             # Serialize and return the response
             serializer = CommentsSerializer(response_data, context={"request": request})
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            data = serializer.data
+            if page_number is None:
+                data["next"] = next_cursor
+            return Response(data, status=status.HTTP_200_OK)
 
         return Response(
             {"detail": "Invalid request."}, status=status.HTTP_400_BAD_REQUEST
@@ -1271,6 +1323,7 @@ class CommentedFQIDView(APIView):
                 type=openapi.TYPE_INTEGER,
                 required=False,
             ),
+            *CURSOR_PARAMETERS,
         ],
         responses={
             200: openapi.Response(
@@ -1325,20 +1378,19 @@ class CommentedFQIDView(APIView):
         if author_fqid:
             # List all comments by the author
             author = get_object_or_404(AuthorProfile, fqid=author_fqid)
-            comments = Comment.objects.filter(author=author)
+            comments = CommentSerializer.setup_eager_loading(
+                Comment.objects.filter(author=author)
+            )
             if request.get_host() != author.user.local_node.url:
                 comments = comments.filter(post__visibility__in=["p", "u"])
 
-            # Pagination logic (~5 comments per page)
-            page_size = 5
-            page_number = int(request.query_params.get("page", 1))
-            start_index = (page_number - 1) * page_size
-            end_index = start_index + page_size
-
-            paginated_comments = comments[start_index:end_index]
+            # ~5 comments per page
+            paginated_comments, page_size, page_number, next_cursor = api_list_page(
+                request, comments
+            )
 
-            # Total comment count
-            total_count = comments.count()
+            # Total comment count (skipped in cursor mode)
+            total_count = None if page_number is None else comments.count()
 
             host_with_api = author.user.local_node.url
             host_no_api = remove_api_suffix(host_with_api)
@@ -1358,7 +1410,10 @@ class CommentedFQIDView(APIView):
 
             # Serialize and return the response
             serializer = CommentsSerializer(response_data, context={"request": request})
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            data = serializer.data
+            if page_number is None:
+                data["next"] = next_cursor
+            return Response(data, status=status.HTTP_200_OK)
 
         return Response(
             {"detail": "Invalid request."}, status=status.HTTP_400_BAD_REQUEST
@@ -1445,6 +1500,7 @@ class SinglePostView(APIView):
                 type=openapi.TYPE_STRING,
                 required=True,
             ),
+            *FIELDSET_PARAMETERS,
         ],
         responses={
             200: openapi.Response(
@@ -1468,6 +1524,9 @@ class SinglePostView(APIView):
                     },
                 ),
             ),
+            304: openapi.Response(
+                description="The post has not changed since the ETag sent in If-None-Match."
+            ),
             403: openapi.Response(description="Post is not public."),
             404: openapi.Response(description="Post not found."),
         },
@@ -1478,17 +1537,34 @@ class SinglePostView(APIView):
         GET: Retrieve a single post using its FQID.
         """
         post_fqid = unquote(post_fqid)
+        post_ids = Post.objects.filter(fqid=post_fqid).values("pk", "author_id").first()
+        if post_ids is None:
+            raise Http404("No Post matches the given query.")
+
+        def post_data():
+            fieldset = post_fieldset(request)
+            post = get_object_or_404(
+                PostSerializer.setup_eager_loading(Post.objects.all(), fieldset),
+                fqid=post_fqid,
+            )
 
-        post = get_object_or_404(Post, fqid=post_fqid)
+            if post.visibility != "p":
+                return Response(
+                    {"detail": "Post is not public."},
+                    status=status.HTTP_403_FORBIDDEN,
+                )
 
-        if post.visibility != "p":
-            return Response(
-                {"detail": "Post is not public."},
-                status=status.HTTP_403_FORBIDDEN,
-            )
+            return PostSerializer(post, context={"fieldset": fieldset}).data
 
-        serializer = PostSerializer(post)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        # only public posts are served, the same to every client
+        return cached_response(
+            request,
+            [
+                response_cache.post_scope(post_ids["pk"]),
+                response_cache.author_scope(post_ids["author_id"]),
+            ],
+            post_data,
+        )
 
 
 class PostImageViewFQID(APIView):
@@ -1666,6 +1742,7 @@ class PostCommentsView(APIView):
                 type=openapi.TYPE_INTEGER,
                 required=False,
             ),
+            *CURSOR_PARAMETERS,
         ],
         responses={
             200: openapi.Response(
@@ -1742,18 +1819,17 @@ class PostCommentsView(APIView):
         author = get_object_or_404(AuthorProfile, user__username=author_serial)
         post = get_object_or_404(Post, uuid=post_serial, author=author)
         # Filter comments associated with the post, ordered by newest to oldest
-        comments = Comment.objects.filter(post=post).order_by("-created_at")
-
-        # Pagination logic (~5 comments per page)
-        page_size = 5
-        page_number = int(request.query_params.get("page", 1))
-        start_index = (page_number - 1) * page_size
-        end_index = start_index + page_size
+        comments = CommentSerializer.setup_eager_loading(
+            Comment.objects.filter(post=post).order_by("-created_at")
+        )
 
-        paginated_comments = comments[start_index:end_index]
+        # ~5 comments per page
+        paginated_comments, page_size, page_number, next_cursor = api_list_page(
+            request, comments
+        )
 
         # Total comment count
-        total_count = comments.count()
+        total_count = post.comment_count
 
         host_with_api = author.user.local_node.url
         host_no_api = remove_api_suffix(host_with_api)
@@ -1773,7 +1849,10 @@ class PostCommentsView(APIView):
 
         # Serialize and return the response
         serializer = CommentsSerializer(response_data, context={"request": request})
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        data = serializer.data
+        if page_number is None:
+            data["next"] = next_cursor
+        return Response(data, status=status.HTTP_200_OK)
 
 
 class PostCommentsViewFQID(APIView):
@@ -1802,6 +1881,7 @@ class PostCommentsViewFQID(APIView):
                 type=openapi.TYPE_INTEGER,
                 required=False,
             ),
+            *CURSOR_PARAMETERS,
         ],
         responses={
             200: openapi.Response(
@@ -1877,18 +1957,17 @@ class PostCommentsViewFQID(APIView):
         post = get_object_or_404(Post, fqid=post_fqid)
 
         # Filter comments associated with the post, ordered by newest to oldest
-        comments = Comment.objects.filter(post=post).order_by("-created_at")
-
-        # Pagination logic (~5 comments per page)
-        page_size = 5
-        page_number = int(request.query_params.get("page", 1))
-        start_index = (page_number - 1) * page_size
-        end_index = start_index + page_size
+        comments = CommentSerializer.setup_eager_loading(
+            Comment.objects.filter(post=post).order_by("-created_at")
+        )
 
-        paginated_comments = comments[start_index:end_index]
+        # ~5 comments per page
+        paginated_comments, page_size, page_number, next_cursor = api_list_page(
+            request, comments
+        )
 
         # Total comment count
-        total_count = comments.count()
+        total_count = post.comment_count
 
         # Construct response metadata
 
@@ -1910,7 +1989,10 @@ class PostCommentsViewFQID(APIView):
 
         # Serialize and return the response
         serializer = CommentsSerializer(response_data, context={"request": request})
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        data = serializer.data
+        if page_number is None:
+            data["next"] = next_cursor
+        return Response(data, status=status.HTTP_200_OK)
 
 
 class RemoteCommentView(APIView):
@@ -2034,6 +2116,7 @@ class PostLikesAPIView(APIView):
                 type=openapi.TYPE_INTEGER,
                 required=False,
             ),
+            *CURSOR_PARAMETERS,
         ],
         responses={
             200: openapi.Response(
@@ -2079,15 +2162,16 @@ class PostLikesAPIView(APIView):
         post = get_object_or_404(Post, uuid=post_uuid, author=author)
 
         # Get all likes on the post
-        likes = Like.objects.filter(post=post).order_by("-created_at")
+        likes = LikeSerializer.setup_eager_loading(
+            Like.objects.filter(post=post).order_by("-created_at")
+        )
 
-        # Paginate the results (5 likes per page)
-        paginator = Paginator(likes, 5)
-        page_number = request.query_params.get("page", 1)
-        page = paginator.get_page(page_number)
+        # 5 likes per page
+        rows, size, page_number, next_cursor = api_list_page(request, likes)
+        count = post.like_count
 
         # Serialize the results
-        serializer = LikeSerializer(page.object_list, many=True)
+        serializer = LikeSerializer(rows, many=True)
         host = post.node.url
         host_no_api = remove_api_suffix(host)
         # Construct the response body
@@ -2095,11 +2179,13 @@ class PostLikesAPIView(APIView):
             "type": "likes",
             "id": f"{host}authors/{author_serial}/posts/{post_uuid}/likes",
             "page": f"{host_no_api}/{author_serial}/posts_list/{post_uuid}",
-            "page_number": page.number,
-            "size": paginator.per_page,
-            "count": paginator.count,
+            "page_number": page_number,
+            "size": size,
+            "count": count,
             "src": serializer.data,
         }
+        if page_number is None:
+            response_data["next"] = next_cursor
 
         return Response(response_data, status=status.HTTP_200_OK)
 
@@ -2126,6 +2212,7 @@ class PostLikesFQIDAPIView(APIView):
                 type=openapi.TYPE_INTEGER,
                 required=False,
             ),
+            *CURSOR_PARAMETERS,
         ],
         responses={
             200: openapi.Response(
@@ -2198,16 +2285,17 @@ class PostLikesFQIDAPIView(APIView):
 
         post = get_object_or_404(Post, fqid=post_fqid)
 
-        likes = Like.objects.filter(post=post).order_by("-created_at")
+        likes = LikeSerializer.setup_eager_loading(
+            Like.objects.filter(post=post).order_by("-created_at")
+        )
 
         author_serial = post.author.user.user_serial
-        # Paginate the results (5 likes per page)
-        paginator = Paginator(likes, 5)
-        page_number = request.query_params.get("page", 1)
-        page = paginator.get_page(page_number)
+        # 5 likes per page
+        rows, size, page_number, next_cursor = api_list_page(request, likes)
+        count = post.like_count
 
         # Serialize the results
-        serializer = LikeSerializer(page.object_list, many=True)
+        serializer = LikeSerializer(rows, many=True)
         host = post.node.url
         host_no_api = remove_api_suffix(host)
         # Construct the response body
@@ -2216,11 +2304,13 @@ class PostLikesFQIDAPIView(APIView):
             # http://www.tran.com/api/authors/smartguy/liked/ed58935c-8795-4a3a-83ab-f706fadf7e38
             "id": f"{host}authors/{author_serial}/posts/{post.post_serial}/likes",
             "page": f"{host_no_api}/authors/{post.author.user.username}/posts/{post.uuid}",
-            "page_number": page.number,
-            "size": paginator.per_page,
-            "count": paginator.count,
+            "page_number": page_number,
+            "size": size,
+            "count": count,
             "src": serializer.data,
         }
+        if page_number is None:
+            response_data["next"] = next_cursor
 
         return Response(response_data, status=status.HTTP_200_OK)
 
@@ -2455,6 +2545,7 @@ class ThingsLikedByAuthorView(APIView):
                 type=openapi.TYPE_INTEGER,
                 required=False,
             ),
+            *CURSOR_PARAMETERS,
         ],
         responses={
             200: openapi.Response(
@@ -2545,15 +2636,16 @@ class ThingsLikedByAuthorView(APIView):
         author = get_object_or_404(AuthorProfile, user__username=author_serial)
 
         # Fetch all likes made by the author
-        likes = Like.objects.filter(author=author).order_by("-created_at")
+        likes = LikeSerializer.setup_eager_loading(
+            Like.objects.filter(author=author).order_by("-created_at")
+        )
 
-        # Paginate the results (5 likes per page)
-        paginator = Paginator(likes, 5)
-        page_number = request.query_params.get("page", 1)
-        page = paginator.get_page(page_number)
+        # 5 likes per page
+        rows, size, page_number, next_cursor = api_list_page(request, likes)
+        count = None if page_number is None else likes.count()
 
         # Serialize the likes in the current page
-        serializer = LikeSerializer(page.object_list, many=True)
+        serializer = LikeSerializer(rows, many=True)
 
         host_with_api = author.user.local_node.url
         host_no_api = remove_api_suffix(host_with_api)
@@ -2565,11 +2657,13 @@ class ThingsLikedByAuthorView(APIView):
             "type": "likes",
             "id": f"{host_with_api}authors/{remote_author_serial}/liked",
             "page": f"{host_no_api}/{website_author_serial}/profile",
-            "page_number": page.number,
-            "size": paginator.per_page,
-            "count": paginator.count,
+            "page_number": page_number,
+            "size": size,
+            "count": count,
             "src": serializer.data,
         }
+        if page_number is None:
+            response_data["next"] = next_cursor
 
         return Response(response_data, status=status.HTTP_200_OK)
 
@@ -2691,6 +2785,7 @@ class ThingsLikedByAuthorFQIDView(APIView):
                 type=openapi.TYPE_INTEGER,
                 required=False,
             ),
+            *CURSOR_PARAMETERS,
         ],
         responses={
             200: openapi.Response(
@@ -2783,15 +2878,16 @@ class ThingsLikedByAuthorFQIDView(APIView):
         author = get_object_or_404(AuthorProfile, fqid=author_fqid)
 
         # Fetch all likes made by the author
-        likes = Like.objects.filter(author=author).order_by("-created_at")
+        likes = LikeSerializer.setup_eager_loading(
+            Like.objects.filter(author=author).order_by("-created_at")
+        )
 
-        # Paginate the results (5 likes per page)
-        paginator = Paginator(likes, 5)
-        page_number = request.query_params.get("page", 1)
-        page = paginator.get_page(page_number)
+        # 5 likes per page
+        rows, size, page_number, next_cursor = api_list_page(request, likes)
+        count = None if page_number is None else likes.count()
 
         # Serialize the likes in the current page
-        serializer = LikeSerializer(page.object_list, many=True)
+        serializer = LikeSerializer(rows, many=True)
 
         host_with_api = author.user.local_node.url
         host_no_api = remove_api_suffix(host_with_api)
@@ -2803,10 +2899,12 @@ class ThingsLikedByAuthorFQIDView(APIView):
             "type": "likes",
             "id": f"{host_with_api}authors/{remote_author_serial}/liked",
             "page": f"{host_no_api}/{website_author_serial}/profile",
-            "page_number": page.number,
-            "size": paginator.per_page,
-            "count": paginator.count,
+            "page_number": page_number,
+            "size": size,
+            "count": count,
             "src": serializer.data,
         }
+        if page_number is None:
+            response_data["next"] = next_cursor
 
         return Response(response_data, status=status.HTTP_200_OK)
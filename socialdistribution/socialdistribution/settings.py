@@ -103,6 +103,21 @@ DATABASE_URL = os.environ.get("DATABASE_URL")
 if DATABASE_URL:
     DATABASES["default"] = dj_database_url.config(conn_max_age=600, ssl_require=True)
 
+# Per-process memory cache by default; set REDIS_URL to share one cache between all gunicorn
+# workers and the background commands (needs the `redis` package). Caches that must be invalidated
+# across processes (social graphs, API responses) are only long-lived with a shared backend.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+REDIS_URL = os.environ.get("REDIS_URL")
+if REDIS_URL:
+    CACHES["default"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REDIS_URL,
+    }
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -190,3 +205,87 @@ REST_FRAMEWORK = {
     ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
 }
+
+# Outbound federation requests reuse one pooled keep-alive session per remote node
+# (node_link/utils/node_client.py). POOL_MAXSIZE should be at least FANOUT_PER_NODE_CONCURRENCY.
+NODE_HTTP_TIMEOUT = 10
+NODE_HTTP_POOL_CONNECTIONS = 4
+NODE_HTTP_POOL_MAXSIZE = 16
+
+# Per-node circuit breaker (node_link/utils/circuit_breaker.py): after NODE_BREAKER_FAILURE_THRESHOLD
+# consecutive failures a node is skipped for NODE_BREAKER_RESET_SECONDS, then probed with one request.
+NODE_BREAKER_FAILURE_THRESHOLD = 5
+NODE_BREAKER_RESET_SECONDS = 60
+# number of recent request latencies kept per node for the p50/p95 shown in the admin
+NODE_LATENCY_WINDOW = 50
+
+# Federated inbox deliveries are queued in the outbox and sent by a separate worker:
+# python manage.py process_outbox --loop
+# Failed deliveries are retried with exponential backoff (OUTBOX_BACKOFF_SECONDS doubled per attempt,
+# capped at OUTBOX_MAX_BACKOFF_SECONDS) until OUTBOX_MAX_ATTEMPTS is reached.
+OUTBOX_BATCH_SIZE = 100
+OUTBOX_CONCURRENCY = 8
+OUTBOX_MAX_ATTEMPTS = 8
+OUTBOX_BACKOFF_SECONDS = 30
+OUTBOX_MAX_BACKOFF_SECONDS = 3600
+# in-flight deliveries older than this are considered abandoned by a dead worker
+OUTBOX_CLAIM_TIMEOUT_SECONDS = 600
+
+# Inbox deliveries for one activity are sent in parallel (node_link/utils/fanout_executor.py),
+# at most FANOUT_CONCURRENCY at once and FANOUT_PER_NODE_CONCURRENCY per remote node.
+# FEDERATION_DELIVERY_MODE "outbox" hands them to the worker; "direct" sends them during the request
+# and only queues the ones that failed.
+FEDERATION_DELIVERY_MODE = os.environ.get("FEDERATION_DELIVERY_MODE", "outbox")
+FANOUT_CONCURRENCY = 32
+FANOUT_PER_NODE_CONCURRENCY = 8
+# Largest batch accepted by api/inbox/batch/ (and sent to nodes that advertise a batch inbox)
+INBOX_BATCH_MAX_ITEMS = 100
+# With INBOX_ASYNC=true inboxes only check the activity and answer 202; `python manage.py process_inbox --loop`
+# applies the queued activities in order, retrying unexpected errors up to INBOX_MAX_ATTEMPTS times
+# with exponential backoff (INBOX_BACKOFF_SECONDS doubled per attempt, capped at INBOX_MAX_BACKOFF_SECONDS).
+INBOX_ASYNC = os.environ.get("INBOX_ASYNC", "false").lower() == "true"
+INBOX_BATCH_SIZE = 100
+INBOX_MAX_ATTEMPTS = 3
+INBOX_BACKOFF_SECONDS = 30
+INBOX_MAX_BACKOFF_SECONDS = 3600
+# Activities claimed by a processor that has not finished within this many seconds are released.
+INBOX_CLAIM_TIMEOUT_SECONDS = 600
+# Applied posts, comments and likes are remembered by id and content hash so that resent copies are
+# acknowledged without being processed again; records unseen for INBOX_SEEN_ACTIVITY_DAYS are pruned by `process_inbox`.
+INBOX_SEEN_ACTIVITY_DAYS = 30
+
+# Posts per page of the home stream, read from the author's materialized timeline
+# (rebuild it with `python manage.py rebuild_timelines`); later pages load on scroll.
+HOME_TIMELINE_LENGTH = 50
+# Largest number of posts rendered by one request to the post_cards endpoint.
+POST_CARDS_MAX = 50
+# Comment and like lists of the API switch to keyset pagination with ?cursor= (the `next` of the
+# previous page); ?size= is then accepted up to API_CURSOR_MAX_SIZE.
+API_CURSOR_MAX_SIZE = 100
+# Friends, followers and follow requests of an author are cached (node_link/utils/social_graph.py)
+# and invalidated whenever a Follower or Friends row changes; entries expire after this long regardless.
+# Without a shared cache other processes cannot see invalidations, so entries only live
+# SOCIAL_GRAPH_LOCAL_CACHE_SECONDS.
+SOCIAL_GRAPH_CACHE_SECONDS = 3600
+SOCIAL_GRAPH_LOCAL_CACHE_SECONDS = 5
+# Author lists, post lists, single posts and single authors served to peers are cached as serialized
+# bodies under an ETag made from the URL, the audience and the versions (CacheVersion rows) of the
+# authors and posts they show, replaced by every write to them (node_link/utils/response_cache.py);
+# repeat polls get a 304 for the ETag they already have without building the body.
+RESPONSE_CACHE_SECONDS = 300
+
+# Remote authors are synced in the background by `python manage.py fetch_remote_authors --loop`,
+# which checks every REMOTE_AUTHORS_SYNC_INTERVAL_SECONDS for nodes not synced within REMOTE_AUTHORS_TTL_SECONDS.
+REMOTE_AUTHORS_TTL_SECONDS = 300
+REMOTE_AUTHORS_SYNC_INTERVAL_SECONDS = 60
+# All nodes are crawled at once (up to REMOTE_AUTHORS_CRAWL_CONCURRENCY), asking for pages of
+# REMOTE_AUTHORS_PAGE_SIZE authors; REMOTE_AUTHORS_MAX_PAGES guards against endless pagination.
+REMOTE_AUTHORS_CRAWL_CONCURRENCY = 8
+REMOTE_AUTHORS_PAGE_SIZE = 100
+REMOTE_AUTHORS_MAX_PAGES = 1000
+
+# GitHub activity of linked authors becomes posts through `python manage.py poll_github_activity --loop`,
+# never during a page view. Each author is polled at most every GITHUB_POLL_INTERVAL_SECONDS (longer if
+# GitHub's X-Poll-Interval says so) with their ETag, GITHUB_POLL_CONCURRENCY authors at once.
+GITHUB_POLL_INTERVAL_SECONDS = 60
+GITHUB_POLL_CONCURRENCY = 4